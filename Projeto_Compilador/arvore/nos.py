@@ -0,0 +1,177 @@
+# arvore/nos.py
+#
+# Nós da Árvore Sintática Abstrata (AST).
+# Cada nó é uma dataclass com __slots__ e guarda a linha/coluna de origem,
+# que não entram na comparação estrutural entre nós.
+
+from dataclasses import dataclass, field
+
+def _posicao():
+    return field(default=0, compare=False, repr=False, kw_only=True)
+
+@dataclass(slots=True)
+class No:
+    linha: int = _posicao()
+    coluna: int = _posicao()
+
+# -----------------------
+# Tipos
+# -----------------------
+# Os tipos simples são representados pelas strings 'INTEGER', 'REAL',
+# 'BOOLEAN' e 'STRING'; os arrays por TipoArray.
+
+@dataclass(slots=True, frozen=True)
+class TipoArray:
+    elemento: str
+    inicio: int
+    tamanho: int
+
+    @property
+    def fim(self):
+        return self.inicio + self.tamanho - 1
+
+# -----------------------
+# Programa e declarações
+# -----------------------
+
+@dataclass(slots=True)
+class Programa(No):
+    nome: str
+    bloco: 'Bloco'
+
+@dataclass(slots=True)
+class Bloco(No):
+    decls: list
+    stmts: list
+
+@dataclass(slots=True)
+class DeclVar(No):
+    nome: str
+    tipo: object        # str ou TipoArray
+
+@dataclass(slots=True)
+class DeclConst(No):
+    nome: str
+    valor: 'Expr'
+
+@dataclass(slots=True)
+class Param(No):
+    nome: str
+    tipo: str
+
+@dataclass(slots=True)
+class Subprograma(No):
+    nome: str
+    params: list
+    ret: str            # None nos procedimentos
+    bloco: Bloco
+
+    @property
+    def eh_funcao(self):
+        return self.ret is not None
+
+# -----------------------
+# Instruções
+# -----------------------
+
+@dataclass(slots=True)
+class Atribuicao(No):
+    alvo: 'Expr'        # Id ou AcessoArray
+    expr: 'Expr'
+
+@dataclass(slots=True)
+class Escrever(No):
+    args: list
+    nova_linha: bool    # writeln (True) ou Write (False)
+
+@dataclass(slots=True)
+class Ler(No):
+    alvos: list
+
+@dataclass(slots=True)
+class Se(No):
+    cond: 'Expr'
+    entao: list
+    senao: list         # None quando não há else
+
+@dataclass(slots=True)
+class Enquanto(No):
+    cond: 'Expr'
+    corpo: list
+
+@dataclass(slots=True)
+class Para(No):
+    var: str
+    inicio: 'Expr'
+    fim: 'Expr'
+    descendente: bool   # downto
+    corpo: list
+
+# -----------------------
+# Expressões
+# -----------------------
+
+@dataclass(slots=True)
+class Expr(No):
+    # Tipo resolvido, anotado pelo verificador semântico
+    tipo: object = field(default=None, compare=False, repr=False, kw_only=True)
+
+@dataclass(slots=True)
+class Num(Expr):
+    valor: object       # int ou float
+
+@dataclass(slots=True)
+class Str(Expr):
+    valor: str
+
+@dataclass(slots=True)
+class Bool(Expr):
+    valor: bool
+
+@dataclass(slots=True)
+class Id(Expr):
+    nome: str
+
+@dataclass(slots=True)
+class AcessoArray(Expr):
+    nome: str
+    indice: Expr
+
+@dataclass(slots=True)
+class BinOp(Expr):
+    op: str
+    esq: Expr
+    dir: Expr
+
+@dataclass(slots=True)
+class Not(Expr):
+    expr: Expr
+
+@dataclass(slots=True)
+class Chamada(Expr):
+    """Chamada de função (em expressões) ou de procedimento (como instrução)."""
+    nome: str
+    args: list
+
+# -----------------------
+# Travessia
+# -----------------------
+
+def filhos(no):
+    """Devolve os nós filhos diretos de um nó (achatando as listas)."""
+    resultado = []
+    for nome in no.__match_args__:
+        valor = getattr(no, nome)
+        if isinstance(valor, No):
+            resultado.append(valor)
+        elif isinstance(valor, list):
+            resultado.extend(v for v in valor if isinstance(v, No))
+    return resultado
+
+def percorrer(no):
+    """Percorre a árvore em pré-ordem (iterativamente, sem limite de profundidade)."""
+    pilha = [no]
+    while pilha:
+        atual = pilha.pop()
+        yield atual
+        pilha.extend(reversed(filhos(atual)))
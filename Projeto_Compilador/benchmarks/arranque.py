@@ -0,0 +1,42 @@
+# benchmarks/arranque.py
+# Compara o tempo de arranque do parser com a cache de tabelas LALR fria e quente.
+#
+# Uso: python benchmarks/arranque.py [repeticoes]
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def medir_import(cache_dir):
+    env = dict(os.environ, PASCAL_CACHE_DIR=cache_dir)
+    env.pop('PASCAL_PARSER_DEBUG', None)
+    inicio = time.perf_counter()
+    subprocess.run([sys.executable, '-c', 'import parser.pascal_parser'], cwd=RAIZ, env=env, check=True)
+    return time.perf_counter() - inicio
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    frio, quente = [], []
+
+    for _ in range(repeticoes):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            frio.append(medir_import(cache_dir))      # cache vazia: gera tabelas
+            quente.append(medir_import(cache_dir))    # cache preenchida: só carrega
+
+    # Referência: arranque do interpretador sem importar o compilador
+    inicio = time.perf_counter()
+    subprocess.run([sys.executable, '-c', 'pass'], check=True)
+    base = time.perf_counter() - inicio
+
+    print(f"Interpretador (referência): {base * 1000:8.1f} ms")
+    print(f"Import a frio  (mediana):   {statistics.median(frio) * 1000:8.1f} ms")
+    print(f"Import a quente (mediana):  {statistics.median(quente) * 1000:8.1f} ms")
+    print(f"Ganho:                      {statistics.median(frio) / statistics.median(quente):8.1f}x")
+
+if __name__ == '__main__':
+    main()
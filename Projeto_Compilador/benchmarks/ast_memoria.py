@@ -0,0 +1,47 @@
+# benchmarks/ast_memoria.py
+# Mede a memória ocupada pela AST e o tempo das fases que a percorrem
+# (verificação semântica e geração de código) num programa sintético grande.
+#
+# Uso: python benchmarks/ast_memoria.py [instrucoes]
+
+import os
+import sys
+import time
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from benchmarks.programas import gerar_programa
+from parser.pascal_parser import parse
+from semantica.verificador import verificar
+from gerador.gerador_vm import GeradorVM
+
+def cronometrar(funcao, repeticoes=10):
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    codigo = gerar_programa(n_stmts=n, n_funcoes=50)
+
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    ast = parse(codigo)
+    memoria = tracemalloc.get_traced_memory()[0] - antes
+    tracemalloc.stop()
+
+    t_verificar = cronometrar(lambda: verificar(ast))
+    t_gerar = cronometrar(lambda: GeradorVM().gerar(ast))
+
+    print(f"Programa: {codigo.count(chr(10))} linhas, {n} instruções")
+    print(f"Memória da AST:     {memoria / 2**20:8.2f} MiB")
+    print(f"verificar():        {t_verificar * 1000:8.1f} ms")
+    print(f"GeradorVM.gerar():  {t_gerar * 1000:8.1f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+# benchmarks/concorrencia.py
+# Teste de stress do parse() reentrante: analisa centenas de programas em
+# paralelo (threads) e compara as ASTs e as linhas dos erros com uma execução série.
+#
+# Uso: python benchmarks/concorrencia.py [programas] [threads]
+
+import glob
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from parser.pascal_parser import parse
+from arvore.nos import percorrer
+
+def gerar_programas(n, semente=2025):
+    rng = random.Random(semente)
+    exemplos = [open(f, encoding='utf-8').read()
+                for f in sorted(glob.glob(os.path.join(RAIZ, 'exemplos', '**', '*.pas'), recursive=True))]
+    programas = []
+    for _ in range(n):
+        linhas = rng.choice(exemplos).split('\n')
+        # Desloca o programa com linhas em branco para variar os números de linha
+        linhas = [''] * rng.randint(0, 50) + linhas
+        if rng.random() < 0.3:
+            # Introduz um erro de sintaxe numa linha aleatória
+            i = rng.randrange(len(linhas))
+            linhas[i] += ' := := '
+        programas.append('\n'.join(linhas))
+    return programas
+
+def analisar(codigo):
+    try:
+        ast = parse(codigo)
+    except Exception as e:
+        return ('erro', str(e))
+    # A igualdade entre nós ignora as posições: compara-as à parte
+    posicoes = [(type(no).__name__, no.linha, no.coluna) for no in percorrer(ast)]
+    return ('ok', ast, posicoes)
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    programas = gerar_programas(n)
+
+    inicio = time.perf_counter()
+    serie = [analisar(p) for p in programas]
+    t_serie = time.perf_counter() - inicio
+
+    # Duas passagens série seguidas também não podem divergir (linhas não acumulam)
+    assert serie == [analisar(p) for p in programas], "parse() não é determinístico"
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        paralelo = list(pool.map(analisar, programas))
+    t_paralelo = time.perf_counter() - inicio
+
+    divergencias = [i for i, (a, b) in enumerate(zip(serie, paralelo)) if a != b]
+    erros = sum(1 for r in serie if r[0] == 'erro')
+    print(f"{n} programas ({erros} com erro de sintaxe), {threads} threads")
+    print(f"Série:    {t_serie:.3f}s")
+    print(f"Paralelo: {t_paralelo:.3f}s")
+    if divergencias:
+        print(f"❌ {len(divergencias)} resultados divergentes, e.g. programa {divergencias[0]}:")
+        print(f"   série:    {serie[divergencias[0]]}")
+        print(f"   paralelo: {paralelo[divergencias[0]]}")
+        sys.exit(1)
+    print("✅ ASTs, posições dos nós e linhas dos erros idênticas à execução série")
+
+if __name__ == '__main__':
+    main()
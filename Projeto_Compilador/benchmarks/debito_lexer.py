@@ -0,0 +1,65 @@
+# benchmarks/debito_lexer.py
+# Compara o débito (tokens/s e MiB/s) do lexer do PLY com o do lexer rápido
+# em programas sintéticos de vários tamanhos, e o tempo do parse completo
+# com cada um deles. Os tokens são contados à medida que são produzidos, como
+# quando o parser os consome, sem os guardar numa lista.
+#
+# Uso: python benchmarks/debito_lexer.py [--tamanhos 10000,100000] [--repeticoes 3]
+
+import argparse
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from benchmarks.programas import gerar_programa_escalavel
+from lexer import lexer_rapido
+from lexer.pascal_lexer import lexer
+from parser.pascal_parser import LEXICOS, parse
+
+def contar_ply(codigo):
+    lx = lexer.clone()
+    lx.lineno = 1
+    lx.input(codigo)
+    return sum(1 for _ in iter(lx.token, None))
+
+def contar_rapido(codigo):
+    return sum(1 for _ in lexer_rapido.tokenizar(codigo))
+
+CONTAR = {'ply': contar_ply, 'rapido': contar_rapido}
+
+def cronometrar(funcao, repeticoes):
+    """Devolve (melhor tempo em segundos, resultado da última execução)."""
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+def main():
+    ap = argparse.ArgumentParser(description='Débito do lexer do PLY e do lexer rápido.')
+    ap.add_argument('--tamanhos', default='10000,100000', help='linhas dos programas, separadas por vírgulas')
+    ap.add_argument('--repeticoes', type=int, default=3)
+    args = ap.parse_args()
+
+    print(f"{'linhas':>8} {'MiB':>6} {'lexer':>7} {'tokens':>9} {'lex ms':>9} {'M tok/s':>8} "
+          f"{'MiB/s':>7} {'parse ms':>9}")
+    for n in (int(t) for t in args.tamanhos.split(',')):
+        codigo = gerar_programa_escalavel(n)
+        mib = len(codigo.encode('utf-8')) / 2**20
+        tempos = {}
+        for lexico in LEXICOS:
+            tempo, n_tokens = cronometrar(lambda: CONTAR[lexico](codigo), args.repeticoes)
+            tempo_parse, _ = cronometrar(lambda: parse(codigo, lexico=lexico), args.repeticoes)
+            tempos[lexico] = (tempo, tempo_parse)
+            print(f"{n:>8} {mib:>6.1f} {lexico:>7} {n_tokens:>9} {tempo * 1000:>9.1f} "
+                  f"{n_tokens / tempo / 1e6:>8.2f} {mib / tempo:>7.1f} {tempo_parse * 1000:>9.1f}")
+        (lex_ply, parse_ply), (lex_rapido, parse_rapido) = tempos['ply'], tempos['rapido']
+        print(f"{'':>8} lexer rápido: {lex_ply / lex_rapido:.2f}x mais rápido a tokenizar, "
+              f"parse {parse_ply / parse_rapido:.2f}x\n")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+# benchmarks/expressoes.py
+# Tempo de geração de código para expressões aritméticas profundamente
+# aninhadas. Com os tipos anotados pelo verificador, o custo por nível de
+# profundidade deve ser constante (geração linear).
+#
+# Uso: python benchmarks/expressoes.py [profundidade_maxima]
+
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from parser.pascal_parser import parse
+from semantica.verificador import verificar
+from gerador.gerador_vm import GeradorVM
+
+def programa_aninhado(profundidade):
+    expr = 'x'
+    for k in range(profundidade):
+        expr = f'({expr} + {k % 10} * x)'
+    return f'program Aninhado;\nvar x: integer;\nbegin\n  x := 1;\n  x := {expr};\nend.\n'
+
+def main():
+    maxima = int(sys.argv[1]) if len(sys.argv) > 1 else 1600
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), maxima * 10))
+
+    print(f"{'profundidade':>12} {'gerar (ms)':>12} {'µs/nível':>10}")
+    profundidade = 100
+    while profundidade <= maxima:
+        ast = parse(programa_aninhado(profundidade))
+        verificar(ast)
+        melhor = float('inf')
+        for _ in range(5):
+            inicio = time.perf_counter()
+            GeradorVM().gerar(ast)
+            melhor = min(melhor, time.perf_counter() - inicio)
+        print(f"{profundidade:>12} {melhor * 1000:>12.2f} {melhor * 1e6 / profundidade:>10.2f}")
+        profundidade *= 2
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+# benchmarks/fases.py
+# Mede separadamente cada fase do compilador (lexer, parser, verificador,
+# gerador, otimizações e escrita do texto) em programas sintéticos de 1k a 1M
+# linhas, com a memória de pico de cada tamanho, e escreve os resultados em
+# JSON (por omissão em benchmarks/resultados/, que o git ignora: os tempos
+# são da máquina onde correm). Para comparar dois commits, corre-se no
+# primeiro, guarda-se o JSON e passa-se com --comparar ao correr no segundo.
+#
+# Cada tamanho corre num processo próprio, para que a memória de pico (RSS)
+# seja a desse tamanho e não a acumulada.
+#
+# Uso: python benchmarks/fases.py [--tamanhos 1000,10000,100000,1000000]
+#                                 [--saida resultados.json] [--comparar anterior.json]
+#                                 [--profundidade 3] [--funcoes 20] [--array 100] [--aninhamento 3]
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+SAIDA = os.path.join(RAIZ, 'benchmarks', 'resultados', 'fases.json')
+FASES = ['lex', 'parse', 'verificar', 'gerar', 'constantes', 'peephole', 'globais', 'texto']
+
+def cronometrar(funcao, repeticoes):
+    """Devolve (melhor tempo em segundos, resultado da última execução)."""
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+def medir(n_linhas, parametros):
+    """Mede todas as fases para um tamanho (corre no processo filho)."""
+    from benchmarks.programas import gerar_programa_escalavel
+    from lexer.pascal_lexer import lexer
+    from parser.pascal_parser import parse
+    from semantica.verificador import verificar
+    from gerador.gerador_vm import GeradorVM
+    from otimizador.constantes import otimizar_constantes
+    from otimizador.peephole import otimizar_peephole
+    from otimizador.globais import alocar_globais
+
+    codigo = gerar_programa_escalavel(n_linhas, **parametros)
+    repeticoes = max(1, min(5, 100_000 // n_linhas))
+    tempos = {}
+
+    def lex():
+        lx = lexer.clone()
+        lx.lineno = 1
+        lx.input(codigo)
+        n = 0
+        while lx.token():
+            n += 1
+        return n
+
+    tempos['lex'], n_tokens = cronometrar(lex, repeticoes)
+    tempos['parse'], ast = cronometrar(lambda: parse(codigo), repeticoes)
+    tempos['verificar'], _ = cronometrar(lambda: verificar(ast), repeticoes)
+    tempos['gerar'], ir = cronometrar(lambda: GeradorVM().gerar(ast), repeticoes)
+    n_instrucoes = len(ir)
+
+    # As otimizações alteram a AST e o IR: medem-se uma única vez, pela ordem do -O
+    tempos['constantes'], ast = cronometrar(lambda: otimizar_constantes(ast), 1)
+    ir = GeradorVM().gerar(ast)
+    tempos['peephole'], ir = cronometrar(lambda: otimizar_peephole(ir), 1)
+    tempos['globais'], ir = cronometrar(lambda: alocar_globais(ir), 1)
+    tempos['texto'], _ = cronometrar(ir.texto, repeticoes)
+
+    return {
+        'linhas': codigo.count('\n'),
+        'tokens': n_tokens,
+        'instrucoes': n_instrucoes,
+        'instrucoes_O': len(ir),
+        'fases_ms': {f: round(tempos[f] * 1000, 1) for f in FASES},
+        'total_ms': round(sum(tempos.values()) * 1000, 1),
+        'memoria_pico_mib': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+def medir_em_processo(n_linhas, parametros):
+    r = subprocess.run([sys.executable, os.path.abspath(__file__), '--medir', str(n_linhas),
+                        '--parametros', json.dumps(parametros)],
+                       cwd=RAIZ, capture_output=True, text=True)
+    if r.returncode != 0:
+        raise SystemExit(f"Falhou para {n_linhas} linhas:\n{r.stderr}")
+    return json.loads(r.stdout)
+
+def comparar(anteriores, atuais, tolerancia):
+    """Mostra a razão atual/anterior por fase; devolve True se houver regressões."""
+    por_linhas = {r['linhas']: r for r in anteriores['resultados']}
+    regressao = False
+    print(f"\nComparação com a execução anterior (tolerância {tolerancia:.2f}x):")
+    for atual in atuais['resultados']:
+        antigo = por_linhas.get(atual['linhas'])
+        if not antigo:
+            continue
+        partes = []
+        for fase in FASES:
+            a, b = antigo['fases_ms'].get(fase), atual['fases_ms'][fase]
+            if not a or b < 5:          # tempos muito pequenos são só ruído
+                continue
+            razao = b / a
+            marca = ' ⚠️' if razao > tolerancia else ''
+            regressao |= bool(marca)
+            partes.append(f"{fase} {razao:.2f}x{marca}")
+        print(f"  {atual['linhas']:>8} linhas: " + ', '.join(partes))
+    return regressao
+
+def main():
+    ap = argparse.ArgumentParser(description='Benchmark das fases do compilador.')
+    ap.add_argument('--tamanhos', default='1000,10000,100000',
+                    help='número de linhas dos programas, separados por vírgulas (até 1000000)')
+    ap.add_argument('--profundidade', type=int, default=3, help='níveis de operadores nas expressões')
+    ap.add_argument('--funcoes', type=int, default=20, help='número de funções')
+    ap.add_argument('--array', type=int, default=100, help='tamanho dos arrays')
+    ap.add_argument('--aninhamento', type=int, default=3, help='níveis de if/while/for encaixados')
+    ap.add_argument('--saida', default=SAIDA, help='ficheiro JSON de resultados')
+    ap.add_argument('--comparar', metavar='JSON', help='resultados anteriores a comparar')
+    ap.add_argument('--tolerancia', type=float, default=1.25, help='razão a partir da qual há regressão')
+    ap.add_argument('--medir', type=int, help=argparse.SUPPRESS)
+    ap.add_argument('--parametros', help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.medir:
+        print(json.dumps(medir(args.medir, json.loads(args.parametros))))
+        return
+
+    parametros = {'profundidade': args.profundidade, 'n_funcoes': args.funcoes,
+                  'tamanho_array': args.array, 'aninhamento': args.aninhamento}
+    resultados = {
+        'python': platform.python_version(),
+        'parametros': parametros,
+        'resultados': [],
+    }
+
+    print(f"{'linhas':>8} {'tokens':>9} " + ' '.join(f'{f:>10}' for f in FASES) + f" {'total':>9} {'MiB':>7}")
+    for n in (int(t) for t in args.tamanhos.split(',')):
+        r = medir_em_processo(n, parametros)
+        resultados['resultados'].append(r)
+        print(f"{r['linhas']:>8} {r['tokens']:>9} " + ' '.join(f"{r['fases_ms'][f]:>10.1f}" for f in FASES)
+              + f" {r['total_ms']:>9.1f} {r['memoria_pico_mib']:>7.1f}")
+
+    regressao = False
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            regressao = comparar(json.load(f), resultados, args.tolerancia)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.saida)), exist_ok=True)
+    with open(args.saida, 'w', encoding='utf-8') as f:
+        json.dump(resultados, f, indent=2, sort_keys=True)
+        f.write('\n')
+    print(f"\nResultados escritos em {os.path.relpath(args.saida)} (tempos em ms)")
+    sys.exit(1 if regressao else 0)
+
+if __name__ == '__main__':
+    main()
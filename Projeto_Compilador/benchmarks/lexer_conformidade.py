@@ -0,0 +1,99 @@
+# benchmarks/lexer_conformidade.py
+# Verifica que o lexer rápido (lexer/lexer_rapido.py) produz exatamente os
+# mesmos tokens que o lexer do PLY (tipo, valor, linha e posição), e os mesmos
+# erros, em todos os exemplos, em programas sintéticos e em entradas aleatórias
+# (palavras reservadas com maiúsculas, números como "1..2", strings com escapes
+# ou por fechar, comentários de várias linhas, caracteres ilegais, ...).
+#
+# Uso: python benchmarks/lexer_conformidade.py [--casos 5000] [--semente 2025]
+
+import argparse
+import glob
+import os
+import random
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from benchmarks.programas import gerar_programa, gerar_programa_escalavel
+from lexer.pascal_lexer import lexer, reserved
+from lexer.lexer_rapido import OPERADORES, tokenizar
+
+FRAGMENTOS = (
+    list(reserved) + [p.upper() for p in reserved] + [p.capitalize() for p in reserved]
+    + list(OPERADORES)
+    + ['x', 'soma', '_tmp', 'a1', 'Begin_', 'writeLn', 'endx', 'v_2_b']
+    + ['0', '7', '42', '3.14', '1.', '1..2', '.5', '10.0.1', '007', '٣٤', '2.٥']
+    + ["'ola'", "''", "'it''s'", "'a\\'b'", "'\\\\'", "'sem fim", "'quebra\nlinha'", "'éç'"]
+    + ['{ comentario }', '{}', '{ varias\nlinhas\n}', '{ sem fim', '}', '{{}']
+    + [' ', '  ', '\t', '\n', '\n\n', '\r\n', '\r', '\f']
+    + ['#', '$', '@', '"', '!', '\\', '?', 'ç', '\x00']
+)
+
+def tokens_ply(codigo):
+    lx = lexer.clone()
+    lx.lineno = 1
+    lx.input(codigo)
+    resultado = []
+    try:
+        for t in iter(lx.token, None):
+            resultado.append((t.type, t.value, t.lineno, t.lexpos))
+    except Exception as e:
+        return resultado, str(e)
+    return resultado, None
+
+def tokens_rapido(codigo):
+    resultado = []
+    try:
+        for t in tokenizar(codigo):
+            resultado.append((t.type, t.value, t.lineno, t.lexpos))
+    except Exception as e:
+        return resultado, str(e)
+    return resultado, None
+
+def diferenca(codigo):
+    """Descrição da primeira diferença entre os dois lexers, ou None."""
+    esperado, erro_esperado = tokens_ply(codigo)
+    obtido, erro_obtido = tokens_rapido(codigo)
+    for n, (a, b) in enumerate(zip(esperado, obtido)):
+        if a != b or type(a[1]) is not type(b[1]):
+            return f"token {n}: PLY {a!r}, rápido {b!r}"
+    if len(esperado) != len(obtido):
+        return f"{len(esperado)} tokens no PLY, {len(obtido)} no rápido"
+    if erro_esperado != erro_obtido:
+        return f"erro no PLY {erro_esperado!r}, no rápido {erro_obtido!r}"
+    return None
+
+def aleatorio(rng):
+    partes = rng.choices(FRAGMENTOS, k=rng.randint(1, 40))
+    separador = rng.choice(['', ' ', '\n'])
+    return separador.join(partes)
+
+def main():
+    ap = argparse.ArgumentParser(description='Conformidade do lexer rápido com o do PLY.')
+    ap.add_argument('--casos', type=int, default=5000, help='número de entradas aleatórias')
+    ap.add_argument('--semente', type=int, default=2025)
+    args = ap.parse_args()
+
+    casos = []
+    for caminho in sorted(glob.glob(os.path.join(RAIZ, 'exemplos', '**', '*.pas'), recursive=True)):
+        with open(caminho, encoding='utf-8') as f:
+            casos.append((os.path.relpath(caminho, RAIZ), f.read()))
+    casos.append(('gerar_programa(200)', gerar_programa(200)))
+    casos.append(('gerar_programa_escalavel(5000)', gerar_programa_escalavel(5000)))
+    rng = random.Random(args.semente)
+    casos.extend((f'aleatório #{n}', aleatorio(rng)) for n in range(args.casos))
+
+    falhas = 0
+    for nome, codigo in casos:
+        problema = diferenca(codigo)
+        if problema:
+            falhas += 1
+            if falhas <= 10:
+                print(f"❌ {nome}: {problema}\n   entrada: {codigo[:200]!r}")
+    print(f"{len(casos) - falhas}/{len(casos)} entradas com tokens idênticos")
+    sys.exit(1 if falhas else 0)
+
+if __name__ == '__main__':
+    main()
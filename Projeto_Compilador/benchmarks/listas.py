@@ -0,0 +1,75 @@
+# benchmarks/listas.py
+# Mede o parser em programas com listas muito compridas: blocos com até 100k
+# instruções, secções var com até 10k declarações, uma declaração com 10k
+# identificadores e um writeln/readln com 10k argumentos. Para cada forma
+# o tamanho duplica e mostra-se o tempo por elemento: com construção linear
+# das listas esse tempo mantém-se (aproximadamente) constante.
+#
+# Uso: python benchmarks/listas.py [--escala 1.0] [--tolerancia 2.0]
+
+import argparse
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from parser.pascal_parser import parse
+
+def bloco(n):
+    corpo = '\n'.join(f'  x := x + {i};' for i in range(n))
+    return f"program Bloco;\nvar x: integer;\nbegin\n  x := 0;\n{corpo}\n  writeln(x);\nend.\n"
+
+def declaracoes(n):
+    decls = '\n'.join(f'  v{i}: integer;' for i in range(n))
+    return f"program Decls;\nvar\n{decls}\nbegin\n  v0 := 1;\nend.\n"
+
+def identificadores(n):
+    ids = ', '.join(f'v{i}' for i in range(n))
+    return f"program Ids;\nvar {ids}: integer;\nbegin\n  v0 := 1;\nend.\n"
+
+def argumentos(n):
+    ids = ', '.join(f'v{i}' for i in range(n))
+    return (f"program Args;\nvar {ids}: integer;\nbegin\n"
+            f"  readln({ids});\n  writeln({ids});\nend.\n")
+
+# forma -> (gerador, tamanhos)
+FORMAS = {
+    'bloco de instruções': (bloco, [12_500, 25_000, 50_000, 100_000]),
+    'secção var': (declaracoes, [1_250, 2_500, 5_000, 10_000]),
+    'lista de identificadores': (identificadores, [1_250, 2_500, 5_000, 10_000]),
+    'writeln/readln': (argumentos, [1_250, 2_500, 5_000, 10_000]),
+}
+
+def medir(codigo, repeticoes=3):
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        parse(codigo)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+def main():
+    ap = argparse.ArgumentParser(description='Escalabilidade do parser em listas compridas.')
+    ap.add_argument('--escala', type=float, default=1.0, help='multiplica todos os tamanhos')
+    ap.add_argument('--tolerancia', type=float, default=2.0,
+                    help='razão máxima entre o tempo por elemento do maior e do menor tamanho')
+    args = ap.parse_args()
+
+    falhas = 0
+    print(f"{'forma':<26} {'elementos':>10} {'ms':>9} {'µs/elemento':>12}")
+    for forma, (gerar, tamanhos) in FORMAS.items():
+        por_elemento = []
+        for n in (max(1, int(t * args.escala)) for t in tamanhos):
+            tempo = medir(gerar(n))
+            por_elemento.append(tempo / n)
+            print(f"{forma:<26} {n:>10} {tempo * 1000:>9.1f} {tempo / n * 1e6:>12.2f}")
+        razao = por_elemento[-1] / por_elemento[0]
+        marca = '' if razao <= args.tolerancia else '  ⚠️ crescimento super-linear'
+        falhas += bool(marca)
+        print(f"{'':<26} {'':>10} razão do tempo por elemento: {razao:.2f}x{marca}\n")
+    sys.exit(1 if falhas else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+# benchmarks/programas.py
+# Gerador de programas Pascal sintéticos (válidos) para os benchmarks.
+
+import random
+
+def gerar_programa(n_stmts=1000, n_funcoes=10, semente=2025):
+    """Programa com `n_funcoes` funções e `n_stmts` instruções no bloco principal."""
+    rng = random.Random(semente)
+    linhas = ['program Sintetico;']
+
+    for f in range(n_funcoes):
+        linhas += [
+            f'function f{f}(a: integer; b: integer): integer;',
+            'var t: integer;',
+            'begin',
+            '  t := a * 2 + b;',
+            '  if t > 100 then t := t - 100;',
+            f'  f{f} := t;',
+            'end;',
+        ]
+
+    linhas += [
+        'var',
+        '  i, x, y, z: integer;',
+        '  r: real;',
+        '  v: array[1..100] of integer;',
+        '  s: string;',
+        'begin',
+        '  x := 1; y := 2; z := 3; r := 0.5; s := \'abc\';',
+    ]
+    for k in range(n_stmts):
+        escolha = rng.randrange(5)
+        if escolha == 0:
+            linhas.append(f'  x := (x + {k}) * (y - z) div 3 + v[{k % 100 + 1}];')
+        elif escolha == 1:
+            linhas.append(f'  if (x > y) and (z <> {k}) then y := y + 1 else z := z - 1;')
+        elif escolha == 2:
+            linhas.append(f'  for i := 1 to 10 do v[i] := v[i] + i * {k % 7};')
+        elif escolha == 3 and n_funcoes:
+            linhas.append(f'  z := f{rng.randrange(n_funcoes)}(x, {k});')
+        else:
+            linhas.append(f'  r := r * 2.0 + x; writeln(\'x = \', x, \' r = \', r);')
+    linhas.append('end.')
+    return '\n'.join(linhas) + '\n'
+
+class _Gerador:
+    """Gera programas cujo tamanho e forma são controlados por parâmetros."""
+
+    def __init__(self, rng, profundidade, n_funcoes, tamanho_array, n_arrays, aninhamento):
+        self.rng = rng
+        self.profundidade = profundidade
+        self.n_funcoes = n_funcoes
+        self.tamanho_array = tamanho_array
+        self.n_arrays = n_arrays
+        self.aninhamento = aninhamento
+        self.linhas = []
+
+    def expr(self, profundidade, escalares=('x', 'y', 'z')):
+        """Expressão inteira com `profundidade` níveis de operadores."""
+        rng = self.rng
+        if profundidade <= 0:
+            escolha = rng.randrange(4)
+            if escolha == 0:
+                return str(rng.randrange(1, 1000))
+            if escolha == 1 and self.n_arrays:
+                return f'a{rng.randrange(self.n_arrays)}[{rng.randrange(1, self.tamanho_array + 1)}]'
+            return rng.choice(escalares)
+        esq = self.expr(profundidade - 1, escalares)
+        dir = self.expr(rng.randrange(profundidade), escalares)
+        op = rng.choice(['+', '-', '*', 'div', 'mod'])
+        if op in ('div', 'mod'):
+            dir = str(rng.randrange(2, 10))    # divisor constante, nunca zero
+        return f'({esq} {op} {dir})'
+
+    def cond(self):
+        rng = self.rng
+        rel = rng.choice(['<', '<=', '>', '>=', '=', '<>'])
+        c = f'({self.expr(min(2, self.profundidade))} {rel} {self.expr(1)})'
+        if rng.randrange(3) == 0:
+            c = f'{c} and (x <> {rng.randrange(100)})'
+        return c
+
+    def simples(self, indent):
+        rng = self.rng
+        escolha = rng.randrange(6)
+        if escolha == 0 and self.n_arrays:
+            a = rng.randrange(self.n_arrays)
+            self.linhas.append(f'{indent}a{a}[{rng.randrange(1, self.tamanho_array + 1)}] := {self.expr(self.profundidade)};')
+        elif escolha == 1 and self.n_funcoes:
+            f = rng.randrange(self.n_funcoes)
+            self.linhas.append(f'{indent}z := f{f}({self.expr(1)}, {self.expr(1)});')
+        elif escolha == 2:
+            self.linhas.append(f"{indent}writeln('x = ', x, ' r = ', r);")
+        elif escolha == 3:
+            self.linhas.append(f'{indent}r := r * 0.5 + {self.expr(1)};')
+        else:
+            self.linhas.append(f'{indent}{rng.choice("xyz")} := {self.expr(self.profundidade)};')
+
+    def stmt(self, nivel):
+        """Acrescenta uma instrução (composta se ainda houver níveis de aninhamento)."""
+        rng = self.rng
+        indent = '  ' * (nivel + 1)
+        if nivel >= self.aninhamento or rng.randrange(3) == 0:
+            self.simples(indent)
+            return
+
+        escolha = rng.randrange(3)
+        if escolha == 0:
+            self.linhas.append(f'{indent}if {self.cond()} then')
+            self.bloco(nivel)
+            self.linhas.append(f'{indent}else')
+            self.bloco(nivel, ';')
+        elif escolha == 1:
+            w = f'w{nivel}'
+            self.linhas.append(f'{indent}{w} := 0;')
+            self.linhas.append(f'{indent}while ({w} < {rng.randrange(2, 5)}) and {self.cond()} do')
+            self.bloco(nivel, ';', f'{w} := {w} + 1;')
+        else:
+            i = f'i{nivel}'
+            self.linhas.append(f'{indent}for {i} := 1 to {rng.randrange(2, 5)} do')
+            self.bloco(nivel, ';')
+
+    def bloco(self, nivel, fim='', extra=None):
+        indent = '  ' * (nivel + 1)
+        self.linhas.append(f'{indent}begin')
+        for _ in range(self.rng.randrange(1, 4)):
+            self.stmt(nivel + 1)
+        if extra:
+            self.linhas.append(f'{indent}  {extra}')
+        self.linhas.append(f'{indent}end{fim}')
+
+def gerar_programa_escalavel(n_linhas=1000, profundidade=3, n_funcoes=20, tamanho_array=100,
+                             n_arrays=4, aninhamento=3, semente=2025):
+    """Programa válido com aproximadamente `n_linhas` linhas.
+
+    profundidade  -- níveis de operadores nas expressões
+    n_funcoes     -- funções declaradas (e chamadas a partir do programa)
+    tamanho_array -- elementos de cada um dos `n_arrays` arrays globais
+    aninhamento   -- níveis máximos de if/while/for encaixados"""
+    g = _Gerador(random.Random(semente), profundidade, n_funcoes, tamanho_array, n_arrays, aninhamento)
+    linhas = g.linhas
+    linhas.append('program Escalavel;')
+
+    contadores = ', '.join([f'i{n}' for n in range(aninhamento + 1)] + [f'w{n}' for n in range(aninhamento + 1)])
+    linhas += ['var', f'  x, y, z, {contadores}: integer;', '  r: real;']
+    linhas += [f'  a{a}: array[1..{tamanho_array}] of integer;' for a in range(n_arrays)]
+
+    for f in range(n_funcoes):
+        linhas += [
+            f'function f{f}(a: integer; b: integer): integer;',
+            'var t: integer;',
+            'begin',
+            f"  t := {g.expr(profundidade, ('a', 'b'))};",
+            f'  if t > {g.rng.randrange(100, 1000)} then t := t mod 97;',
+            f'  f{f} := t;',
+            'end;',
+        ]
+
+    linhas += ['begin', '  x := 1; y := 2; z := 3; r := 0.5;']
+
+    while len(linhas) < n_linhas - 1:
+        g.stmt(0)
+    linhas.append('end.')
+    return '\n'.join(linhas) + '\n'
@@ -0,0 +1,228 @@
+# benchmarks/vm_exemplos.py
+# Compila todos os exemplos (sem e com -O, e com -O --checked), corre-os no
+# interpretador da VM com entradas fixas e compara as saídas. Mostra as
+# instruções executadas e o tempo de cada versão, as strings criadas (PUSHS
+# executados), e no fim o débito do interpretador num ciclo pesado.
+#
+# Uso: python benchmarks/vm_exemplos.py
+
+import glob
+import io
+import os
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from main import compilar_codigo
+from vm.interpretador import MaquinaVirtual
+
+# Entradas para os exemplos que usam readln (uma linha por leitura)
+ENTRADAS = {
+    'binario_to_decimal': '101101\n',
+    'binario_to_decimal_func': '101101\n',
+    'fatorial': '10\n',
+    'maior_de_3': '3\n9\n4\n',
+    'soma_lista_int': '1\n2\n3\n4\n5\n',
+    'verifica_nprimo': '7919\n',
+    'analise_numero': '42\n',
+    'const': '2.5\n',
+}
+
+# Ciclo pesado para medir o débito do interpretador
+PRIMOS = """
+program Primos;
+var i, j, n, total: integer; primo: boolean;
+begin
+  n := 3000;
+  total := 0;
+  for i := 2 to n do
+  begin
+    primo := true;
+    j := 2;
+    while (j * j <= i) and primo do
+    begin
+      if i mod j = 0 then primo := false;
+      j := j + 1;
+    end;
+    if primo then total := total + 1;
+  end;
+  writeln('Primos até ', n, ': ', total);
+end.
+"""
+
+# Subprogramas com parâmetros, locais e recursão (registos de ativação)
+RECURSIVO = """
+program Recursivo;
+function fat(n: integer): integer;
+begin
+  if n <= 1 then fat := 1
+  else fat := n * fat(n - 1);
+end;
+function fib(n: integer): integer;
+var a, b: integer;
+begin
+  if n < 2 then fib := n
+  else
+  begin
+    a := fib(n - 1);
+    b := fib(n - 2);
+    fib := a + b;
+  end;
+end;
+function soma3(x: integer; y: integer; z: integer): integer;
+const k = 100;
+var t: array[1..3] of integer; i, s: integer;
+begin
+  t[1] := x; t[2] := y; t[3] := z;
+  s := 0;
+  for i := 1 to 3 do s := s + t[i];
+  soma3 := s + k;
+end;
+procedure mostra(msg: string; v: integer);
+begin
+  writeln(msg, v);
+end;
+var i: integer;
+begin
+  for i := 0 to 10 do mostra('fat: ', fat(i));
+  mostra('fib 15: ', fib(15));
+  mostra('soma3: ', soma3(fat(3), fib(6), soma3(1, 2, 3)));
+  fat(3);
+end.
+"""
+
+# Recursão em posição final (com -O, um salto para o início do subprograma)
+FINAL = """
+program Final;
+var total: integer;
+function mdc(a: integer; b: integer): integer;
+begin
+  if b = 0 then mdc := a
+  else mdc := mdc(b, a mod b);
+end;
+function somadigitos(n: integer; acc: integer): integer;
+begin
+  if n = 0 then somadigitos := acc
+  else somadigitos := somadigitos(n div 10, acc + n mod 10);
+end;
+procedure conta(n: integer);
+begin
+  if n > 0 then
+  begin
+    total := total + n;
+    conta(n - 1);
+  end;
+end;
+begin
+  total := 0;
+  conta(5000);
+  writeln(total);
+  writeln(mdc(1071, 462), ' ', somadigitos(987654321, 0));
+end.
+"""
+
+# Chamada que escreve numa global na condição do while: (z - x) div 2 não é
+# invariante, apesar de o corpo não alterar x
+CHAMADA_NA_CONDICAO = """
+program ChamadaNaCondicao;
+var x, z, w: integer;
+function bump(a: integer): integer;
+begin
+  x := x + 10;
+  bump := a
+end;
+begin
+  x := 1; z := 3; w := 0;
+  while (w < 3) and (bump(w) >= 0) do
+  begin
+    writeln((z - x) div 2);
+    w := w + 1
+  end
+end.
+"""
+
+# Condições com and/or/not: o while só é seguro em curto-circuito (a[6] não existe)
+CONDICOES = """
+program SC;
+var a: array[1..5] of integer;
+    i, n, x, y: integer;
+    b: boolean;
+begin
+  for i := 1 to 5 do a[i] := 6 - i;
+  i := 1; n := 5;
+  while (i <= n) and (a[i] <> 0) do i := i + 1;
+  writeln(i);
+  for x := 0 to 2 do
+    for y := 0 to 2 do
+    begin
+      if (x = 1) or (y = 1) and not (x = y) then write('A') else write('a');
+      if not ((x < y) or (y < 1)) then write('B') else write('b');
+      if (x > 0) and (y > 0) or (x = 2) then write('C') else write('c');
+      b := (x >= y) and (y <> 2);
+      if b then write('D') else write('d');
+      if not b or false then write('E') else write('e');
+      if true and (x <= 1) then write('F') else write('f');
+      while (x = 0) and false do write('!');
+      writeln(' ');
+    end;
+end.
+"""
+
+# Saídas conhecidas de programas embutidos
+ESPERADO = {
+    'recursivo': ''.join(f'fat: {f}\n' for f in
+                         [1, 1, 2, 6, 24, 120, 720, 5040, 40320, 362880, 3628800])
+                 + 'fib 15: 610\nsoma3: 220\n',
+    'final': '12502500\n21 45\n',
+    'chamada na condição': '-4\n-9\n-14\n',
+    'condicoes': '6\nabcDeF \nAbcdEF \nabcdEF \nAbcDeF \nABCDeF \nAbCdEF \nabCDef \nABCDef \naBCdEf \n',
+}
+
+def correr(codigo, entrada, otimizar, verificar_limites=False):
+    maquina = MaquinaVirtual.de_texto(compilar_codigo(codigo, otimizar, verificar_limites=verificar_limites))
+    saida = io.StringIO()
+    execucao = maquina.executar(io.StringIO(entrada), saida)
+    return saida.getvalue(), execucao
+
+def main():
+    programas = []
+    for caminho in sorted(glob.glob(os.path.join(RAIZ, 'exemplos', '**', '*.pas'), recursive=True)):
+        nome = os.path.splitext(os.path.basename(caminho))[0]
+        with open(caminho, encoding='utf-8') as f:
+            programas.append((nome, f.read(), ENTRADAS.get(nome, '')))
+    programas.append(('recursivo', RECURSIVO, ''))
+    programas.append(('final', FINAL, ''))
+    programas.append(('chamada na condição', CHAMADA_NA_CONDICAO, ''))
+    programas.append(('condicoes', CONDICOES, ''))
+    programas.append(('primos (ciclo pesado)', PRIMOS, ''))
+
+    print(f"{'programa':<26} {'instr.':>9} {'ms':>8} {'instr. -O':>10} {'ms -O':>8}"
+          f" {'strings':>8} {'strings -O':>10}")
+    falhas = 0
+    for nome, codigo, entrada in programas:
+        try:
+            saida, normal = correr(codigo, entrada, False)
+            saida_o, otimizado = correr(codigo, entrada, True)
+            saida_v, _ = correr(codigo, entrada, True, verificar_limites=True)
+        except Exception as e:
+            falhas += 1
+            print(f"{nome:<26} ❌ {e}")
+            continue
+        marca = '' if saida == saida_o else '  ❌ saídas diferentes com -O'
+        if saida_v != saida_o:
+            marca += '  ❌ saídas diferentes com --checked'
+        if nome in ESPERADO and saida != ESPERADO[nome]:
+            marca += '  ❌ saída diferente da esperada'
+        falhas += bool(marca)
+        print(f"{nome:<26} {normal.instrucoes:>9} {normal.tempo * 1000:>8.2f} "
+              f"{otimizado.instrucoes:>10} {otimizado.tempo * 1000:>8.2f} "
+              f"{normal.contagens['PUSHS']:>8} {otimizado.contagens['PUSHS']:>10}{marca}")
+
+    print(f"\nDébito no ciclo pesado: {normal.instrucoes_por_segundo / 1e6:.2f} M instr/s")
+    print("Instruções mais executadas:",
+          ', '.join(f"{op} {n}" for op, n in normal.contagens.most_common(6)))
+    sys.exit(1 if falhas else 0)
+
+if __name__ == '__main__':
+    main()
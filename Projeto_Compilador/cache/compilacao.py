@@ -0,0 +1,137 @@
+# cache/compilacao.py
+#
+# Cache em disco dos resultados da compilação, endereçada pelo conteúdo:
+# a chave é o hash do código-fonte, da versão do compilador (hash dos seus
+# ficheiros .py) e das opções que alteram o código gerado. Um acerto evita
+# todas as fases e limita-se a copiar o .vm guardado.
+#
+# As escritas são atómicas (ficheiro temporário + os.replace), por isso vários
+# processos podem partilhar a mesma cache. O tamanho total é limitado: as
+# entradas menos usadas recentemente (mtime) são removidas primeiro.
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Diretório da cache: na cache do utilizador ($XDG_CACHE_HOME, por omissão
+# ~/.cache), fora da árvore do compilador, que pode estar instalada só para
+# leitura. Pode ser alterado com PASCAL_CACHE_DIR, como as tabelas LALR.
+CACHE_DIR = os.path.join(os.environ.get('PASCAL_CACHE_DIR')
+                         or os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'),
+                                         'pascal-compilador'),
+                         'compilacao')
+
+# Tamanho máximo da cache em MiB (PASCAL_CACHE_MAX_MB)
+LIMITE_MB = float(os.environ.get('PASCAL_CACHE_MAX_MB', 64))
+
+# Diretórios que não influenciam o código gerado
+_IGNORADOS = {'benchmarks', 'exemplos', 'vm', 'cache', 'medicao', '__pycache__'}
+
+_versao = None
+
+def versao_compilador():
+    """Hash dos ficheiros .py do compilador (calculado uma vez por processo)."""
+    global _versao
+    if _versao is None:
+        h = hashlib.sha256()
+        for pasta, subpastas, ficheiros in os.walk(RAIZ):
+            subpastas[:] = sorted(d for d in subpastas if d not in _IGNORADOS and not d.startswith('.'))
+            for nome in sorted(ficheiros):
+                if nome.endswith('.py'):
+                    caminho = os.path.join(pasta, nome)
+                    h.update(os.path.relpath(caminho, RAIZ).encode())
+                    with open(caminho, 'rb') as f:
+                        h.update(f.read())
+        _versao = h.hexdigest()
+    return _versao
+
+class CacheCompilacao:
+    def __init__(self, diretorio=None, limite_mb=None):
+        self.diretorio = diretorio or CACHE_DIR
+        self.limite = int((LIMITE_MB if limite_mb is None else limite_mb) * 2**20)
+        self.acertos = 0
+        self.falhas = 0
+        os.makedirs(self.diretorio, exist_ok=True)
+
+    def chave(self, codigo, **opcoes):
+        h = hashlib.sha256()
+        h.update(versao_compilador().encode())
+        h.update(json.dumps(opcoes, sort_keys=True).encode())
+        h.update(codigo.encode('utf-8'))
+        return h.hexdigest()
+
+    def _caminho(self, chave, extensao):
+        return os.path.join(self.diretorio, chave + extensao)
+
+    def obter(self, chave, destino):
+        """Copia o .vm guardado para `destino` e devolve o relatório de otimizações
+        (dict) associado, ou None se a entrada não existir."""
+        caminho = self._caminho(chave, '.vm')
+        try:
+            shutil.copyfile(caminho, destino)
+        except FileNotFoundError:
+            self.falhas += 1
+            return None
+        os.utime(caminho)           # marca a entrada como usada recentemente (LRU)
+
+        relatorio = {}
+        try:
+            with open(self._caminho(chave, '.json'), encoding='utf-8') as f:
+                relatorio = json.load(f)
+        except (FileNotFoundError, ValueError):
+            pass
+        self.acertos += 1
+        return relatorio
+
+    def guardar(self, chave, origem, relatorio=None):
+        """Guarda o ficheiro `origem` (o .vm gerado) na entrada `chave`."""
+        # O relatório é escrito primeiro: a entrada só passa a existir com o .vm
+        if relatorio:
+            self._escrever(chave, '.json', lambda f: f.write(json.dumps(relatorio).encode('utf-8')))
+        with open(origem, 'rb') as fonte:
+            self._escrever(chave, '.vm', lambda f: shutil.copyfileobj(fonte, f))
+
+    def _escrever(self, chave, extensao, escrever):
+        fd, temporario = tempfile.mkstemp(dir=self.diretorio, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                escrever(f)
+            os.replace(temporario, self._caminho(chave, extensao))
+        except BaseException:
+            os.unlink(temporario)
+            raise
+
+    def limitar(self):
+        """Remove as entradas menos usadas até o tamanho total caber no limite.
+        Devolve o número de entradas removidas."""
+        entradas = []
+        total = 0
+        with os.scandir(self.diretorio) as it:
+            for e in it:
+                if e.name.endswith('.vm'):
+                    st = e.stat()
+                    chave = e.name[:-3]
+                    tamanho = st.st_size
+                    try:
+                        tamanho += os.path.getsize(self._caminho(chave, '.json'))
+                    except OSError:
+                        pass
+                    entradas.append((st.st_mtime, chave, tamanho))
+                    total += tamanho
+
+        removidas = 0
+        for _, chave, tamanho in sorted(entradas):
+            if total <= self.limite:
+                break
+            for extensao in ('.vm', '.json'):
+                try:
+                    os.unlink(self._caminho(chave, extensao))
+                except FileNotFoundError:
+                    pass
+            total -= tamanho
+            removidas += 1
+        return removidas
@@ -1,477 +1,796 @@
 # gerador/gerador_vm.py
 
+import gc
+
+from arvore.nos import (Programa, DeclVar, DeclConst, Subprograma, TipoArray,
+                        Atribuicao, Escrever, Ler, Se, Enquanto, Para,
+                        Num, Str, Bool, Id, AcessoArray, BinOp, Not, Chamada)
+from arvore import nos
+from gerador.ir import CodigoVM, Instr
+from otimizador import chamadas, ciclos, limites, literais, subexpressoes
+
 class GeradorVM:
-    def __init__(self):
-        self.codigo = []        # Lista com código gerado
-        self.vars = {}        # Nome de variável -> endereço
-        self.arrays = {}      # Nome do array -> informações de base/start/size
-        self.next_addr = 0      # Endereço seguinte disponível
-        self.funcoes = {}     # Nome -> AST da função
+    # Operadores aritméticos: (instrução inteira, instrução real)
+    ARITMETICOS = {
+        '+': ('ADD', 'FADD'), '-': ('SUB', 'FSUB'), '*': ('MUL', 'FMUL'), '/': (None, 'FDIV'),
+    }
+
+    # Operadores binários que se traduzem diretamente numa instrução da VM
+    OPERADORES = {
+        '=': 'EQUAL', '<': 'INF', '<=': 'INFEQ', '>': 'SUP', '>=': 'SUPEQ',
+        'and': 'AND', 'or': 'OR', 'div': 'DIV', 'mod': 'MOD',
+    }
+
+    # Tamanho máximo (em nós da AST) de um subprograma folha expandido nas chamadas:
+    # chega para as funções auxiliares dos exemplos (BinToInt tem 28 nós)
+    ORCAMENTO_INLINE = 40
+
+    # Comparação com o resultado oposto (para saltar quando a condição é verdadeira)
+    CONTRARIOS = {'=': '<>', '<>': '=', '<': '>=', '>=': '<', '<=': '>', '>': '<='}
+
+    def __init__(self, otimizar=False, relatorio=None, estrito=False, orcamento_inline=ORCAMENTO_INLINE,
+                 verificar_limites=False):
+        self.otimizar = otimizar  # Otimizações de ciclos, subprogramas e inlining (-O)
+        self.relatorio = relatorio  # Counter das otimizações feitas (ou None)
+        self.estrito = estrito    # Condições avaliadas por inteiro (sem curto-circuito)
+        self.orcamento_inline = orcamento_inline  # Tamanho máximo (nós) de um subprograma expandido
+        self.verificar_limites = verificar_limites  # CHECK nos acessos a arrays não provados seguros
+        self.codigo = CodigoVM()  # Instruções geradas (IR)
+        self.vars = {}        # Nome de variável global -> endereço
+        self.locais = {}      # Nome -> posição relativa a fp no subprograma atual
+        self.arrays = {}      # Nome do array -> informações de start/size
+        self.next_addr = 0      # Endereço global seguinte disponível
+        self.funcoes = {}     # Nome -> nó Subprograma
         self.tipos = {}        # Nome -> tipo da variável
         self.label_count = 0   # Contador para labels únicos
+        self.profundidade = 0  # Valores acima de fp entre instruções (globais/locais e temporários)
+        self.acima = 0         # Valores já empilhados pela expressão em curso, acima da profundidade
+        self.expandidos = set()  # Subprogramas expandidos em cada chamada (inlining)
+        self.globais = None    # (tipos, arrays) do programa, a vista dos subprogramas
+        self.literais = {}     # Texto -> posição global (conjunto de constantes, -O)
+        self.invariantes = {}  # id(expressão) -> temporário com o seu valor (calculado antes do ciclo ou da instrução)
+        self.deslocados = {}   # Variável de controlo de for -> deslocamento d (guarda var - d)
+        self.intervalos = {}   # Variável de controlo de for -> (mín, máx) no corpo (--checked)
+        self.finais = {}       # id(chamada recursiva final) -> repor o resultado (-O, ver gen_func)
+
+    def _empilhar_variavel(self, d):
+        # Deixa no topo da pilha o valor inicial da variável (o endereço do
+        # array alocado ou 0) e regista o seu tipo
+        tipo = d.tipo
+        if isinstance(tipo, TipoArray):
+            self.codigo.emitir('PUSHI', tipo.tamanho)
+            self.codigo.emitir('ALLOCN')
+            self.arrays[d.nome] = {
+                'start': tipo.inicio,
+                'size': tipo.tamanho
+            }
+        else:
+            self.codigo.emitir('PUSHI', 0)
+            self.arrays.pop(d.nome, None)
+        self.tipos[d.nome] = tipo if isinstance(tipo, str) else 'ARRAY'
+
+    def _empilhar_constante(self, d):
+        match d.valor:
+            case Num(v):
+                self.codigo.emitir('PUSHF' if isinstance(v, float) else 'PUSHI', v)
+                self.tipos[d.nome] = 'REAL' if isinstance(v, float) else 'INTEGER'
+            case Str(v):
+                self.gen_texto(v)
+                self.tipos[d.nome] = 'STRING'
+            case Bool(v):
+                self.codigo.emitir('PUSHI', 1 if v else 0)
+                self.tipos[d.nome] = 'BOOLEAN'
+            case v:
+                raise Exception(f"Valor inválido em const: {v}")
+        self.arrays.pop(d.nome, None)
 
     def _registar_variavel_global(self, d):
-        tipo = d['type']
-        if isinstance(tipo, tuple) and tipo[0] == 'array':
-            tamanho = tipo[3]
-            self.codigo.append(f"PUSHI {tamanho}")
-            self.codigo.append("ALLOCN")
-            self.codigo.append(f"STOREG {self.next_addr}")
-            self.arrays[d['id']] = {
-                'base': self.next_addr,
-                'start': tipo[2],
-                'size': tamanho
-            }
-        self.vars[d['id']] = self.next_addr
-        self.tipos[d['id']] = tipo if isinstance(tipo, str) else tipo[0].upper()
+        if isinstance(d.tipo, TipoArray):
+            self._empilhar_variavel(d)
+            self.codigo.emitir('STOREG', self.next_addr)
+        else:
+            # As variáveis globais simples começam a 0 (reservadas por PUSHN)
+            self.tipos[d.nome] = d.tipo
+        self.vars[d.nome] = self.next_addr
         self.next_addr += 1
 
-    def gerar(self, ast):
-        if 'program' not in ast:
-            raise Exception("Erro: AST inválida")
+    def _registar_constante(self, d):
+        self._empilhar_constante(d)
+        self.vars[d.nome] = self.next_addr
+        self.codigo.emitir('STOREG', self.next_addr)
+        self.next_addr += 1
 
-        corpo = ast['program']['body']
-
-        # Declarações
-        for decls in corpo.get('decls', []):
-            if isinstance(decls, dict) and decls.get('type') in {'function', 'procedure'}:
-                self.funcoes[decls['id']] = decls
-
-                if decls['type'] == 'function':
-                    self.vars[decls['id']] = self.next_addr
-                    self.tipos[decls['id']] = decls['ret']
-                    self.next_addr += 1
-                continue  # ignora
-
-            if isinstance(decls, list):
-                for d in decls:
-                    if d.get('type') == 'const':
-                        self.vars[d['id']] = self.next_addr
-                        v = d['value']
-                        match v[0]:
-                            case 'num':
-                                self.codigo.append(f'PUSHF {v[1]}' if isinstance(v[1], float) else f'PUSHI {v[1]}')
-                                self.tipos[d['id']] = 'REAL' if isinstance(v[1], float) else 'INTEGER'
-                            case 'str':
-                                self.codigo.append(f'PUSHS "{v[1]}"')
-                                self.tipos[d['id']] = 'STRING'
-                            case 'bool':
-                                self.codigo.append(f'PUSHI {1 if v[1] else 0}')
-                                self.tipos[d['id']] = 'BOOLEAN'
-                            case _:
-                                raise Exception(f"Valor inválido em const: {v}")
-                        self.codigo.append(f'STOREG {self.next_addr}')
-                        self.next_addr += 1
-                    else:
-                        self._registar_variavel_global(d)
-                        
-            elif isinstance(decls, dict):
-                if decls.get('type') == 'const':
-                    self.vars[decls['id']] = self.next_addr
-                    v = decls['value']
-                    match v[0]:
-                        case 'num':
-                            self.codigo.append(f'PUSHF {v[1]}' if isinstance(v[1], float) else f'PUSHI {v[1]}')
-                            self.tipos[decls['id']] = 'REAL' if isinstance(v[1], float) else 'INTEGER'
-                        case 'str':
-                            self.codigo.append(f'PUSHS "{v[1]}"')
-                            self.tipos[decls['id']] = 'STRING'
-                        case 'bool':
-                            self.codigo.append(f'PUSHI {1 if v[1] else 0}')
-                            self.tipos[decls['id']] = 'BOOLEAN'
-                        case _:
-                            raise Exception(f"Valor inválido em const: {v}")
-                    self.codigo.append(f'STOREG {self.next_addr}')
-                    self.next_addr += 1
-                else:
-                    self._registar_variavel_global(decls)
+    def _carregar(self, nome):
+        # Empilha o valor de uma variável local (ou parâmetro) ou global
+        self._carregar_guardado(nome)
+        if self.deslocados and nome in self.deslocados:
+            self.codigo.emitir('PUSHI', self.deslocados[nome])
+            self.codigo.emitir('ADD')
+
+    def _carregar_guardado(self, nome):
+        # O valor tal como está na memória (sem desfazer o deslocamento)
+        posicao = self.locais.get(nome)
+        if posicao is not None:
+            self.codigo.emitir('PUSHL', posicao)
+        else:
+            self.codigo.emitir('PUSHG', self.vars[nome])
+
+    def _guardar(self, nome):
+        posicao = self.locais.get(nome)
+        if posicao is not None:
+            self.codigo.emitir('STOREL', posicao)
+        else:
+            self.codigo.emitir('STOREG', self.vars[nome])
 
+    def gerar(self, ast):
+        if not isinstance(ast, Programa):
+            raise Exception("Erro: AST inválida")
 
-        # Corpo principal
-        self.codigo.insert(0, 'START')
-        for stmt in corpo.get('stmts', []):
-            if stmt:
-                self.gen_stmt(stmt)
+        # O IR cresce com centenas de milhares de tuplos: com o GC cíclico ligado,
+        # cada coleção completa voltaria a percorrer a AST inteira (sem ciclos)
+        gc_ativo = gc.isenabled()
+        gc.disable()
+        try:
+            self._gerar_programa(ast.bloco)
+        finally:
+            if gc_ativo:
+                gc.enable()
+        return self.codigo
 
-        self.codigo.append('STOP')
+    def _gerar_programa(self, corpo):
+        self.codigo.emitir('START')
 
-        # Funções e procedimentos
+        # Declarações
+        for decl in corpo.decls:
+            match decl:
+                case Subprograma(nome):
+                    self.funcoes[nome] = decl
+                case DeclConst():
+                    self._registar_constante(decl)
+                case DeclVar():
+                    self._registar_variavel_global(decl)
+
+        # Conjunto de constantes (-O): cada texto repetido é criado uma única vez,
+        # numa posição global, e lido depois com PUSHG
+        if self.otimizar:
+            for texto in literais.conjunto_constantes(corpo):
+                self.codigo.emitir('PUSHS', texto)
+                self.codigo.emitir('STOREG', self.next_addr)
+                self.literais[texto] = self.next_addr
+                self.next_addr += 1
+                self.registar('literais: strings criadas uma única vez')
+
+        # As variáveis globais ocupam o fundo da pilha (gp[0..n-1]): são
+        # reservadas logo a seguir ao START, antes de qualquer outro valor
+        if self.next_addr:
+            self.codigo.instrs.insert(1, Instr('PUSHN', self.next_addr))
+
+        self.globais = (self.tipos, self.arrays)
+        if self.otimizar:
+            self.expandidos = chamadas.expansiveis(corpo, self.orcamento_inline)
+
+        # Corpo principal (fp = 0: os temporários ficam por cima das globais)
+        self.profundidade = self.next_addr
+        for stmt in corpo.stmts:
+            self.gen_stmt(stmt)
+
+        self.codigo.emitir('STOP')
+
+        # Funções e procedimentos (com -O, só os alcançáveis a partir do bloco
+        # principal que não foram expandidos em todas as chamadas)
+        usados = chamadas.alcancaveis(corpo) if self.otimizar else self.funcoes.keys()
         for nome, decl in self.funcoes.items():
-            self.gen_func(decl)
-
-        return self.codigo
-
-    def coerce_real(self, t1, t2):
-        if t1 == 'INTEGER' and t2 == 'REAL':
-            self.codigo.insert(-2, 'ITOF;')
-        elif t2 == 'INTEGER' and t1 == 'REAL':
-            self.codigo.insert(-1, 'ITOF;')
-
-    def tipo_expr(self, expr):
-        match expr:
-            case ('num', v):
-                return 'REAL' if isinstance(v, float) else 'INTEGER'
-            case ('str', _):  
-                return 'STRING'
-            case ('id', nome):
-                if nome in self.tipos:
-                    return self.tipos[nome]
-                raise Exception(f"Erro: tipo de variável '{nome}' desconhecido")
-            case ('+', e1, e2) | ('-', e1, e2) | ('*', e1, e2) | ('/', e1, e2):
-                t1 = self.tipo_expr(e1)
-                t2 = self.tipo_expr(e2)
-                if t1 == t2:
-                    return t1
-                if {'REAL', 'INTEGER'} == {t1, t2}:
-                    return 'REAL'
-            case _:
-                return 'INTEGER'
+            if nome in self.expandidos:
+                self.registar(f"subprogramas: '{nome}' removido (expandido nas chamadas)")
+            elif nome in usados:
+                self.gen_func(decl)
+            else:
+                self.registar(f"subprogramas: '{nome}' removido (nunca chamado)")
+
+    def coerce_real(self, tipo):
+        # Converte o operando acabado de gerar quando entra numa operação real
+        if tipo == 'INTEGER':
+            self.codigo.emitir('ITOF')
 
     def gen_func(self, decl):
-        lbl_inicio = f"FN{decl['id']}"
-        self.codigo.append(f'{lbl_inicio}:')
-        old_vars = self.vars.copy()
-        local_base = self.next_addr
-
-        for p in decl['params']:
-            self.vars[p['id']] = self.next_addr
-            self.tipos[p['id']] = p['type'] 
-            self.next_addr += 1
-
-        for d in decl['body'].get('decls', []):
-            if isinstance(d, list):
-                for v in d:
-                    self.vars[v['id']] = self.next_addr
-                    self.tipos[v['id']] = v['type']  
-                    self.next_addr += 1
-
-            elif isinstance(d, dict) and 'id' in d and 'type' in d:
-                    self.vars[d['id']] = self.next_addr
-                    self.tipos[d['id']] = d['type']
-                    self.next_addr += 1
-
-        for stmt in decl['body'].get('stmts', []):
-            if stmt:
-                self.gen_stmt(stmt)
-
-        self.codigo.append("RETURN")
-        self.vars = old_vars
+        # Registo de ativação (CALL faz fp apontar para o topo da pilha):
+        #   fp-n-1       resultado (só funções), reservado pelo chamador
+        #   fp-n..fp-1   os n parâmetros, empilhados pelo chamador
+        #   fp+0...      variáveis e constantes locais, empilhadas no prólogo
+        # O chamador retira os parâmetros depois do CALL; o resultado fica no topo.
+        #
+        # Com -O, as chamadas do subprograma a si próprio em posição final são
+        # um salto para FN<nome> (gen_chamada_final).
+        self.codigo.rotulo(f"FN{decl.nome}")
+        n_locais = self._entrar_subprograma(decl, 0)
+        self.profundidade = n_locais
+        if self.otimizar:
+            self.finais = chamadas.chamadas_finais(decl)
+        for stmt in decl.bloco.stmts:
+            self.gen_stmt(stmt)
+        self.finais = {}
+
+        # Epílogo: liberta os locais
+        if n_locais:
+            self.codigo.emitir('POP', n_locais)
+        self.codigo.emitir('RETURN')
+        self.locais = {}
+        self.tipos, self.arrays = self.globais
+
+    def _entrar_subprograma(self, decl, fp):
+        # Nomes visíveis no corpo de `decl` com o registo de ativação em `fp`
+        # (0 num CALL; a posição na pilha atual quando é expandido): resultado
+        # e parâmetros já estão na pilha, o prólogo empilha os locais.
+        # Devolve o número de locais.
+        n = len(decl.params)
+        self.locais = {}
+        self.tipos, self.arrays = self.globais[0].copy(), self.globais[1].copy()
+        if decl.eh_funcao:
+            self.locais[decl.nome] = fp - n - 1
+            self.tipos[decl.nome] = decl.ret
+            self.arrays.pop(decl.nome, None)
+        for i, p in enumerate(decl.params):
+            self.locais[p.nome] = fp + i - n
+            self.tipos[p.nome] = p.tipo
+            self.arrays.pop(p.nome, None)
+
+        # Prólogo: cada local é empilhado já com o seu valor inicial
+        n_locais = 0
+        for d in decl.bloco.decls:
+            match d:
+                case DeclConst():
+                    self._empilhar_constante(d)
+                case DeclVar():
+                    self._empilhar_variavel(d)
+                case _:
+                    continue
+            self.locais[d.nome] = fp + n_locais
+            n_locais += 1
+        return n_locais
 
     def gen_stmt(self, stmt):
-        match stmt:
-            case ('assign', ('id', nome), expr):
-                self.gen_expr(expr)
-                self.codigo.append(f'STOREG {self.vars[nome]}')
-
-            case ('assign', ('array', nome, idx_expr), valor_expr):
-                tipo = self.arrays[nome]
-                self.gen_expr(valor_expr)                  # valor
-                self.codigo.append(f'PUSHG {tipo["base"]}')  # base
-                self.gen_expr(idx_expr)                    # índice
-                if tipo["start"] != 0:
-                    self.codigo.append(f'PUSHI {tipo["start"]}')
-                    self.codigo.append('SUB')              
-                self.codigo.append('STOREN')
-
-            case ('writeln', exprs):
-                for e in exprs:
-                    tipo = self.tipo_expr(e)
+        # Despacho pelo tipo do nó com padrões de valor (case nos.X): é bastante
+        # mais rápido do que padrões de classe em ASTs grandes
+        match type(stmt):
+            case nos.Atribuicao | nos.Chamada if self.finais and id(stmt) in self.finais:
+                self.gen_chamada_final(stmt.expr if type(stmt) is nos.Atribuicao else stmt,
+                                       self.finais[id(stmt)])
+
+            case nos.Atribuicao if isinstance(stmt.alvo, Id):
+                comuns = self.gen_comuns([stmt.expr])
+                self.gen_expr(stmt.expr)
+                self._guardar(stmt.alvo.nome)
+                self.libertar_temporarios(0, comuns)
+
+            case nos.Atribuicao:
+                # STOREN espera o endereço, o índice e por fim o valor no topo
+                comuns = self.gen_comuns([ciclos.forma_indice(stmt.alvo.indice)[0], stmt.expr])
+                self._carregar(stmt.alvo.nome)                # base
+                tipo = self.arrays[stmt.alvo.nome]
+                self.gen_indice(stmt.alvo.indice, tipo["start"], tipo["size"])
+                self.acima += 2
+                self.gen_expr(stmt.expr)                      # valor
+                self.acima -= 2
+                self.codigo.emitir('STOREN')
+                self.libertar_temporarios(0, comuns)
+
+            case nos.Escrever if stmt.nova_linha:
+                comuns = self.gen_comuns(stmt.args)
+                for e in self._argumentos_escrita(stmt):
+                    tipo = e.tipo
+                    if tipo == 'STRING':
+                        self.gen_escrever_string(e)
+                        continue
                     self.gen_expr(e)
                     if tipo == 'INTEGER':
-                        self.codigo.append('STRI')
-                        self.codigo.append('WRITES')
+                        self.codigo.emitir('STRI')
+                        self.codigo.emitir('WRITES')
                     elif tipo == 'REAL':
-                        self.codigo.append('WRITEF')
-                    elif tipo == 'STRING':
-                        self.codigo.append('WRITES')
-                self.codigo.append('WRITELN')
-
-            case ('call', 'Write', exprs):
-                for e in exprs:
-                    tipo = self.tipo_expr(e)
+                        self.codigo.emitir('WRITEF')
+                    elif tipo == 'BOOLEAN':
+                        self.gen_booleano_para_string()
+                        self.codigo.emitir('WRITES')
+                self.codigo.emitir('WRITELN')
+                self.libertar_temporarios(0, comuns)
+
+            case nos.Escrever:
+                comuns = self.gen_comuns(stmt.args)
+                for e in self._argumentos_escrita(stmt):
+                    tipo = e.tipo
+                    if tipo == 'STRING':
+                        self.gen_escrever_string(e)
+                        continue
                     self.gen_expr(e)
                     if tipo == 'INTEGER':
-                        self.codigo.append('WRITEI')
+                        self.codigo.emitir('WRITEI')
                     elif tipo == 'REAL':
-                        self.codigo.append('WRITEF')
-                    elif tipo == 'STRING':
-                        self.codigo.append('WRITES')
-
-            case ('readln', destinos):
-                for destino in destinos:
-                    match destino:
-                        case ('id', nome):
-                            self.codigo.append('READ')
+                        self.codigo.emitir('WRITEF')
+                    elif tipo == 'BOOLEAN':
+                        self.gen_booleano_para_string()
+                        self.codigo.emitir('WRITES')
+                self.libertar_temporarios(0, comuns)
+
+            case nos.Ler:
+                for destino in stmt.alvos:
+                    match type(destino):
+                        case nos.Id:
+                            nome = destino.nome
+                            self.codigo.emitir('READ')
                             tipo = self.tipos[nome]
                             if tipo == 'INTEGER':
-                                self.codigo.append('ATOI')
+                                self.codigo.emitir('ATOI')
                             elif tipo == 'REAL':
-                                self.codigo.append('ATOF')
-                            self.codigo.append(f'STOREG {self.vars[nome]}')
-                            
-                        case ('array', nome, idx_expr):
-                            tipo = self.arrays[nome] 
-                            self.codigo.append(f'PUSHG {tipo["base"]}')
-                            self.gen_expr(idx_expr)
-                            if tipo["start"] != 0:
-                                self.codigo.append(f'PUSHI {tipo["start"]}')
-                                self.codigo.append('SUB')
-                                self.codigo.append('READ')
-                                self.codigo.append('ATOI')
-                                self.codigo.append('STOREN')
-
-            case ('call', 'Read', nomes):
-                for nome in nomes:
-                    self.codigo.append('READ')
-                    self.codigo.append('ATOI')
-                    self.codigo.append(f'STOREG {self.vars[nome]}')
-
-            case ('if', cond, entao, senao):
-                self.gen_expr(cond)
+                                self.codigo.emitir('ATOF')
+                            self._guardar(nome)
+
+                        case nos.AcessoArray:
+                            self._carregar(destino.nome)
+                            tipo = self.arrays[destino.nome]
+                            self.gen_indice(destino.indice, tipo["start"], tipo["size"])
+                            self.codigo.emitir('READ')
+                            self.codigo.emitir('ATOI')
+                            self.codigo.emitir('STOREN')
+
+            case nos.Se:
                 lbl_else = self.nova_label()
                 lbl_fim = self.nova_label()
-                self.codigo.append(f'JZ {lbl_else}')
+                comuns = self.gen_comuns([], stmt.cond)
+                self.gen_condicao(stmt.cond, False, lbl_else)
 
-                then_block = entao if isinstance(entao, list) else [entao]
-                for stmt in then_block:
-                    self.gen_stmt(stmt)
+                for s in stmt.entao:
+                    self.gen_stmt(s)
 
-                self.codigo.append(f'JUMP {lbl_fim}')
-                self.codigo.append(f'{lbl_else}:')
+                self.codigo.emitir('JUMP', lbl_fim)
+                self.codigo.rotulo(lbl_else)
 
-                if senao:
-                    else_block = senao if isinstance(senao, list) else [senao]
-                    for stmt in else_block:
-                        self.gen_stmt(stmt)
+                for s in stmt.senao or []:
+                    self.gen_stmt(s)
 
-                self.codigo.append(f'{lbl_fim}:')
+                self.codigo.rotulo(lbl_fim)
+                self.libertar_temporarios(0, comuns)
 
-            case ('while', cond, corpo):
-                lbl_ini = self.nova_label()
-                lbl_fim = self.nova_label()
-                self.codigo.append(f'{lbl_ini}:')
-                self.gen_expr(cond)
-                self.codigo.append(f'JZ {lbl_fim}')
-                self.gen_stmt(corpo)
-                self.codigo.append(f'JUMP {lbl_ini}')
-                self.codigo.append(f'{lbl_fim}:')
-
-            case ('for', nome, ini, fim, direcao, corpo):
-                addr = self.vars[nome]
+            case nos.Enquanto:
+                movidas = self.gen_invariantes(stmt.cond, stmt.corpo)
                 lbl_ini = self.nova_label()
                 lbl_fim = self.nova_label()
-
-                self.gen_expr(ini)
-                self.codigo.append(f'STOREG {addr}')
-
-                self.codigo.append(f'{lbl_ini}:')
-                self.codigo.append(f'PUSHG {addr}')
-                self.gen_expr(fim)
-                if direcao.lower() == 'to':
-                    self.codigo.append('INFEQ')     
-                else:
-                    self.codigo.append('SUPEQ')     
-
-                self.codigo.append(f'JZ {lbl_fim}')
-
-                self.gen_stmt(corpo)
-
-                self.codigo.append(f'PUSHG {addr}')
-                self.codigo.append('PUSHI 1')
-                self.codigo.append('ADD' if direcao.lower() == 'to' else 'SUB')
-                self.codigo.append(f'STOREG {addr}')
-                self.codigo.append(f'JUMP {lbl_ini}')
-                self.codigo.append(f'{lbl_fim}:')
-
-            case ('call', nome, args):
-                func = self.funcoes[nome]
-                
-                param_base = self.next_addr
-
-                for i, a in enumerate(args):
-                    self.gen_expr(a)
-                    param_addr = param_base + i
-                    self.codigo.append(f'STOREG {param_addr}')
-
-                self.codigo.append(f'PUSHA FN{nome}')
-                self.codigo.append('CALL')
-
-                if 'ret' in func:
-                    self.codigo.append(f'PUSHG {self.vars[nome]}')
-
-            case list():
-                for s in stmt:
-                    if s:
-                        self.gen_stmt(s)
+                self.codigo.rotulo(lbl_ini)
+                comuns = self.gen_comuns([], stmt.cond)
+                self.gen_condicao(stmt.cond, False, lbl_fim)
+                for s in stmt.corpo:
+                    self.gen_stmt(s)
+                if comuns:
+                    self.codigo.emitir('POP', len(comuns))  # calculadas de novo em cada teste
+                self.codigo.emitir('JUMP', lbl_ini)
+                self.codigo.rotulo(lbl_fim)
+                self.libertar_temporarios(0, comuns + movidas)
+
+            case nos.Para:
+                self.gen_para(stmt)
+
+            case nos.Chamada:
+                self.gen_chamada(stmt)
+                if self.funcoes[stmt.nome].eh_funcao:
+                    self.codigo.emitir('POP', 1)    # resultado não usado
 
             case _:
                 raise Exception(f"Erro: instrução desconhecida {stmt}")
 
+    def gen_para(self, stmt):
+        # O limite é avaliado uma única vez, antes do ciclo (como no Pascal), e
+        # o teste fica no fim do corpo, para cada iteração fazer um só salto:
+        #
+        #       STORE var (início - d); [limite - d]; [invariantes]; JUMP teste
+        #   corpo:  ...; var := var ± 1
+        #   teste:  LOAD var; limite; SUP/INF; JZ corpo
+        #       [var := var + d]; [POP temporários]
+        #
+        # Com -O, d é o deslocamento da variável de indução (otimizador/ciclos.py).
+        var = stmt.var
+        estavel = False     # o corpo não altera var (nem uma chamada, se for global)
+        if self.otimizar or self.verificar_limites:
+            escritas, chamadas = ciclos.modificadas(stmt.corpo)
+            estavel = var not in escritas and not (chamadas and var not in self.locais)
+        deslocamento = 0
+        if self.otimizar and estavel and var not in self.deslocados:
+            deslocamento = ciclos.deslocamento_inducao(var, stmt.corpo, self._inicio_indices)
+        intervalo = None
+        if self.verificar_limites and estavel:
+            intervalo = limites.intervalo_controlo(stmt, self.intervalos)
+
+        self.gen_somado(stmt.inicio, -deslocamento)
+        self._guardar(var)
+        temporarios = 0
+        if type(stmt.fim) is nos.Num:
+            limite = ('PUSHI', stmt.fim.valor - deslocamento)
+        else:
+            self.gen_somado(stmt.fim, -deslocamento)
+            limite = ('PUSHL', self.profundidade)
+            self.profundidade += 1
+            temporarios = 1
+        movidas = self.gen_invariantes(None, stmt.corpo, var)
+
+        lbl_corpo = self.nova_label()
+        lbl_teste = self.nova_label()
+        self.codigo.emitir('JUMP', lbl_teste)
+        self.codigo.rotulo(lbl_corpo)
+        if deslocamento:
+            self.deslocados[var] = deslocamento
+            self.registar('ciclos: variáveis de indução deslocadas')
+        if intervalo:
+            self.intervalos[var] = intervalo
+        for s in stmt.corpo:
+            self.gen_stmt(s)
+        self.deslocados.pop(var, None)
+        self.intervalos.pop(var, None)
+        self._carregar_guardado(var)
+        self.codigo.emitir('PUSHI', 1)
+        self.codigo.emitir('SUB' if stmt.descendente else 'ADD')
+        self._guardar(var)
+
+        self.codigo.rotulo(lbl_teste)
+        self._carregar_guardado(var)
+        self.codigo.emitir(*limite)
+        self.codigo.emitir('INF' if stmt.descendente else 'SUP')
+        self.codigo.emitir('JZ', lbl_corpo)
+
+        if deslocamento:
+            self._carregar_guardado(var)
+            self._somar(deslocamento)
+            self._guardar(var)
+        self.libertar_temporarios(temporarios, movidas)
+
+    def gen_indice(self, indice, inicio, tamanho=None):
+        # Empilha a posição do elemento, índice - início. Num índice `e ± c` as
+        # constantes juntam-se, e com a variável de indução deslocada em d a
+        # constante a somar passa a c + d - início (muitas vezes 0). O array ou
+        # a string já está na pilha.
+        base, constante = ciclos.forma_indice(indice)
+        if self.invariantes and id(indice) in self.invariantes:
+            base, constante = indice, 0
+        if type(base) is nos.Id and base.nome in self.deslocados:
+            self._carregar_guardado(base.nome)
+            self._somar(constante + self.deslocados[base.nome] - inicio)
+        else:
+            self.acima += 1
+            self.gen_somado(base, constante - inicio)
+            self.acima -= 1
+        if tamanho is not None and self.verificar_limites:
+            self.gen_verificacao(indice, inicio, tamanho)
+
+    def gen_verificacao(self, indice, inicio, tamanho):
+        # --checked: a posição no topo da pilha tem de estar em [0, tamanho - 1],
+        # a não ser que a análise de intervalos prove que está sempre
+        if limites.dentro(indice, self.intervalos, inicio, tamanho):
+            self.registar('limites: acessos provados seguros')
+        else:
+            self.codigo.emitir('CHECK', (0, tamanho - 1))
+            self.registar('limites: acessos verificados em execução')
+
+    def gen_somado(self, expr, constante):
+        # Empilha expr + constante (somada diretamente aos literais inteiros)
+        if type(expr) is nos.Num and type(expr.valor) is int:
+            self.codigo.emitir('PUSHI', expr.valor + constante)
+        else:
+            self.gen_expr(expr)
+            self._somar(constante)
+
+    def _somar(self, constante):
+        if constante > 0:
+            self.codigo.emitir('PUSHI', constante)
+            self.codigo.emitir('ADD')
+        elif constante < 0:
+            self.codigo.emitir('PUSHI', -constante)
+            self.codigo.emitir('SUB')
+
+    def _inicio_indices(self, nome):
+        # Valor subtraído aos índices de `nome` (para ciclos.deslocamento_inducao)
+        if nome in self.arrays:
+            return self.arrays[nome]["start"]
+        return 1 if self.tipos.get(nome) == 'STRING' else None
+
+    def gen_invariantes(self, cond, corpo, var=None):
+        # Com -O, calcula antes do ciclo as subexpressões invariantes do corpo
+        # (e da condição), que ficam em temporários na pilha; dentro do ciclo
+        # gen_expr lê-as com PUSHL. Devolve os grupos de expressões movidas.
+        if not self.otimizar:
+            return []
+        escritas, chamadas = ciclos.modificadas(corpo, cond)
+        if var is not None:
+            escritas.add(var)
+
+        def estavel(nome):
+            # Uma chamada pode alterar qualquer variável global
+            return nome not in escritas and not (chamadas and nome not in self.locais)
+
+        grupos = [g for g in ciclos.invariantes(cond, corpo, estavel)
+                  if id(g[0]) not in self.invariantes]
+        self._calcular_temporarios(grupos, 'ciclos: expressões invariantes movidas')
+        return grupos
+
+    def gen_comuns(self, expressoes, cond=None):
+        # Com -O, calcula antes da instrução as subexpressões que se repetem nas
+        # suas expressões e na condição `cond` (otimizador/subexpressoes.py),
+        # em temporários como as invariantes. Devolve os grupos calculados.
+        if not self.otimizar:
+            return []
+        condicionais = []
+        if cond is not None:
+            if self.estrito:
+                expressoes = expressoes + [cond]
+            else:
+                sempre, condicionais = subexpressoes.partes_condicao(cond)
+                expressoes = expressoes + sempre
+        grupos = subexpressoes.comuns(expressoes, condicionais, self.invariantes)
+        self._calcular_temporarios(grupos, 'subexpressões: calculadas uma única vez')
+        return grupos
+
+    def _calcular_temporarios(self, grupos, otimizacao):
+        # Empilha o valor de cada grupo num temporário, que gen_expr lê com PUSHL
+        for grupo in grupos:
+            self.gen_expr(grupo[0])
+            for e in grupo:
+                self.invariantes[id(e)] = self.profundidade
+            self.profundidade += 1
+            self.registar(otimizacao)
+
+    def libertar_temporarios(self, temporarios, movidas):
+        # Depois do ciclo (ou da instrução): retira da pilha o limite do for e
+        # as expressões calculadas antes
+        for grupo in movidas:
+            for e in grupo:
+                del self.invariantes[id(e)]
+        temporarios += len(movidas)
+        if temporarios:
+            self.codigo.emitir('POP', temporarios)
+            self.profundidade -= temporarios
+
+    def registar(self, otimizacao, n=1):
+        if self.relatorio is not None:
+            self.relatorio[otimizacao] += n
+
+    def gen_escrever_string(self, e):
+        # Em gen_expr os literais de um carácter e os acessos s[i] dão o código
+        # do carácter (para comparações); na escrita têm de sair como texto
+        if isinstance(e, Str):
+            self.gen_texto(e.valor)
+            self.codigo.emitir('WRITES')
+        else:
+            self.gen_expr(e)
+            self.codigo.emitir('WRITECHR' if isinstance(e, AcessoArray) else 'WRITES')
+
+    def _argumentos_escrita(self, stmt):
+        # Com -O, as constantes seguidas são escritas como um só texto
+        if not self.otimizar:
+            return stmt.args
+        args, juntos = literais.juntar_escritas(stmt.args)
+        if juntos:
+            self.registar('literais: argumentos de escrita juntos', juntos)
+        return args
+
+    def gen_texto(self, texto):
+        # Empilha uma string literal (do conjunto de constantes, se lá estiver)
+        posicao = self.literais.get(texto)
+        if posicao is not None:
+            self.codigo.emitir('PUSHG', posicao)
+        else:
+            self.codigo.emitir('PUSHS', texto)
+
+    def gen_booleano_para_string(self):
+        # Converte o booleano no topo da pilha em 'TRUE'/'FALSE', como no Pascal
+        lbl_falso = self.nova_label()
+        lbl_fim = self.nova_label()
+        self.codigo.emitir('JZ', lbl_falso)
+        self.gen_texto('TRUE')
+        self.codigo.emitir('JUMP', lbl_fim)
+        self.codigo.rotulo(lbl_falso)
+        self.gen_texto('FALSE')
+        self.codigo.rotulo(lbl_fim)
+
+    def gen_chamada(self, chamada):
+        # O chamador reserva o lugar do resultado (funções) e empilha os
+        # argumentos, que formam o início do registo de ativação (ver gen_func);
+        # depois do CALL retira-os e só o resultado fica na pilha
+        decl = self.funcoes[chamada.nome]
+        acima = self.acima
+        if decl.eh_funcao:
+            self.codigo.emitir('PUSHI', 0)
+            self.acima += 1
+        for a in chamada.args:
+            self.gen_expr(a)
+            self.acima += 1
+        self.acima = acima
+
+        if chamada.nome in self.expandidos:
+            self.gen_expansao(decl)
+            return
+        self.codigo.emitir('PUSHA', f'FN{chamada.nome}')
+        self.codigo.emitir('CALL')
+        if chamada.args:
+            self.codigo.emitir('POP', len(chamada.args))
+
+    def gen_chamada_final(self, chamada, repor_resultado):
+        # Chamada recursiva em posição final: os argumentos passam a ser os
+        # parâmetros do registo de ativação atual e salta-se para o início do
+        # subprograma, cujo prólogo volta a empilhar os locais. O resultado
+        # fica no lugar de sempre e a pilha não cresce com a recursão.
+        decl = self.funcoes[chamada.nome]
+        acima = self.acima
+        for a in chamada.args:
+            self.gen_expr(a)
+            self.acima += 1
+        self.acima = acima
+        for p in reversed(decl.params):
+            self.codigo.emitir('STOREL', self.locais[p.nome])
+        if repor_resultado:
+            self.codigo.emitir('PUSHI', 0)
+            self.codigo.emitir('STOREL', self.locais[decl.nome])
+        if self.profundidade:
+            self.codigo.emitir('POP', self.profundidade)    # locais e temporários
+        self.codigo.emitir('JUMP', f'FN{decl.nome}')
+        self.registar('subprogramas: chamadas recursivas finais em salto')
+
+    def gen_expansao(self, decl):
+        # Inlining: o corpo de `decl` é gerado no lugar da chamada, com o registo
+        # de ativação montado na pilha como para o CALL (resultado e argumentos
+        # já empilhados), mas com fp virtual na posição atual do topo. Os locais
+        # ocupam posições novas, as etiquetas vêm de nova_label e só ficam
+        # visíveis os nomes do subprograma e as globais.
+        fp = self.profundidade + self.acima + decl.eh_funcao + len(decl.params)
+        chamador = (self.locais, self.tipos, self.arrays,
+                    self.deslocados, self.intervalos, self.profundidade, self.acima)
+        self.deslocados = {}
+        self.intervalos = {}
+        n_locais = self._entrar_subprograma(decl, fp)
+        self.profundidade = fp + n_locais
+        self.acima = 0
+        for stmt in decl.bloco.stmts:
+            self.gen_stmt(stmt)
+
+        # Retira os locais e os argumentos; o resultado fica no topo
+        if n_locais + len(decl.params):
+            self.codigo.emitir('POP', n_locais + len(decl.params))
+        (self.locais, self.tipos, self.arrays,
+         self.deslocados, self.intervalos, self.profundidade, self.acima) = chamador
+        self.registar('inlining: chamadas expandidas')
+
     def gen_expr(self, expr):
-        match expr:
-            case ('num', valor):
-                if isinstance(valor, float):
-                    self.codigo.append(f'PUSHF {valor}')
+        if self.invariantes and id(expr) in self.invariantes:
+            # Calculada antes do ciclo (gen_invariantes)
+            self.codigo.emitir('PUSHL', self.invariantes[id(expr)])
+            return
+        match type(expr):
+            case nos.Num:
+                if isinstance(expr.valor, float):
+                    self.codigo.emitir('PUSHF', expr.valor)
                 else:
-                    self.codigo.append(f'PUSHI {valor}')
+                    self.codigo.emitir('PUSHI', expr.valor)
 
-            case ('str', texto):
+            case nos.Id:
+                self._carregar(expr.nome)
+
+            case nos.BinOp:
+                self.gen_binop(expr)
+
+            case nos.Str:
+                texto = expr.valor
                 if len(texto) == 1:
-                    self.codigo.append(f'PUSHI {ord(texto)}')  
+                    self.codigo.emitir('PUSHI', ord(texto))
                 else:
-                    self.codigo.append(f'PUSHS "{texto}"')
-
-            case ('id', nome):
-                self.codigo.append(f'PUSHG {self.vars[nome]}')
+                    self.gen_texto(texto)
 
-            case ('bool', valor):
-                if valor is True:
-                    self.codigo.append('PUSHI 1')
+            case nos.Bool:
+                if expr.valor is True:
+                    self.codigo.emitir('PUSHI', 1)
                 else:
-                    self.codigo.append('PUSHI 0')
+                    self.codigo.emitir('PUSHI', 0)
 
-            case ('array', nome, idx_expr):
+            case nos.AcessoArray:
+                nome = expr.nome
                 if nome in self.arrays:
+                    self._carregar(nome)
                     tipo = self.arrays[nome]
-                    self.codigo.append(f'PUSHG {tipo["base"]}')  
-                    self.gen_expr(idx_expr)                    
-                    if tipo["start"] != 0:
-                        self.codigo.append(f'PUSHI {tipo["start"]}')
-                        self.codigo.append('SUB')
-                    self.codigo.append('LOADN')
-
-                elif nome in self.vars and self.tipo_expr(('id', nome)) == 'STRING':
-                        self.gen_expr(('id', nome))      
-                        self.gen_expr(idx_expr)          
-                        self.codigo.append('PUSHI 1')
-                        self.codigo.append('SUB')         
-                        self.codigo.append('CHARAT')     
+                    self.gen_indice(expr.indice, tipo["start"], tipo["size"])
+                    self.codigo.emitir('LOADN')
+
+                elif self.tipos.get(nome) == 'STRING':
+                        self._carregar(nome)
+                        self.gen_indice(expr.indice, 1)
+                        self.codigo.emitir('CHARAT')
                 else:
                     raise Exception(f"Erro: '{nome}' não é array nem string indexável")
                 
-            case ('not', e):
-                self.gen_expr(e)
-                self.codigo.append('NOT')
-
-            case ('+', e1, e2):
-                t1 = self.tipo_expr(e1)
-                t2 = self.tipo_expr(e2)
-                self.gen_expr(e1)
-                self.gen_expr(e2)
-                if t1 == t2 == 'STRING':
-                    self.codigo.append('CONCAT')
-                elif {'REAL', 'INTEGER'} == {t1, t2} or t1 == t2 == 'REAL':
-                    self.coerce_real(t1, t2)
-                    self.codigo.append('FADD')
-                else:
-                    self.codigo.append('ADD')
-
-            case ('-', e1, e2):
-                t1 = self.tipo_expr(e1)
-                t2 = self.tipo_expr(e2)
-                self.gen_expr(e1)
-                self.gen_expr(e2)
-                if {'REAL', 'INTEGER'} == {t1, t2} or t1 == t2 == 'REAL':
-                    self.coerce_real(t1, t2)
-                    self.codigo.append('FSUB')
-                else:
-                    self.codigo.append('SUB')
-
-            case ('*', e1, e2):
-                t1 = self.tipo_expr(e1)
-                t2 = self.tipo_expr(e2)
-                self.gen_expr(e1)
-                self.gen_expr(e2)
-                if {'REAL', 'INTEGER'} == {t1, t2} or t1 == t2 == 'REAL':
-                    self.coerce_real(t1, t2)
-                    self.codigo.append('FMUL')
-                else:
-                    self.codigo.append('MUL')
-
-            case ('/', e1, e2):
-                t1 = self.tipo_expr(e1)
-                t2 = self.tipo_expr(e2)
-                self.gen_expr(e1)
-                self.gen_expr(e2)
-                self.coerce_real(t1, t2)
-                self.codigo.append('FDIV')
-
-            case ('=', e1, e2):
-                self.gen_expr(e1)
-                self.gen_expr(e2)
-                self.codigo.append('EQUAL')  
-
-            case ('<>', e1, e2):
-                self.gen_expr(e1)
-                self.gen_expr(e2)
-                self.codigo.append('EQUAL')
-                self.codigo.append('NOT')
-
-            case ('<', e1, e2):
-                self.gen_expr(e1)
-                self.gen_expr(e2)
-                self.codigo.append('INF')    
-
-            case ('<=', e1, e2):
-                self.gen_expr(e1)
-                self.gen_expr(e2)
-                self.codigo.append('INFEQ')
-
-            case ('>', e1, e2):
-                self.gen_expr(e1)
-                self.gen_expr(e2)
-                self.codigo.append('SUP')    
-
-            case ('>=', e1, e2):
-                self.gen_expr(e1)
-                self.gen_expr(e2)
-                self.codigo.append('SUPEQ')  
-
-            case ('and', e1, e2):
-                self.gen_expr(e1)
-                self.gen_expr(e2)
-                self.codigo.append('AND')
-
-            case ('or', e1, e2):
-                self.gen_expr(e1)
-                self.gen_expr(e2)
-                self.codigo.append('OR')
-
-            case ('div', e1, e2):
-                self.gen_expr(e1)
-                self.gen_expr(e2)
-                self.codigo.append('DIV')
-
-            case ('mod', e1, e2):
-                self.gen_expr(e1)
-                self.gen_expr(e2)
-                self.codigo.append('MOD')
-
-            case ('call', 'length', [arg]):
-                self.gen_expr(arg)
-                self.codigo.append('STRLEN')  
-
-            case ('call', nome, args):
-                func = self.funcoes[nome]
-                
-                param_base = self.next_addr
+            case nos.Not:
+                self.gen_expr(expr.expr)
+                self.codigo.emitir('NOT')
 
-                for i, a in enumerate(args):
-                    self.gen_expr(a)
-                    param_addr = param_base + i
-                    self.codigo.append(f'STOREG {param_addr}')
+            case nos.Chamada if expr.nome == 'length':
+                self.gen_expr(expr.args[0])
+                self.codigo.emitir('STRLEN')
 
-                self.codigo.append(f'PUSHA FN{nome}')
-                self.codigo.append('CALL')
-
-                if 'ret' in func:
-                    self.codigo.append(f'PUSHG {self.vars[nome]}')  
+            case nos.Chamada:
+                self.gen_chamada(expr)
 
             case _:
                 raise Exception(f"Erro: expressão desconhecida {expr}")
 
+    def gen_binop(self, expr):
+        op, e1, e2 = expr.op, expr.esq, expr.dir
+
+        if op in self.ARITMETICOS:
+            t1 = e1.tipo
+            t2 = e2.tipo
+            real = op == '/' or 'REAL' in (t1, t2)
+            self.gen_expr(e1)
+            if real:
+                self.coerce_real(t1)
+            self.acima += 1
+            self.gen_expr(e2)
+            self.acima -= 1
+            if op == '+' and t1 == t2 == 'STRING':
+                self.codigo.emitir('CONCAT')
+            elif real:
+                self.coerce_real(t2)
+                self.codigo.emitir(self.ARITMETICOS[op][1])
+            else:
+                self.codigo.emitir(self.ARITMETICOS[op][0])
+            return
+
+        self.gen_expr(e1)
+        self.acima += 1
+        self.gen_expr(e2)
+        self.acima -= 1
+        self.gen_operador(op)
+
+    def gen_operador(self, op):
+        if op == '<>':
+            self.codigo.emitir('EQUAL')
+            self.codigo.emitir('NOT')
+        else:
+            self.codigo.emitir(self.OPERADORES[op])
+
+    def gen_condicao(self, cond, valor, lbl):
+        # Salta para `lbl` quando `cond` vale `valor` e continua na instrução
+        # seguinte no caso contrário. Em curto-circuito, o segundo operando de
+        # and/or só é avaliado quando o primeiro não decide o resultado e as
+        # comparações vão diretamente para o JZ (com a comparação contrária
+        # quando se salta no verdadeiro). Com `estrito`, a condição é avaliada
+        # por inteiro, como qualquer outra expressão.
+        if self.estrito or (self.invariantes and id(cond) in self.invariantes):
+            tipo = None
+        else:
+            tipo = type(cond)
+
+        if tipo is nos.Bool:
+            if cond.valor == valor:
+                self.codigo.emitir('JUMP', lbl)
+        elif tipo is nos.Not:
+            self.gen_condicao(cond.expr, not valor, lbl)
+        elif tipo is nos.BinOp and cond.op in ('and', 'or'):
+            if (cond.op == 'and') != valor:
+                # and falso / or verdadeiro: basta um dos operandos
+                self.gen_condicao(cond.esq, valor, lbl)
+                self.gen_condicao(cond.dir, valor, lbl)
+            else:
+                # and verdadeiro / or falso: o primeiro operando pode decidir o contrário
+                lbl_seguinte = self.nova_label()
+                self.gen_condicao(cond.esq, not valor, lbl_seguinte)
+                self.gen_condicao(cond.dir, valor, lbl)
+                self.codigo.rotulo(lbl_seguinte)
+        elif tipo is nos.BinOp and cond.op in self.CONTRARIOS:
+            self.gen_expr(cond.esq)
+            self.acima += 1
+            self.gen_expr(cond.dir)
+            self.acima -= 1
+            self.gen_operador(self.CONTRARIOS[cond.op] if valor else cond.op)
+            self.codigo.emitir('JZ', lbl)
+        else:
+            self.gen_expr(cond)
+            if valor:
+                self.codigo.emitir('NOT')
+            self.codigo.emitir('JZ', lbl)
+
 
     def nova_label(self):
         lbl = f"L{self.label_count}"
         self.label_count += 1
-        return lbl
\ No newline at end of file
+        return lbl
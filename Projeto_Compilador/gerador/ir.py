@@ -0,0 +1,132 @@
+# gerador/ir.py
+#
+# Representação intermédia (IR) do código da VM.
+# O gerador emite instruções estruturadas (opcode + operando) numa lista;
+# o texto da VM só é produzido no fim, com `CodigoVM.texto()`.
+#
+# Operandos:
+#   PUSHI/PUSHG/STOREG/PUSHL/STOREL/PUSHN/POP/DUP/...  -> int
+#   PUSHF                                               -> float
+#   PUSHS/ERR                                           -> str (sem aspas)
+#   JUMP/JZ/PUSHA                                       -> nome do rótulo
+#   CHECK                                               -> (int, int)
+# Os rótulos são instruções com op ROTULO e o nome como operando.
+
+from typing import NamedTuple
+
+ROTULO = ':'
+
+# Instruções que transferem o controlo para um rótulo
+SALTOS = {'JUMP', 'JZ'}
+
+# Instruções depois das quais a execução nunca continua na seguinte
+FIM_DE_FLUXO = {'JUMP', 'STOP', 'RETURN'}
+
+# Instruções cujo operando é uma string literal (escrita entre aspas)
+LITERAIS = {'PUSHS', 'ERR'}
+
+class Instr(NamedTuple):
+    # Tuplo imutável: é mais barato de criar do que uma dataclass e, como só
+    # contém strings e números, o garbage collector deixa de o seguir
+    op: str
+    arg: object = None
+
+    @property
+    def eh_rotulo(self):
+        return self.op == ROTULO
+
+    def __str__(self):
+        if self.op == ROTULO:
+            return f'{self.arg}:'
+        if self.arg is None:
+            return self.op
+        if self.op in LITERAIS:
+            return f'{self.op} "{self.arg}"'
+        if type(self.arg) is tuple:
+            return f'{self.op} {", ".join(map(str, self.arg))}'
+        return f'{self.op} {self.arg}'
+
+_nova = tuple.__new__       # constrói o Instr sem passar pelo __new__ gerado
+
+class CodigoVM:
+    """Sequência de instruções da VM, com tabela de rótulos e blocos básicos."""
+
+    __slots__ = ('instrs',)
+
+    def __init__(self, instrs=None):
+        self.instrs = instrs if instrs is not None else []
+
+    def emitir(self, op, arg=None):
+        self.instrs.append(_nova(Instr, (op, arg)))
+
+    def rotulo(self, nome):
+        self.instrs.append(_nova(Instr, (ROTULO, nome)))
+
+    def __len__(self):
+        return len(self.instrs)
+
+    def __iter__(self):
+        return iter(self.instrs)
+
+    def rotulos(self):
+        """Tabela de rótulos: nome -> índice da definição em `instrs`."""
+        return {i.arg: n for n, i in enumerate(self.instrs) if i.op == ROTULO}
+
+    def referenciados(self):
+        """Nomes dos rótulos usados por saltos ou por PUSHA."""
+        return {i.arg for i in self.instrs if i.op in SALTOS or i.op == 'PUSHA'}
+
+    def blocos(self):
+        """Divide as instruções em blocos básicos e devolve-os como pares (início, fim).
+
+        Um bloco começa num rótulo ou depois de um salto/STOP/RETURN e
+        corresponde à fatia instrs[início:fim]."""
+        blocos = []
+        inicio = 0
+        for n, i in enumerate(self.instrs):
+            if i.op == ROTULO and n > inicio:
+                blocos.append((inicio, n))
+                inicio = n
+            elif i.op in SALTOS or i.op in FIM_DE_FLUXO:
+                blocos.append((inicio, n + 1))
+                inicio = n + 1
+        if inicio < len(self.instrs):
+            blocos.append((inicio, len(self.instrs)))
+        return blocos
+
+    def texto(self):
+        """Converte o IR nas linhas de texto da VM."""
+        return [str(i) for i in self.instrs]
+
+    @classmethod
+    def de_texto(cls, linhas):
+        """Operação inversa de `texto`: lê as linhas de um ficheiro .vm."""
+        codigo = cls()
+        for n, linha in enumerate(linhas, 1):
+            linha = linha.strip()
+            if not linha or linha.startswith('//'):
+                continue
+            if linha.endswith(':') and ' ' not in linha:
+                codigo.rotulo(linha[:-1])
+                continue
+            op, _, arg = linha.partition(' ')
+            op = op.upper()
+            arg = arg.strip()
+            try:
+                codigo.emitir(op, _operando(op, arg))
+            except ValueError:
+                raise Exception(f"Erro: operando inválido na linha {n}: {linha}")
+        return codigo
+
+def _operando(op, arg):
+    if not arg:
+        return None
+    if op in LITERAIS:
+        return arg[arg.index('"') + 1:arg.rindex('"')]
+    if op in SALTOS or op == 'PUSHA':
+        return arg
+    if op == 'PUSHF':
+        return float(arg)
+    if ',' in arg:
+        return tuple(int(a) for a in arg.split(','))
+    return int(arg)
@@ -0,0 +1,89 @@
+# lexer/lexer_rapido.py
+#
+# Analisador léxico alternativo ao do PLY, para os ficheiros muito grandes.
+# Produz exatamente a mesma sequência de tokens (tipo, valor, linha e posição)
+# que o lexer de pascal_lexer.py, mas:
+#   - percorre o texto uma única vez com uma expressão regular em que cada
+#     alternativa é um grupo, e despacha pelo número do grupo (sem callbacks);
+#   - espaços, mudanças de linha e comentários são consumidos pela mesma
+#     expressão regular, sem passar por funções Python;
+#   - cada grafia de identificador é classificada (palavra reservada ou ID) e
+#     internada uma única vez por ficheiro: as seguintes são uma consulta num
+#     dicionário, sem criar a cópia em minúsculas. O dicionário é de cada
+#     chamada a `tokenizar`, para não crescer sem limite num processo que
+#     compila muitos ficheiros (modo batch, servidor).
+#
+# Seleciona-se com PASCAL_LEXER=rapido, com `parse(..., lexico='rapido')` ou
+# com a opção --lexer rapido do main.py.
+
+import re
+import sys
+from typing import NamedTuple
+
+from lexer import pascal_lexer
+from lexer.pascal_lexer import reserved
+
+# Operadores e delimitadores: texto -> tipo, a partir das regras t_X do lexer PLY
+OPERADORES = {
+    re.sub(r'\\(.)', r'\1', getattr(pascal_lexer, 't_' + tipo)): tipo
+    for tipo in pascal_lexer.tokens
+    if isinstance(getattr(pascal_lexer, 't_' + tipo, None), str)
+}
+
+# Uma alternativa por grupo, pela mesma ordem de prioridade do PLY (regras
+# definidas por funções primeiro, depois as strings da mais comprida para a
+# mais curta). Os comentários não contam as mudanças de linha, como no PLY.
+_PADRAO = re.compile(
+    r"([ \t]+)"                                     # 1: ignorados
+    r"|(\n+)"                                       # 2: mudanças de linha
+    r"|('(?:[^\\\n]|\\.)*?')"                       # 3: STRLIT
+    r"|(\d+(?:\.\d+)?)"                             # 4: NUMBER
+    r"|([a-zA-Z_][a-zA-Z0-9_]*)"                    # 5: ID / palavra reservada
+    r"|(\{[^}]*\})"                                 # 6: comentário
+    r"|(" + '|'.join(re.escape(o) for o in sorted(OPERADORES, key=len, reverse=True)) + r")"  # 7
+    r"|(.)")                                        # 8: carácter ilegal ('\n' é o grupo 2)
+_IGNORADO, _LINHAS, _STRLIT, _NUMBER, _ID, _COMENTARIO, _OPERADOR, _ILEGAL = range(1, 9)
+
+class Token(NamedTuple):
+    # Os atributos dos tokens do PLY usados pelo yacc. Um tuplo é mais barato
+    # de criar do que um LexToken; o yacc só atribui `lexer` a um token quando
+    # este ainda não o tem, antes de chamar p_error, daí o valor da classe.
+    type: str
+    value: object
+    lineno: int
+    lexpos: int
+    lexer = None
+
+_nova = tuple.__new__       # constrói o Token sem passar pelo __new__ gerado
+
+def _identificador(identificadores, texto):
+    tipo = reserved.get(texto.lower(), 'ID')
+    par = identificadores[texto] = (tipo, sys.intern(texto))
+    return par
+
+def tokenizar(data):
+    """Gera os tokens de `data`, com as linhas a começar em 1."""
+    identificadores = {}    # grafia -> (tipo, valor internado)
+    operadores = OPERADORES
+    linha = 1
+    for m in _PADRAO.finditer(data):
+        grupo = m.lastindex
+        if grupo == _IGNORADO:
+            continue
+        if grupo == _ID:
+            texto = m.group(grupo)
+            par = identificadores.get(texto) or _identificador(identificadores, texto)
+            yield _nova(Token, (par[0], par[1], linha, m.start()))
+        elif grupo == _OPERADOR:
+            texto = m.group(grupo)
+            yield _nova(Token, (operadores[texto], texto, linha, m.start()))
+        elif grupo == _LINHAS:
+            linha += m.end() - m.start()
+        elif grupo == _NUMBER:
+            texto = m.group(grupo)
+            yield _nova(Token, ('NUMBER', float(texto) if '.' in texto else int(texto), linha, m.start()))
+        elif grupo == _STRLIT:
+            yield _nova(Token, ('STRLIT', m.group(grupo)[1:-1], linha, m.start()))
+        elif grupo == _ILEGAL:
+            raise Exception(f'Carácter ilegal: {m.group(grupo)!r} na linha {linha}')
+        # _COMENTARIO: ignorado
@@ -129,8 +129,7 @@ def t_COMMENT(t):
 # Tratamento de erros léxicos
 # ---------------------------------------------
 def t_error(t):
-    print(f'Carácter ilegal: {t.value[0]!r} na linha {t.lineno}')
-    t.lexer.skip(1)
+    raise Exception(f'Carácter ilegal: {t.value[0]!r} na linha {t.lineno}')
 
 # ---------------------------------------------
 # Construção do analisador léxico
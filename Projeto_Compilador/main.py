@@ -1,38 +1,342 @@
 # main.py
 
+import argparse
+import contextlib
+import glob
+import json
+import os
+import platform
 import sys
-from parser.pascal_parser import parse
+import time
+import traceback
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from parser.pascal_parser import LEXICOS, parse, tokenizar
 from semantica.verificador import verificar
 from gerador.gerador_vm import GeradorVM
-import os
+from otimizador.constantes import otimizar_constantes
+from otimizador.peephole import otimizar_peephole
+from otimizador.globais import alocar_globais
+from vm.interpretador import MaquinaVirtual
+from cache.compilacao import CacheCompilacao
+from medicao.fases import FASES, PERFILADORES, MedidorFases, caminho_perfil, formatar_medidas
 
-def compilar(ficheiro_entrada):
-    with open(ficheiro_entrada, 'r', encoding='utf-8') as f:
-        codigo = f.read()
-    
-    # Etapa 1: Parser
-    ast = parse(codigo)
+def _sem_medicao(nome):
+    return contextlib.nullcontext()
+
+def compilar_codigo(codigo, otimizar=False, relatorio=None, medidor=None, lexico=None, estrito=False,
+                    orcamento_inline=GeradorVM.ORCAMENTO_INLINE, verificar_limites=False):
+    """Compila código Pascal em memória e devolve a lista de instruções da VM.
+
+    Com `otimizar`, as otimizações acrescentam as suas contagens ao Counter `relatorio`.
+    Com `medidor` (MedidorFases), cada fase é medida em separado. `lexico` escolhe
+    o analisador léxico ('ply' ou 'rapido'; por omissão o de PASCAL_LEXER). Com
+    `estrito`, as condições de if/while são avaliadas por inteiro (sem curto-circuito);
+    `orcamento_inline` é o tamanho máximo dos subprogramas expandidos com -O (0 desativa);
+    com `verificar_limites`, os acessos a arrays que não se provam seguros são verificados."""
+    fase = medidor.fase if medidor else _sem_medicao
+
+    # Etapa 1: Lexer e parser (o lexer só corre à parte quando é medido)
+    tokens = None
+    if medidor:
+        with fase('lex'):
+            tokens = tokenizar(codigo, lexico)
+    with fase('parse'):
+        ast = parse(codigo, tokens, lexico)
 
     # Etapa 2: Verificador semântico
-    verificar(ast)
+    with fase('verificar'):
+        verificar(ast)
+
+    # Etapa 2b: Otimizações sobre a AST (-O)
+    if otimizar:
+        with fase('constantes'):
+            ast = otimizar_constantes(ast)
 
     # Etapa 3: Geração de código VM
-    gerador = GeradorVM()
-    codigo_vm = gerador.gerar(ast)
+    with fase('gerar'):
+        gerador = GeradorVM(otimizar, relatorio, estrito, orcamento_inline, verificar_limites)
+        codigo_vm = gerador.gerar(ast)
+
+    # Etapa 4: Otimização peephole das instruções (-O)
+    if otimizar:
+        with fase('peephole'):
+            otimizar_peephole(codigo_vm, relatorio)
+        with fase('globais'):
+            alocar_globais(codigo_vm, relatorio)
+    with fase('texto'):
+        return codigo_vm.texto()
+
+def compilar(ficheiro_entrada, otimizar=False, relatorio=None, cache=None, medidor=None, lexico=None,
+             estrito=False, orcamento_inline=GeradorVM.ORCAMENTO_INLINE, verificar_limites=False):
+    with open(ficheiro_entrada, 'r', encoding='utf-8') as f:
+        codigo = f.read()
 
-    # Escreve para ficheiro .vm
     ficheiro_saida = os.path.splitext(ficheiro_entrada)[0] + '.vm'
-    with open(ficheiro_saida, 'w', encoding='utf-8') as f:
+    linhas = codigo.count('\n') + 1
+    fase = medidor.fase if medidor else _sem_medicao
+
+    # Acerto na cache: nenhuma fase é executada, o .vm guardado é copiado
+    if cache is not None:
+        with fase('cache'):
+            chave = cache.chave(codigo, otimizar=otimizar, estrito=estrito,
+                                orcamento_inline=orcamento_inline, verificar_limites=verificar_limites)
+            guardado = cache.obter(chave, ficheiro_saida)
+        if guardado is not None:
+            if relatorio is not None:
+                relatorio.update(guardado)
+            return linhas
+
+    codigo_vm = compilar_codigo(codigo, otimizar, relatorio, medidor, lexico, estrito, orcamento_inline,
+                                verificar_limites)
+
+    # Escreve para ficheiro .vm
+    with fase('escrita'), open(ficheiro_saida, 'w', encoding='utf-8') as f:
         for linha in codigo_vm:
             f.write(linha + '\n')
 
-if __name__ == '__main__':
-    if len(sys.argv) != 2:
-        print("Uso: python main.py <ficheiro.pas>")
-        sys.exit(1)
+    if cache is not None:
+        cache.guardar(chave, ficheiro_saida, relatorio)
+    return linhas
+
+_cache = None
 
-    ficheiro_entrada = sys.argv[1]
+def cache_do_processo():
+    """Cache de compilação partilhada por todas as compilações deste processo."""
+    global _cache
+    if _cache is None:
+        _cache = CacheCompilacao()
+    return _cache
+
+def compilar_seguro(ficheiro_entrada, otimizar=False, usar_cache=False,
+                    medir=False, perfis=None, detalhado=False, lexico=None, estrito=False,
+                    orcamento_inline=GeradorVM.ORCAMENTO_INLINE, verificar_limites=False):
+    """Compila um ficheiro e devolve (ficheiro, linhas, erro, relatorio, em_cache, medidas)
+    em vez de lançar exceções.
+
+    É a unidade de trabalho do modo batch: cada processo do pool importa o
+    lexer, o parser e o gerador uma única vez e reutiliza-os para todos os ficheiros.
+    Com `medir` ou `perfis`, `medidas` tem o tempo e as alocações de cada fase
+    (senão é None); com `detalhado`, o erro inclui o traceback completo."""
+    relatorio = Counter()
+    cache = cache_do_processo() if usar_cache else None
+    acertos = cache.acertos if cache else 0
+    medidor = None
+    if medir or perfis:
+        medidor = MedidorFases(perfis, os.path.splitext(ficheiro_entrada)[0])
     try:
-        compilar(ficheiro_entrada)
+        linhas = compilar(ficheiro_entrada, otimizar, relatorio, cache, medidor, lexico, estrito,
+                          orcamento_inline, verificar_limites)
+        erro = None
     except Exception as e:
-        print(f"❌ Erro na compilação: {e}")
+        linhas = 0
+        erro = traceback.format_exc().rstrip() if detalhado else str(e)
+    em_cache = erro is None and bool(cache) and cache.acertos > acertos
+    medidas = medidor.como_dict() if medidor else None
+    return ficheiro_entrada, linhas, erro, relatorio, em_cache, medidas
+
+def executar(ficheiro_entrada):
+    """Corre no interpretador o .vm gerado para `ficheiro_entrada` (--run)."""
+    ficheiro_vm = os.path.splitext(ficheiro_entrada)[0] + '.vm'
+    with open(ficheiro_vm, 'r', encoding='utf-8') as f:
+        maquina = MaquinaVirtual.de_texto(f)
+    sys.stdout.flush()
+    execucao = maquina.executar()
+    sys.stdout.flush()
+    print(f"\n⏱️  {ficheiro_vm}: {execucao.instrucoes} instruções executadas em "
+          f"{execucao.tempo * 1000:.2f} ms ({execucao.instrucoes_por_segundo / 1e6:.2f} M instr/s)",
+          file=sys.stderr)
+
+def executar_seguro(ficheiros):
+    """Executa os ficheiros compilados; devolve False se algum falhar."""
+    for ficheiro in ficheiros:
+        try:
+            executar(ficheiro)
+        except Exception as e:
+            print(f"❌ Erro na execução de {ficheiro}: {e}")
+            return False
+    return True
+
+def expandir_entradas(entradas):
+    """Expande ficheiros, diretórios (recursivamente) e globs numa lista de ficheiros .pas."""
+    ficheiros = []
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            encontrados = glob.glob(os.path.join(entrada, '**', '*.pas'), recursive=True)
+        elif glob.has_magic(entrada):
+            encontrados = glob.glob(entrada, recursive=True)
+        else:
+            encontrados = [entrada]
+        ficheiros.extend(sorted(encontrados))
+
+    # Remove duplicados mantendo a ordem
+    return list(dict.fromkeys(ficheiros))
+
+def compilar_batch(ficheiros, jobs=1, **opcoes):
+    """Compila os ficheiros (em `jobs` processos); as opções são as de `compilar_seguro`."""
+    tarefa = partial(compilar_seguro, **opcoes)
+    if jobs > 1 and len(ficheiros) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            chunksize = max(1, len(ficheiros) // (jobs * 4))
+            yield from pool.map(tarefa, ficheiros, chunksize=chunksize)
+    else:
+        for ficheiro in ficheiros:
+            yield tarefa(ficheiro)
+
+def perfil(valor):
+    """Converte 'FASE[:cprofile|tracemalloc]' no par (fase, perfilador) (--profile)."""
+    fase, _, perfilador = valor.partition(':')
+    perfilador = perfilador or 'cprofile'
+    if fase not in FASES:
+        raise argparse.ArgumentTypeError(f"fase desconhecida '{fase}' (fases: {', '.join(FASES)})")
+    if perfilador not in PERFILADORES:
+        raise argparse.ArgumentTypeError(f"perfilador desconhecido '{perfilador}' "
+                                         f"(perfiladores: {', '.join(PERFILADORES)})")
+    return fase, perfilador
+
+def argumentos():
+    ap = argparse.ArgumentParser(description='Compilador de Pascal Standard para a VM.')
+    ap.add_argument('entradas', nargs='+', metavar='ficheiro.pas',
+                    help='ficheiros, diretórios ou globs a compilar')
+    ap.add_argument('-j', '--jobs', type=int, default=1,
+                    help='número de processos a usar (0 = número de CPUs)')
+    ap.add_argument('-O', dest='otimizar', action='store_true',
+                    help='ativar as otimizações (dobragem de constantes, peephole, ...)')
+    ap.add_argument('--inline-budget', dest='orcamento_inline', type=int,
+                    default=GeradorVM.ORCAMENTO_INLINE, metavar='NÓS',
+                    help='com -O, expandir nas chamadas os subprogramas folha com até NÓS nós '
+                         'da AST (0 desativa; por omissão %(default)s)')
+    ap.add_argument('--relatorio', action='store_true',
+                    help='mostrar o que cada otimização fez (com -O)')
+    ap.add_argument('--strict-bool', dest='estrito', action='store_true',
+                    help='avaliar sempre os dois operandos de and/or nas condições (sem curto-circuito)')
+    ap.add_argument('--checked', dest='verificar_limites', action='store_true',
+                    help='verificar em execução os índices dos arrays que não se provam '
+                         'dentro dos limites em tempo de compilação')
+    ap.add_argument('--run', action='store_true',
+                    help='executar o código gerado no interpretador da VM')
+    ap.add_argument('--no-cache', dest='cache', action='store_false',
+                    help='compilar sempre, sem ler nem escrever a cache de compilação')
+    ap.add_argument('--timings', action='store_true',
+                    help='mostrar o tempo e as alocações de cada fase da compilação')
+    ap.add_argument('--timings-json', metavar='FICHEIRO',
+                    help='escrever as medidas de cada fase em JSON (para a CI)')
+    ap.add_argument('--profile', type=perfil, action='append', metavar='FASE[:PERFILADOR]',
+                    help='correr uma fase no cProfile (por omissão) ou no tracemalloc e guardar '
+                         'as estatísticas em <ficheiro>.<fase>.prof/.tracemalloc; desativa a cache')
+    ap.add_argument('--lexer', choices=LEXICOS,
+                    help='analisador léxico a usar (por omissão o de PASCAL_LEXER, ou ply)')
+    ap.add_argument('--traceback', action='store_true',
+                    help='mostrar o traceback completo dos erros de compilação')
+    args = ap.parse_args()
+    args.perfis = dict(args.profile or [])
+    if args.perfis:
+        args.cache = False      # um acerto na cache não executaria a fase a perfilar
+    args.medir = args.timings or bool(args.timings_json)
+    return args
+
+def mostrar_relatorio(relatorio):
+    print("\n📊 Relatório de otimizações:")
+    if not relatorio:
+        print("   (nada a otimizar)")
+    for regra, n in sorted(relatorio.items()):
+        print(f"   {regra}: {n}")
+
+def mostrar_medidas(titulo, medidas):
+    print(f"\n⏱️  Fases da compilação ({titulo}):", file=sys.stderr)
+    print(formatar_medidas(medidas), file=sys.stderr)
+
+def escrever_medidas_json(caminho, por_ficheiro, total, otimizar):
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump({
+            'python': platform.python_version(),
+            'otimizar': otimizar,
+            'ficheiros': por_ficheiro,
+            'total': total,
+        }, f, indent=2)
+        f.write('\n')
+
+def mostrar_perfis(ficheiros, perfis):
+    for ficheiro in ficheiros:
+        base = os.path.splitext(ficheiro)[0]
+        for fase, perfilador in perfis.items():
+            caminho = caminho_perfil(base, fase, perfilador)
+            if os.path.exists(caminho):
+                print(f"🔎 Perfil ({perfilador}) de '{fase}' em {caminho}", file=sys.stderr)
+
+if __name__ == '__main__':
+    args = argumentos()
+    ficheiros = expandir_entradas(args.entradas)
+    if not ficheiros:
+        print("❌ Nenhum ficheiro .pas encontrado")
+        sys.exit(1)
+
+    opcoes = dict(otimizar=args.otimizar, usar_cache=args.cache, medir=args.medir,
+                  perfis=args.perfis, detalhado=args.traceback, lexico=args.lexer,
+                  estrito=args.estrito, orcamento_inline=args.orcamento_inline,
+                  verificar_limites=args.verificar_limites)
+
+    # Um único ficheiro: comportamento clássico
+    if len(ficheiros) == 1:
+        _, _, erro, relatorio, _, medidas = compilar_seguro(ficheiros[0], **opcoes)
+        if args.cache:
+            cache_do_processo().limitar()
+        if medidas is not None:
+            if args.timings:
+                mostrar_medidas(ficheiros[0], medidas)
+            if args.timings_json:
+                escrever_medidas_json(args.timings_json, {ficheiros[0]: medidas}, medidas, args.otimizar)
+            mostrar_perfis(ficheiros, args.perfis)
+        if erro:
+            print(f"❌ Erro na compilação: {erro}")
+            sys.exit(1)
+        if args.relatorio:
+            mostrar_relatorio(relatorio)
+        if args.run and not executar_seguro(ficheiros):
+            sys.exit(1)
+        sys.exit(0)
+
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count()
+    inicio = time.perf_counter()
+    falhas = 0
+    total_linhas = 0
+    total_relatorio = Counter()
+    compilados = []
+    acertos = 0
+    medidas_por_ficheiro = {}
+    total_medidas = MedidorFases()
+    for ficheiro, linhas, erro, relatorio, em_cache, medidas in compilar_batch(ficheiros, jobs, **opcoes):
+        total_relatorio.update(relatorio)
+        acertos += em_cache
+        if medidas is not None:
+            medidas_por_ficheiro[ficheiro] = medidas
+            total_medidas.acumular(medidas)
+        if erro:
+            falhas += 1
+            print(f"❌ {ficheiro}: {erro}")
+        else:
+            total_linhas += linhas
+            compilados.append(ficheiro)
+            print(f"✅ {ficheiro}")
+    duracao = time.perf_counter() - inicio
+
+    print(f"\n{len(ficheiros) - falhas}/{len(ficheiros)} ficheiros compilados em {duracao:.3f}s "
+          f"({len(ficheiros) / duracao:.1f} ficheiros/s, {total_linhas / duracao:.0f} linhas/s, {jobs} processo(s))")
+    if args.cache:
+        removidas = cache_do_processo().limitar()
+        tentativas = len(ficheiros) - falhas
+        print(f"💾 Cache: {acertos} acerto(s), {tentativas - acertos} falha(s)"
+              + (f" ({100 * acertos / tentativas:.0f}% de acertos)" if tentativas else "")
+              + (f", {removidas} entrada(s) antigas removidas" if removidas else ""))
+    if args.timings:
+        mostrar_medidas(f"soma de {len(ficheiros)} ficheiros", total_medidas.como_dict())
+    if args.timings_json:
+        escrever_medidas_json(args.timings_json, medidas_por_ficheiro, total_medidas.como_dict(), args.otimizar)
+    mostrar_perfis(ficheiros, args.perfis)
+    if args.relatorio:
+        mostrar_relatorio(total_relatorio)
+    if args.run and not executar_seguro(compilados):
+        falhas += 1
+    sys.exit(1 if falhas else 0)
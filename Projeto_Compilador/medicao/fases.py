@@ -0,0 +1,90 @@
+# medicao/fases.py
+#
+# Instrumentação das fases do compilador (--timings e --profile do main.py).
+#
+# Cada fase é medida com `with medidor.fase('parse'): ...`: guarda o tempo de
+# parede, os blocos de memória que ficaram alocados no fim da fase
+# (sys.getallocatedblocks, que é barato) e o número de recolhas do garbage
+# collector. Uma fase pode ainda ser corrida dentro do cProfile ou do
+# tracemalloc, e as estatísticas são escritas num ficheiro.
+
+import cProfile
+import gc
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# Fases, pela ordem em que o compilador as executa
+FASES = ['cache', 'lex', 'parse', 'verificar', 'constantes', 'gerar', 'peephole', 'globais', 'texto', 'escrita']
+
+# Perfilador -> extensão do ficheiro de estatísticas
+PERFILADORES = {'cprofile': '.prof', 'tracemalloc': '.tracemalloc'}
+
+def caminho_perfil(destino, fase, perfilador):
+    """Ficheiro onde ficam as estatísticas de `fase` (ex.: exemplos/fatorial.parse.prof)."""
+    return f'{destino}.{fase}{PERFILADORES[perfilador]}'
+
+def _recolhas_gc():
+    return sum(g['collections'] for g in gc.get_stats())
+
+class MedidorFases:
+    def __init__(self, perfis=None, destino=None):
+        """`perfis`: dict fase -> perfilador ('cprofile' ou 'tracemalloc');
+        `destino`: prefixo dos ficheiros de estatísticas (<destino>.<fase>.prof)."""
+        self.perfis = perfis or {}
+        self.destino = destino
+        self.fases = {}             # fase -> {'ms', 'blocos', 'recolhas_gc'}
+
+    @contextmanager
+    def fase(self, nome):
+        perfilador = self.perfis.get(nome)
+        if perfilador == 'cprofile':
+            perfil = cProfile.Profile()
+        elif perfilador == 'tracemalloc':
+            tracemalloc.start(25)
+
+        blocos = sys.getallocatedblocks()
+        recolhas = _recolhas_gc()
+        inicio = time.perf_counter()
+        if perfilador == 'cprofile':
+            perfil.enable()
+        try:
+            yield
+        finally:
+            if perfilador == 'cprofile':
+                perfil.disable()
+            duracao = time.perf_counter() - inicio
+            medida = self.fases.setdefault(nome, {'ms': 0.0, 'blocos': 0, 'recolhas_gc': 0})
+            medida['ms'] += duracao * 1000
+            medida['blocos'] += sys.getallocatedblocks() - blocos
+            medida['recolhas_gc'] += _recolhas_gc() - recolhas
+
+            if perfilador == 'cprofile':
+                perfil.dump_stats(caminho_perfil(self.destino, nome, perfilador))
+            elif perfilador == 'tracemalloc':
+                instantaneo = tracemalloc.take_snapshot()
+                medida['pico_kib'] = tracemalloc.get_traced_memory()[1] / 1024
+                tracemalloc.stop()
+                instantaneo.dump(caminho_perfil(self.destino, nome, perfilador))
+
+    def como_dict(self):
+        """Medidas arredondadas, pela ordem das fases (para JSON)."""
+        return {nome: {k: round(v, 3) if type(v) is float else v for k, v in self.fases[nome].items()}
+                for nome in FASES if nome in self.fases}
+
+    def acumular(self, medidas):
+        """Soma as medidas de outra compilação (dict devolvido por `como_dict`)."""
+        for nome, medida in medidas.items():
+            total = self.fases.setdefault(nome, {'ms': 0.0, 'blocos': 0, 'recolhas_gc': 0})
+            for chave, valor in medida.items():
+                total[chave] = total.get(chave, 0) + valor
+
+def formatar_medidas(medidas):
+    """Tabela de texto com as medidas (dict devolvido por `como_dict`)."""
+    linhas = [f"   {'fase':<11} {'ms':>10} {'blocos':>10} {'GC':>4}"]
+    for nome, m in medidas.items():
+        linhas.append(f"   {nome:<11} {m['ms']:>10.2f} {m['blocos']:>10} {m['recolhas_gc']:>4}"
+                      + (f"   (pico {m['pico_kib']:.0f} KiB)" if 'pico_kib' in m else ''))
+    linhas.append(f"   {'total':<11} {sum(m['ms'] for m in medidas.values()):>10.2f}")
+    return '\n'.join(linhas)
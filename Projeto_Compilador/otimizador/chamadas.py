@@ -0,0 +1,127 @@
+# otimizador/chamadas.py
+#
+# Grafo de chamadas do programa, usado pelo GeradorVM com -O:
+#
+#  - só são gerados os subprogramas alcançáveis a partir do bloco principal:
+#    uma biblioteca de funções auxiliares partilhada por vários programas
+#    deixa de ocupar espaço no código de quem só usa algumas delas;
+#  - os subprogramas folha (que não chamam outros) pequenos são expandidos
+#    em cada chamada (inlining);
+#  - as chamadas recursivas em posição final (a última coisa que o
+#    subprograma faz) passam a um salto para o início, sem CALL.
+#
+# As funções só analisam: a AST não é alterada.
+
+from arvore import nos
+
+def nos_de(stmts):
+    """Gera todos os nós (instruções e expressões) de `stmts`, em pré-ordem."""
+    pendentes = list(reversed(stmts))
+    while pendentes:
+        no = pendentes.pop()
+        yield no
+        match type(no):
+            case nos.BinOp:
+                filhos = [no.esq, no.dir]
+            case nos.Not:
+                filhos = [no.expr]
+            case nos.AcessoArray:
+                filhos = [no.indice]
+            case nos.Chamada:
+                filhos = no.args
+            case nos.Atribuicao:
+                filhos = [no.alvo, no.expr]
+            case nos.Ler:
+                filhos = no.alvos
+            case nos.Escrever:
+                filhos = no.args
+            case nos.Se:
+                filhos = [no.cond, *no.entao, *(no.senao or [])]
+            case nos.Enquanto:
+                filhos = [no.cond, *no.corpo]
+            case nos.Para:
+                filhos = [no.inicio, no.fim, *no.corpo]
+            case _:
+                filhos = []
+        pendentes.extend(reversed(filhos))
+
+def chamados(stmts):
+    """Nomes de todos os subprogramas chamados (em instruções ou expressões) em `stmts`."""
+    return {no.nome for no in nos_de(stmts) if type(no) is nos.Chamada}
+
+def tamanho(decl):
+    """Tamanho de um subprograma: número de nós das suas instruções."""
+    return sum(1 for _ in nos_de(decl.bloco.stmts))
+
+def grafo_chamadas(bloco):
+    """Dicionário subprograma -> subprogramas que chama (o bloco principal é None).
+
+    As chamadas a rotinas pré-definidas (length, write, ...) não entram no grafo."""
+    funcoes = {d.nome: d for d in bloco.decls if isinstance(d, nos.Subprograma)}
+    grafo = {None: chamados(bloco.stmts) & funcoes.keys()}
+    for nome, decl in funcoes.items():
+        grafo[nome] = chamados(decl.bloco.stmts) & funcoes.keys()
+    return grafo
+
+def alcancaveis(bloco):
+    """Nomes dos subprogramas que podem ser chamados a partir do bloco principal."""
+    grafo = grafo_chamadas(bloco)
+    vistos = set()
+    pendentes = list(grafo[None])
+    while pendentes:
+        nome = pendentes.pop()
+        if nome not in vistos:
+            vistos.add(nome)
+            pendentes.extend(grafo[nome])
+    return vistos
+
+def expansiveis(bloco, orcamento):
+    """Subprogramas a expandir em cada chamada: as folhas alcançáveis com até
+    `orcamento` nós. Com orçamento 0, nenhum."""
+    if orcamento <= 0:
+        return set()
+    grafo = grafo_chamadas(bloco)
+    funcoes = {d.nome: d for d in bloco.decls if isinstance(d, nos.Subprograma)}
+    return {nome for nome in alcancaveis(bloco)
+            if not grafo[nome] and tamanho(funcoes[nome]) <= orcamento}
+
+def _atribui(no, nome):
+    # Se o nó escreve na variável (ou resultado de função) `nome`
+    match type(no):
+        case nos.Atribuicao:
+            return type(no.alvo) is nos.Id and no.alvo.nome == nome
+        case nos.Ler:
+            return any(type(a) is nos.Id and a.nome == nome for a in no.alvos)
+    return False
+
+def chamadas_finais(decl):
+    """Chamadas de `decl` a si próprio em posição final, como dicionário
+    id(instrução) -> se o resultado pode já ter sido atribuído antes.
+
+    Numa função a chamada final é `nome := nome(...)`, num procedimento a
+    chamada `nome(...)`, como última instrução do corpo ou, recursivamente,
+    dos ramos de um if que seja a última instrução. A chamada final de uma
+    função deixa o resultado por atribuir quando a chamada interna não o
+    atribui: se já foi atribuído antes no mesmo caminho, tem de voltar a 0."""
+    finais = {}
+
+    def eh_chamada(e):
+        return type(e) is nos.Chamada and e.nome == decl.nome
+
+    def visitar(stmts, antes):
+        # `antes`: instruções que podem ter corrido antes de `stmts` no mesmo caminho
+        if not stmts:
+            return
+        *anteriores, ultima = stmts
+        antes = antes + anteriores
+        match type(ultima):
+            case nos.Se:
+                visitar(ultima.entao, antes)
+                visitar(ultima.senao or [], antes)
+            case nos.Chamada if not decl.eh_funcao and eh_chamada(ultima):
+                finais[id(ultima)] = False
+            case nos.Atribuicao if decl.eh_funcao and _atribui(ultima, decl.nome) and eh_chamada(ultima.expr):
+                finais[id(ultima)] = any(_atribui(no, decl.nome) for no in nos_de(antes))
+
+    visitar(decl.bloco.stmts, [])
+    return finais
@@ -0,0 +1,237 @@
+# otimizador/ciclos.py
+#
+# Análise dos ciclos for/while usada pelo GeradorVM com -O:
+#
+#  - variáveis modificadas no ciclo (atribuições, readln, variáveis de
+#    controlo de for encaixados) e presença de chamadas a subprogramas;
+#  - expressões invariantes: subexpressões cujo valor não muda entre
+#    iterações, que o gerador calcula uma única vez antes do ciclo;
+#  - deslocamento da variável de indução: num `for i` cujos acessos a[i]
+#    subtraem o início do array, o ciclo pode percorrer i - início em vez
+#    de i, e os acessos deixam de fazer a subtração.
+#
+# As funções só analisam: a AST não é alterada.
+
+from arvore import nos
+
+def modificadas(stmts, cond=None):
+    """Devolve (nomes escritos no ciclo, se há chamadas a subprogramas).
+
+    Os nomes incluem os arrays cujos elementos são escritos. Com `cond`, conta
+    também a condição do ciclo, avaliada em cada iteração (pode chamar uma
+    função que escreve numa global)."""
+    nomes = set()
+    chamadas = [False]
+
+    def expr(e):
+        match type(e):
+            case nos.BinOp:
+                expr(e.esq)
+                expr(e.dir)
+            case nos.Not:
+                expr(e.expr)
+            case nos.AcessoArray:
+                expr(e.indice)
+            case nos.Chamada:
+                if e.nome != 'length':
+                    chamadas[0] = True
+                for a in e.args:
+                    expr(a)
+
+    def stmt(s):
+        match type(s):
+            case nos.Atribuicao:
+                nomes.add(s.alvo.nome)
+                if type(s.alvo) is nos.AcessoArray:
+                    expr(s.alvo.indice)
+                expr(s.expr)
+            case nos.Ler:
+                for alvo in s.alvos:
+                    nomes.add(alvo.nome)
+                    if type(alvo) is nos.AcessoArray:
+                        expr(alvo.indice)
+            case nos.Escrever:
+                for a in s.args:
+                    expr(a)
+            case nos.Se:
+                expr(s.cond)
+                for t in s.entao:
+                    stmt(t)
+                for t in s.senao or []:
+                    stmt(t)
+            case nos.Enquanto:
+                expr(s.cond)
+                for t in s.corpo:
+                    stmt(t)
+            case nos.Para:
+                nomes.add(s.var)
+                expr(s.inicio)
+                expr(s.fim)
+                for t in s.corpo:
+                    stmt(t)
+            case nos.Chamada:
+                chamadas[0] = True
+                for a in s.args:
+                    expr(a)
+
+    for s in stmts:
+        stmt(s)
+    if cond is not None:
+        expr(cond)
+    return nomes, chamadas[0]
+
+def chave(e):
+    """Chave estrutural de uma expressão (duas expressões iguais têm a mesma chave)."""
+    match type(e):
+        case nos.Num:
+            return ('num', type(e.valor), e.valor)
+        case nos.Str:
+            return ('str', e.valor)
+        case nos.Bool:
+            return ('bool', e.valor)
+        case nos.Id:
+            return ('id', e.nome)
+        case nos.BinOp:
+            return (e.op, chave(e.esq), chave(e.dir))
+        case nos.Not:
+            return ('not', chave(e.expr))
+        case nos.AcessoArray:
+            return ('[]', e.nome, chave(e.indice))
+        case nos.Chamada:
+            return ('()', e.nome, *(chave(a) for a in e.args))
+    return ('?', id(e))
+
+def expressoes(cond, stmts, alvos=False):
+    """Todas as expressões (de topo) avaliadas em cada iteração do ciclo.
+
+    Dos elementos de arrays escritos conta o índice ou, com `alvos`, o
+    próprio acesso a[i]."""
+    resultado = [cond] if cond is not None else []
+
+    def stmt(s):
+        match type(s):
+            case nos.Atribuicao:
+                if type(s.alvo) is nos.AcessoArray:
+                    resultado.append(s.alvo if alvos else s.alvo.indice)
+                resultado.append(s.expr)
+            case nos.Ler:
+                resultado.extend(a if alvos else a.indice for a in s.alvos if type(a) is nos.AcessoArray)
+            case nos.Escrever | nos.Chamada:
+                resultado.extend(s.args)
+            case nos.Se:
+                resultado.append(s.cond)
+                for t in s.entao:
+                    stmt(t)
+                for t in s.senao or []:
+                    stmt(t)
+            case nos.Enquanto:
+                resultado.append(s.cond)
+                for t in s.corpo:
+                    stmt(t)
+            case nos.Para:
+                resultado.append(s.inicio)
+                resultado.append(s.fim)
+                for t in s.corpo:
+                    stmt(t)
+
+    for s in stmts:
+        stmt(s)
+    return resultado
+
+def _pode_falhar(e):
+    # Uma expressão movida para antes do ciclo é avaliada mesmo que o corpo
+    # nunca corra: não pode ser uma que possa dar erro (divisão por zero)
+    return e.op in ('div', 'mod', '/') and not (type(e.dir) is nos.Num and e.dir.valor != 0)
+
+def invariantes(cond, stmts, estavel):
+    """Subexpressões invariantes do ciclo que vale a pena calcular antes dele.
+
+    `estavel(nome)` diz se a variável `nome` mantém o valor durante o ciclo.
+    Devolve uma lista de grupos (lista de nós com a mesma chave), pela ordem
+    da primeira ocorrência; só as subexpressões maximais são consideradas."""
+    grupos = {}
+
+    def invariante(e):
+        match type(e):
+            case nos.Num | nos.Str | nos.Bool:
+                return True
+            case nos.Id:
+                return estavel(e.nome)
+            case nos.Not:
+                return invariante(e.expr)
+            case nos.BinOp:
+                return invariante(e.esq) and invariante(e.dir) and not _pode_falhar(e)
+        return False        # acessos a arrays e chamadas
+
+    def visitar(e):
+        match type(e):
+            case nos.BinOp | nos.Not if invariante(e):
+                grupos.setdefault(chave(e), []).append(e)
+            case nos.BinOp:
+                visitar(e.esq)
+                visitar(e.dir)
+            case nos.Not:
+                visitar(e.expr)
+            case nos.AcessoArray:
+                visitar(e.indice)
+            case nos.Chamada:
+                for a in e.args:
+                    visitar(a)
+
+    for e in expressoes(cond, stmts):
+        visitar(e)
+    return list(grupos.values())
+
+def forma_indice(indice):
+    """Decompõe um índice na forma `base ± constante` e devolve (base, constante)."""
+    if type(indice) is nos.BinOp and indice.op in ('+', '-') \
+            and type(indice.dir) is nos.Num and type(indice.dir.valor) is int:
+        return indice.esq, indice.dir.valor if indice.op == '+' else -indice.dir.valor
+    return indice, 0
+
+def deslocamento_inducao(var, stmts, inicio_de):
+    """Deslocamento a aplicar à variável de controlo `var` de um for, ou 0.
+
+    `inicio_de(nome)` dá o valor subtraído aos índices de `nome` (início do
+    array, 1 nas strings, None se não for indexável). Com deslocamento d, o
+    ciclo guarda var - d: cada acesso `a[var ± c]` poupa a subtração quando
+    c + d = início, mas cada outra leitura de var passa a somar d. Escolhe-se
+    o deslocamento que mais poupa, se poupar alguma coisa."""
+    acessos = []            # (início, c) de cada a[var ± c]
+    outras = [0]
+
+    def expr(e):
+        match type(e):
+            case nos.Id:
+                if e.nome == var:
+                    outras[0] += 1
+            case nos.BinOp:
+                expr(e.esq)
+                expr(e.dir)
+            case nos.Not:
+                expr(e.expr)
+            case nos.AcessoArray:
+                base, c = forma_indice(e.indice)
+                inicio = inicio_de(e.nome)
+                if type(base) is nos.Id and base.nome == var and inicio is not None:
+                    acessos.append((inicio, c))
+                else:
+                    expr(e.indice)
+            case nos.Chamada:
+                for a in e.args:
+                    expr(a)
+
+    for e in expressoes(None, stmts, alvos=True):
+        expr(e)
+    if not acessos:
+        return 0
+
+    def poupanca(d):
+        # Cada ± constante não nula custa 2 instruções (PUSHI k; ADD/SUB)
+        total = -2 * outras[0] if d else 0
+        for inicio, c in acessos:
+            total += 2 * ((c - inicio != 0) - (c + d - inicio != 0))
+        return total
+
+    melhor = max(sorted({inicio - c for inicio, c in acessos}), key=poupanca)
+    return melhor if poupanca(melhor) > 0 else 0
@@ -0,0 +1,234 @@
+# otimizador/constantes.py
+#
+# Dobragem de constantes e simplificação algébrica sobre a AST já verificada
+# (corre entre `verificar` e `GeradorVM.gerar`, com a opção -O).
+#
+#  - avalia em tempo de compilação subexpressões aritméticas, booleanas e
+#    de comparação cujos operandos são literais;
+#  - propaga os valores dos blocos CONST para as suas utilizações e remove
+#    as declarações que deixam de ser necessárias;
+#  - elimina identidades (x*1, x+0, x-0, x div 1, not not b, true and b, ...)
+#    e inverte comparações negadas (not (a < b) passa a a >= b);
+#  - elimina ramos de if/while com condição constante.
+
+from arvore.nos import (DeclVar, DeclConst, Subprograma,
+                        Num, Str, Bool, BinOp, Not, Chamada)
+from arvore import nos
+
+_COMPARACOES = {
+    '=': lambda a, b: a == b,
+    '<>': lambda a, b: a != b,
+    '<': lambda a, b: a < b,
+    '<=': lambda a, b: a <= b,
+    '>': lambda a, b: a > b,
+    '>=': lambda a, b: a >= b,
+}
+
+# not (a < b) = a >= b, ...
+_INVERSAS = {'=': '<>', '<>': '=', '<': '>=', '>=': '<', '>': '<=', '<=': '>'}
+
+def otimizar_constantes(ast):
+    """Aplica a dobragem de constantes ao programa (in place) e devolve-o."""
+    bloco = ast.bloco
+    constantes = {}
+    bloco.decls = _dobrar_decls(bloco.decls, constantes)
+
+    for decl in bloco.decls:
+        if isinstance(decl, Subprograma):
+            # Parâmetros, variáveis locais e o nome da função escondem constantes globais
+            escondidos = {p.nome for p in decl.params} | {decl.nome}
+            escondidos |= {d.nome for d in decl.bloco.decls if isinstance(d, DeclVar)}
+            locais = {k: v for k, v in constantes.items() if k not in escondidos}
+            decl.bloco.decls = _dobrar_decls(decl.bloco.decls, locais)
+            decl.bloco.stmts = dobrar_stmts(decl.bloco.stmts, locais)
+
+    bloco.stmts = dobrar_stmts(bloco.stmts, constantes)
+    return ast
+
+def _dobrar_decls(decls, constantes):
+    resultado = []
+    for decl in decls:
+        if isinstance(decl, DeclConst):
+            decl.valor = dobrar_expr(decl.valor, constantes)
+            if _eh_literal(decl.valor):
+                # Todas as utilizações passam a usar o literal: a declaração desaparece
+                constantes[decl.nome] = decl.valor
+                continue
+        resultado.append(decl)
+    return resultado
+
+# -----------------------
+# Instruções
+# -----------------------
+
+def dobrar_stmts(stmts, constantes):
+    resultado = []
+    for stmt in stmts:
+        novo = dobrar_stmt(stmt, constantes)
+        if isinstance(novo, list):
+            resultado.extend(novo)
+        elif novo is not None:
+            resultado.append(novo)
+    return resultado
+
+def dobrar_stmt(stmt, constantes):
+    """Devolve a instrução simplificada, uma lista de instruções (ramo escolhido
+    de um if constante) ou None quando a instrução desaparece."""
+    match type(stmt):
+        case nos.Atribuicao:
+            _dobrar_alvo(stmt.alvo, constantes)
+            stmt.expr = dobrar_expr(stmt.expr, constantes)
+
+        case nos.Escrever | nos.Chamada:
+            stmt.args = [dobrar_expr(a, constantes) for a in stmt.args]
+
+        case nos.Ler:
+            for alvo in stmt.alvos:
+                _dobrar_alvo(alvo, constantes)
+
+        case nos.Se:
+            stmt.cond = dobrar_expr(stmt.cond, constantes)
+            stmt.entao = dobrar_stmts(stmt.entao, constantes)
+            stmt.senao = dobrar_stmts(stmt.senao, constantes) if stmt.senao else None
+            if isinstance(stmt.cond, Bool):
+                return stmt.entao if stmt.cond.valor else (stmt.senao or [])
+
+        case nos.Enquanto:
+            stmt.cond = dobrar_expr(stmt.cond, constantes)
+            stmt.corpo = dobrar_stmts(stmt.corpo, constantes)
+            if isinstance(stmt.cond, Bool) and not stmt.cond.valor:
+                return None
+
+        case nos.Para:
+            stmt.inicio = dobrar_expr(stmt.inicio, constantes)
+            stmt.fim = dobrar_expr(stmt.fim, constantes)
+            stmt.corpo = dobrar_stmts(stmt.corpo, constantes)
+
+    return stmt
+
+def _dobrar_alvo(alvo, constantes):
+    if isinstance(alvo, nos.AcessoArray):
+        alvo.indice = dobrar_expr(alvo.indice, constantes)
+
+# -----------------------
+# Expressões
+# -----------------------
+
+def dobrar_expr(expr, constantes):
+    match type(expr):
+        case nos.Id:
+            if expr.nome in constantes:
+                return _literal(constantes[expr.nome].valor, expr)
+
+        case nos.BinOp:
+            expr.esq = dobrar_expr(expr.esq, constantes)
+            expr.dir = dobrar_expr(expr.dir, constantes)
+            return _dobrar_binop(expr)
+
+        case nos.Not:
+            e = dobrar_expr(expr.expr, constantes)
+            if isinstance(e, Bool):
+                return _literal(not e.valor, expr)
+            if isinstance(e, Not):
+                return e.expr           # not not b
+            if isinstance(e, BinOp) and e.op in _INVERSAS:
+                e.op = _INVERSAS[e.op]
+                return e
+            expr.expr = e
+
+        case nos.AcessoArray:
+            expr.indice = dobrar_expr(expr.indice, constantes)
+
+        case nos.Chamada:
+            expr.args = [dobrar_expr(a, constantes) for a in expr.args]
+            if expr.nome == 'length' and isinstance(expr.args[0], Str):
+                return _literal(len(expr.args[0].valor), expr)
+
+    return expr
+
+def _dobrar_binop(expr):
+    op, e1, e2 = expr.op, expr.esq, expr.dir
+
+    if _eh_literal(e1) and _eh_literal(e2):
+        valor = _avaliar(op, e1.valor, e2.valor)
+        if valor is not None:
+            return _literal(valor, expr)
+
+    # Identidades algébricas: só quando o tipo do resultado não muda
+    if op in {'and', 'or'}:
+        neutro = op == 'and'      # true and b = b ; false or b = b
+        for constante, outro in ((e1, e2), (e2, e1)):
+            if isinstance(constante, Bool):
+                if constante.valor == neutro:
+                    return outro
+                if _sem_efeitos(outro):
+                    return _literal(not neutro, expr)
+        return expr
+
+    if op == '+':
+        if _eh_zero(e2) and e1.tipo == expr.tipo:
+            return e1
+        if _eh_zero(e1) and e2.tipo == expr.tipo:
+            return e2
+    elif op == '-':
+        if _eh_zero(e2) and e1.tipo == expr.tipo:
+            return e1
+    elif op == '*':
+        if _eh_um(e2) and e1.tipo == expr.tipo:
+            return e1
+        if _eh_um(e1) and e2.tipo == expr.tipo:
+            return e2
+    elif op == 'div':
+        if _eh_um(e2):
+            return e1
+    return expr
+
+def _avaliar(op, a, b):
+    """Avalia um operador sobre dois valores literais (None se não for possível)."""
+    if op in _COMPARACOES:
+        if type(a) is str and op not in {'=', '<>'}:
+            return None
+        return _COMPARACOES[op](a, b)
+    if op == 'and':
+        return a and b
+    if op == 'or':
+        return a or b
+    if type(a) is bool or type(a) is str or type(b) is str:
+        return None
+    if op == '+':
+        return a + b
+    if op == '-':
+        return a - b
+    if op == '*':
+        return a * b
+    if b == 0:
+        return None             # divisão por zero fica para a execução
+    if op == '/':
+        return a / b
+    # div e mod truncam em direção a zero
+    quociente = abs(a) // abs(b) * (1 if (a >= 0) == (b >= 0) else -1)
+    return quociente if op == 'div' else a - b * quociente
+
+def _literal(valor, origem):
+    """Cria o nó literal correspondente a `valor`, na posição e com o tipo de `origem`."""
+    pos = {'linha': origem.linha, 'coluna': origem.coluna}
+    if type(valor) is bool:
+        return Bool(valor, tipo='BOOLEAN', **pos)
+    if type(valor) is str:
+        return Str(valor, tipo='STRING', **pos)
+    if type(valor) is float:
+        return Num(valor, tipo='REAL', **pos)
+    return Num(valor, tipo='INTEGER', **pos)
+
+def _eh_literal(expr):
+    return type(expr) in (Num, Str, Bool)
+
+def _eh_zero(expr):
+    return type(expr) is Num and expr.valor == 0
+
+def _eh_um(expr):
+    return type(expr) is Num and expr.valor == 1
+
+def _sem_efeitos(expr):
+    """Uma expressão sem chamadas a subprogramas pode ser descartada sem alterar o programa."""
+    return not any(isinstance(n, Chamada) and n.nome != 'length' for n in nos.percorrer(expr))
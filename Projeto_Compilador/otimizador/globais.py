@@ -0,0 +1,138 @@
+# otimizador/globais.py
+#
+# Reutilização das posições globais (com a opção -O, depois do peephole).
+#
+# O GeradorVM dá a cada variável global, constante e string do conjunto de
+# constantes uma posição própria, reservada com o PUSHN a seguir ao START.
+# Muitas só estão vivas num troço do bloco principal (uma variável usada
+# num único ciclo, um texto escrito só no início), e duas posições cujas
+# vidas não se sobrepõem podem partilhar o mesmo endereço:
+#
+#  - análise de vivacidade (para trás, sobre os blocos básicos do bloco
+#    principal): uma posição está viva entre um STOREG/PUSHG e o PUSHG
+#    seguinte que a lê;
+#  - duas posições interferem se uma é escrita enquanto a outra está viva;
+#  - coloração gulosa do grafo de interferências, pela ordem das posições.
+#
+# As posições usadas nos subprogramas (depois do STOP) ficam onde estão: uma
+# chamada pode lê-las ou escrevê-las. No início todas as posições valem 0
+# (PUSHN), por isso partilhar uma posição lida antes de ser escrita não muda
+# o valor lido.
+#
+# Com menos posições, o PUSHN reserva menos e as variáveis locais do bloco
+# principal (temporários e subprogramas expandidos, endereçados com PUSHL a
+# partir de fp = 0, por cima da área global) descem o mesmo número de posições.
+
+from gerador.ir import Instr, ROTULO, SALTOS, FIM_DE_FLUXO
+
+GLOBAIS = {'PUSHG', 'STOREG'}
+LOCAIS = {'PUSHL', 'STOREL'}
+
+def alocar_globais(codigo, relatorio=None):
+    """Reatribui as posições globais do CodigoVM (in place) e devolve-o.
+
+    Se `relatorio` for um Counter, acrescenta-lhe o tamanho da área global
+    antes e depois."""
+    instrs = codigo.instrs
+    if not instrs or instrs[0].op != 'START':
+        return codigo
+    fim = next((n for n, i in enumerate(instrs) if i.op == 'STOP'), len(instrs) - 1) + 1
+    principal = instrs[:fim]
+    reservadas = len(instrs) > 1 and instrs[1].op == 'PUSHN'
+    antes = instrs[1].arg if reservadas else 0
+
+    fixas = sorted({i.arg for i in instrs[fim:] if i.op in GLOBAIS})
+    cor = {p: n for n, p in enumerate(fixas)}
+    interferencias = _interferencias(principal)
+    for p in sorted({i.arg for i in principal if i.op in GLOBAIS} - cor.keys()):
+        ocupadas = {cor[q] for q in interferencias.get(p, ()) if q in cor}
+        c = len(fixas)
+        while c in ocupadas:
+            c += 1
+        cor[p] = c
+    depois = max(cor.values(), default=-1) + 1
+    if depois > antes:
+        return codigo       # posições fora da área reservada: não se mexe
+    descida = antes - depois
+
+    novas = [instrs[0]]
+    if depois:
+        novas.append(Instr('PUSHN', depois))
+    for n, i in enumerate(instrs[1 + reservadas:], 1 + reservadas):
+        if i.op in GLOBAIS:
+            i = Instr(i.op, cor[i.arg])
+        elif i.op in LOCAIS and n < fim and descida:
+            i = Instr(i.op, i.arg - descida)
+        novas.append(i)
+    codigo.instrs = novas
+
+    if relatorio is not None:
+        relatorio['globais: posições antes'] += antes
+        relatorio['globais: posições depois'] += depois
+    return codigo
+
+def _interferencias(instrs):
+    """Grafo de interferências (posição -> posições) das posições globais de `instrs`."""
+    # Blocos básicos e sucessores
+    rotulos = {i.arg: n for n, i in enumerate(instrs) if i.op == ROTULO}
+    inicios = sorted({0} | set(rotulos.values())
+                     | {n + 1 for n, i in enumerate(instrs) if i.op in SALTOS or i.op in FIM_DE_FLUXO})
+    inicios = [n for n in inicios if n < len(instrs)]
+    blocos = list(zip(inicios, inicios[1:] + [len(instrs)]))
+    bloco_de = {inicio: b for b, (inicio, _) in enumerate(blocos)}
+    sucessores = []
+    for inicio, fim in blocos:
+        ultima = instrs[fim - 1]
+        seguintes = []
+        if ultima.op in SALTOS and ultima.arg in rotulos:
+            seguintes.append(bloco_de[rotulos[ultima.arg]])
+        if ultima.op not in FIM_DE_FLUXO and fim < len(instrs):
+            seguintes.append(bloco_de[fim])
+        sucessores.append(seguintes)
+
+    # Usos e definições de cada bloco, como conjuntos de bits
+    usos, definicoes = [], []
+    for inicio, fim in blocos:
+        usa = define = 0
+        for i in instrs[inicio:fim]:
+            if i.op == 'PUSHG' and not define >> i.arg & 1:
+                usa |= 1 << i.arg
+            elif i.op == 'STOREG':
+                define |= 1 << i.arg
+        usos.append(usa)
+        definicoes.append(define)
+
+    # Vivas à saída de cada bloco, até ao ponto fixo
+    saida = [0] * len(blocos)
+    alterado = True
+    while alterado:
+        alterado = False
+        for b in reversed(range(len(blocos))):
+            vivas = 0
+            for s in sucessores[b]:
+                vivas |= usos[s] | saida[s] & ~definicoes[s]
+            if vivas != saida[b]:
+                saida[b] = vivas
+                alterado = True
+
+    # Cada escrita interfere com as posições vivas a seguir a ela
+    grafo = {}
+    for (inicio, fim), vivas in zip(blocos, saida):
+        for i in reversed(instrs[inicio:fim]):
+            if i.op == 'STOREG':
+                p = i.arg
+                vivas &= ~(1 << p)
+                for q in _bits(vivas):
+                    grafo.setdefault(p, set()).add(q)
+                    grafo.setdefault(q, set()).add(p)
+            elif i.op == 'PUSHG':
+                vivas |= 1 << i.arg
+    return grafo
+
+def _bits(conjunto):
+    n = 0
+    while conjunto:
+        if conjunto & 1:
+            yield n
+        conjunto >>= 1
+        n += 1
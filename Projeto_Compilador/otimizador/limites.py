@@ -0,0 +1,69 @@
+# otimizador/limites.py
+#
+# Análise de intervalos para os acessos a arrays (modo --checked do GeradorVM).
+#
+# Cada expressão inteira recebe, quando possível, um intervalo [mín, máx] que
+# contém todos os valores que pode tomar: os literais, as variáveis de
+# controlo de ciclos for cujo valor o corpo não altera (entre os valores dos
+# limites) e as operações + - * e div/mod por constantes positivas. Um acesso
+# a[e] com o intervalo de `e` dentro dos limites do array não precisa de
+# verificação em tempo de execução; os restantes recebem um CHECK.
+#
+# As funções só analisam: a AST não é alterada.
+
+from arvore import nos
+
+def intervalo(e, conhecidos):
+    """Intervalo (mín, máx) dos valores de `e`, ou None se não for conhecido.
+
+    `conhecidos` é um dicionário variável -> intervalo."""
+    match type(e):
+        case nos.Num if type(e.valor) is int:
+            return (e.valor, e.valor)
+        case nos.Id:
+            return conhecidos.get(e.nome)
+        case nos.BinOp:
+            return _intervalo_binop(e, conhecidos)
+    return None
+
+def _intervalo_binop(e, conhecidos):
+    esq = intervalo(e.esq, conhecidos)
+    if esq is None:
+        return None
+    if e.op in ('div', 'mod'):
+        # Só com divisor constante positivo e dividendo não negativo
+        if type(e.dir) is not nos.Num or type(e.dir.valor) is not int or e.dir.valor <= 0 or esq[0] < 0:
+            return None
+        d = e.dir.valor
+        if e.op == 'div':
+            return (esq[0] // d, esq[1] // d)
+        return (0, min(d - 1, esq[1]))
+    dir = intervalo(e.dir, conhecidos)
+    if dir is None:
+        return None
+    match e.op:
+        case '+':
+            return (esq[0] + dir[0], esq[1] + dir[1])
+        case '-':
+            return (esq[0] - dir[1], esq[1] - dir[0])
+        case '*':
+            produtos = [a * b for a in esq for b in dir]
+            return (min(produtos), max(produtos))
+    return None
+
+def intervalo_controlo(para, conhecidos):
+    """Intervalo da variável de controlo de um for enquanto o corpo corre, ou None.
+
+    Só vale se o corpo não alterar a variável (o chamador verifica)."""
+    inicio = intervalo(para.inicio, conhecidos)
+    fim = intervalo(para.fim, conhecidos)
+    if inicio is None or fim is None:
+        return None
+    if para.descendente:
+        return (fim[0], inicio[1])
+    return (inicio[0], fim[1])
+
+def dentro(e, conhecidos, inicio, tamanho):
+    """Se todos os valores de `e` são índices válidos de [inicio..inicio+tamanho-1]."""
+    valores = intervalo(e, conhecidos)
+    return valores is not None and inicio <= valores[0] and valores[1] < inicio + tamanho
@@ -0,0 +1,123 @@
+# otimizador/literais.py
+#
+# Literais de texto, usados pelo GeradorVM com -O:
+#
+#  - os argumentos consecutivos de writeln/write com valor conhecido em tempo
+#    de compilação (strings, inteiros e booleanos literais) juntam-se num só
+#    texto, escrito com um único WRITES;
+#  - as strings usadas dentro de ciclos e de subprogramas, ou em pelo menos
+#    três sítios, vão para o conjunto de constantes: cada uma é criada uma
+#    única vez, a seguir ao START, numa posição global, e os usos passam a
+#    ser um PUSHG em vez de um PUSHS (que cria uma string nova na VM).
+#
+# As funções só analisam: a AST não é alterada.
+
+from collections import Counter
+
+from arvore import nos
+from otimizador.chamadas import alcancaveis, grafo_chamadas, nos_de
+
+# Usos a partir dos quais uma string passa para o conjunto de constantes: a
+# criação inicial custa um PUSHS e um STOREG a mais
+REPETIDO = 3
+
+def texto_constante(e):
+    """Texto que `e` escreve, se for conhecido em tempo de compilação (senão None)."""
+    match type(e):
+        case nos.Str:
+            return e.valor
+        case nos.Num if type(e.valor) is int:
+            return str(e.valor)
+        case nos.Bool:
+            return 'TRUE' if e.valor else 'FALSE'
+    return None
+
+def juntar_escritas(args):
+    """Argumentos de um writeln/write com cada sequência de constantes num só Str.
+
+    Devolve (argumentos, número de argumentos que deixaram de ser escritos à parte).
+    Os textos vazios desaparecem."""
+    resultado = []
+    juntos = 0
+    texto = None
+    for e in args + [None]:
+        constante = texto_constante(e) if e is not None else None
+        if constante is not None:
+            if texto is None:
+                texto, primeiro, n = constante, e, 1
+            else:
+                texto, n = texto + constante, n + 1
+            continue
+        if texto is not None:
+            juntos += n - 1
+            if texto:
+                resultado.append(nos.Str(texto, tipo='STRING', linha=primeiro.linha, coluna=primeiro.coluna))
+            else:
+                juntos += 1
+            texto = None
+        if e is not None:
+            resultado.append(e)
+    return resultado, juntos
+
+def conjunto_constantes(bloco):
+    """Textos a criar uma única vez no início do programa, pela ordem do código.
+
+    Conta os textos que o gerador escreve com PUSHS; um uso dentro de um ciclo,
+    ou de um subprograma que possa correr mais do que uma vez, conta como
+    repetido (peso REPETIDO)."""
+    usos = Counter()
+    chamadas = Counter()     # subprograma -> chamadas (com peso) no bloco principal
+
+    def expr(e, peso):
+        for no in nos_de([e]):
+            if type(no) is nos.Str and len(no.valor) != 1:   # 1 carácter: PUSHI do código
+                usos[no.valor] += peso
+            elif type(no) is nos.Chamada:
+                chamadas[no.nome] += peso
+
+    def stmts(lista, peso):
+        for s in lista:
+            match type(s):
+                case nos.Escrever:
+                    for e in juntar_escritas(s.args)[0]:
+                        if type(e) is nos.Str:
+                            usos[e.valor] += peso
+                        else:
+                            if e.tipo == 'BOOLEAN':
+                                usos['TRUE'] += peso
+                                usos['FALSE'] += peso
+                            expr(e, peso)
+                case nos.Atribuicao:
+                    expr(s.alvo, peso)
+                    expr(s.expr, peso)
+                case nos.Ler:
+                    for alvo in s.alvos:
+                        expr(alvo, peso)
+                case nos.Se:
+                    expr(s.cond, peso)
+                    stmts(s.entao, peso)
+                    stmts(s.senao or [], peso)
+                case nos.Enquanto:
+                    expr(s.cond, REPETIDO)
+                    stmts(s.corpo, REPETIDO)
+                case nos.Para:
+                    expr(s.inicio, peso)
+                    expr(s.fim, peso)
+                    stmts(s.corpo, REPETIDO)
+                case nos.Chamada:
+                    expr(s, peso)
+
+    stmts(bloco.stmts, 1)
+    grafo = grafo_chamadas(bloco)
+    usados = alcancaveis(bloco)
+    for decl in bloco.decls:
+        if isinstance(decl, nos.Subprograma) and decl.nome in usados:
+            # Corre uma só vez se só o bloco principal o chama, num único sítio fora de ciclos
+            uma_vez = chamadas[decl.nome] == 1 and not any(
+                decl.nome in chamados for nome, chamados in grafo.items() if nome is not None)
+            peso = 1 if uma_vez else REPETIDO
+            for d in decl.bloco.decls:
+                if isinstance(d, nos.DeclConst) and type(d.valor) is nos.Str:
+                    usos[d.valor.valor] += peso
+            stmts(decl.bloco.stmts, peso)
+    return [texto for texto, n in usos.items() if n >= REPETIDO]
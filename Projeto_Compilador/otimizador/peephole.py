@@ -0,0 +1,191 @@
+# otimizador/peephole.py
+#
+# Otimização peephole sobre as instruções da VM já geradas
+# (depois de `GeradorVM.gerar`, com a opção -O).
+#
+# Trabalha sobre o IR (gerador/ir.py); as regras são aplicadas
+# repetidamente até não haver alterações:
+#
+#  - cargas/armazenamentos redundantes: PUSHG n; STOREG n desaparece e
+#    STOREG n; PUSHG n passa a DUP 1; STOREG n (sem voltar a ler a memória)
+#    e DUP 1; STOREG n; STOREG n fica só STOREG n;
+#  - negações: NOT NOT desaparece e INF NOT passa a SUPEQ (idem INFEQ, SUP, SUPEQ);
+#  - identidades aritméticas: PUSHI 0 ADD/SUB, PUSHI 1 MUL/DIV;
+#  - saltos condicionais constantes: PUSHI 1 JZ L desaparece, PUSHI 0 JZ L passa a JUMP L;
+#  - saltos encadeados: um salto para um JUMP M passa a saltar diretamente para M;
+#  - saltos para a instrução seguinte: JUMP L imediatamente antes de L:;
+#  - código inalcançável: instruções depois de JUMP/STOP/RETURN até ao
+#    próximo rótulo referenciado (os rótulos sem referências são removidos).
+#
+# Cada regra regista no relatório quantas instruções removeu; as reescritas
+# que não removem instruções são contadas à parte.
+
+from collections import Counter
+
+from gerador.ir import Instr, ROTULO, SALTOS, FIM_DE_FLUXO
+
+CARGA_ARMAZENAMENTO = {'PUSHG': 'STOREG', 'PUSHL': 'STOREL'}
+ARMAZENAMENTO_CARGA = {v: k for k, v in CARGA_ARMAZENAMENTO.items()}
+NEGACOES = {'INF': 'SUPEQ', 'INFEQ': 'SUP', 'SUP': 'INFEQ', 'SUPEQ': 'INF'}
+
+DUP_1 = Instr('DUP', 1)
+
+def otimizar_peephole(codigo, relatorio=None):
+    """Otimiza o CodigoVM (in place) e devolve-o.
+
+    Se `relatorio` for um Counter, acrescenta-lhe as contagens por regra."""
+    estat = Counter()
+    instrs = codigo.instrs
+
+    alterado = True
+    while alterado:
+        alterado = False
+        for regra in (_janela, _encadear_saltos, _saltos_seguintes, _inalcancavel):
+            novo = regra(instrs, estat)
+            if novo is not None:
+                instrs = novo
+                alterado = True
+
+    codigo.instrs = instrs
+    if relatorio is not None:
+        relatorio.update({f'peephole: {regra}': n for regra, n in estat.items()})
+    return codigo
+
+# -----------------------
+# Regras locais (janela sobre as últimas instruções emitidas)
+# -----------------------
+
+def _janela(instrs, estat):
+    saida = []
+    alterado = False
+    for instr in instrs:
+        saida.append(instr)
+        while len(saida) >= 2 and _reduzir(saida, estat):
+            alterado = True
+    return saida if alterado else None
+
+def _reduzir(saida, estat):
+    """Tenta simplificar o fim de `saida`; devolve True se alterou alguma coisa."""
+    i1, i2 = saida[-2], saida[-1]
+    op1, arg1, op2, arg2 = i1.op, i1.arg, i2.op, i2.arg
+
+    if CARGA_ARMAZENAMENTO.get(op1) == op2 and arg1 == arg2:
+        del saida[-2:]                          # PUSHG n; STOREG n
+        estat['cargas/armazenamentos redundantes'] += 2
+        return True
+
+    if len(saida) >= 3 and saida[-3] == DUP_1 and op1 == op2 \
+            and op1 in ARMAZENAMENTO_CARGA and arg1 == arg2:
+        del saida[-3:-1]                        # DUP 1; STOREG n; STOREG n
+        estat['cargas/armazenamentos redundantes'] += 2
+        return True
+
+    if ARMAZENAMENTO_CARGA.get(op1) == op2 and arg1 == arg2:
+        saida[-2:] = [DUP_1, i1]                # STOREG n; PUSHG n
+        estat['cargas após armazenamento (reescritas)'] += 1
+        return True
+
+    if op2 == 'NOT':
+        if op1 == 'NOT':
+            del saida[-2:]
+            estat['negações'] += 2
+            return True
+        if op1 in NEGACOES:
+            saida[-2:] = [Instr(NEGACOES[op1])]
+            estat['negações'] += 1
+            return True
+
+    if op1 == 'PUSHI' and (arg1 == 0 and op2 in {'ADD', 'SUB'} or arg1 == 1 and op2 in {'MUL', 'DIV'}):
+        del saida[-2:]
+        estat['identidades aritméticas'] += 2
+        return True
+
+    if op1 == 'PUSHI' and arg1 in {0, 1} and op2 == 'JZ':
+        if arg1 == 1:
+            del saida[-2:]
+            estat['saltos condicionais constantes'] += 2
+        else:
+            saida[-2:] = [Instr('JUMP', arg2)]
+            estat['saltos condicionais constantes'] += 1
+        return True
+
+    return False
+
+# -----------------------
+# Regras sobre o fluxo de controlo
+# -----------------------
+
+def _encadear_saltos(instrs, estat):
+    # Rótulo -> destino, quando a primeira instrução depois do rótulo é um JUMP
+    destinos = {}
+    pendentes = []
+    for i in instrs:
+        if i.op == ROTULO:
+            pendentes.append(i.arg)
+        else:
+            if i.op == 'JUMP':
+                for r in pendentes:
+                    destinos[r] = i.arg
+            pendentes = []
+
+    if not destinos:
+        return None
+
+    def final(rotulo):
+        vistos = set()
+        while rotulo in destinos and rotulo not in vistos:
+            vistos.add(rotulo)
+            rotulo = destinos[rotulo]
+        return rotulo
+
+    saida = []
+    alterado = False
+    for i in instrs:
+        if i.op in SALTOS and i.arg in destinos:
+            novo = final(i.arg)
+            if novo != i.arg:
+                i = Instr(i.op, novo)
+                alterado = True
+                estat['saltos encadeados (reescritas)'] += 1
+        saida.append(i)
+    return saida if alterado else None
+
+def _saltos_seguintes(instrs, estat):
+    saida = []
+    alterado = False
+    for n, i in enumerate(instrs):
+        if i.op == 'JUMP':
+            # Rótulos entre este salto e a instrução seguinte
+            j = n + 1
+            while j < len(instrs) and instrs[j].op == ROTULO:
+                if instrs[j].arg == i.arg:
+                    break
+                j += 1
+            else:
+                saida.append(i)
+                continue
+            alterado = True
+            estat['saltos para a instrução seguinte'] += 1
+            continue
+        saida.append(i)
+    return saida if alterado else None
+
+def _inalcancavel(instrs, estat):
+    referenciados = {i.arg for i in instrs if i.op in SALTOS or i.op == 'PUSHA'}
+    saida = []
+    alterado = False
+    morto = False
+    for i in instrs:
+        if i.op == ROTULO:
+            if i.arg in referenciados:
+                morto = False
+                saida.append(i)
+            else:
+                alterado = True         # rótulo sem referências
+        elif morto:
+            alterado = True
+            estat['código inalcançável'] += 1
+        else:
+            saida.append(i)
+            morto = i.op in FIM_DE_FLUXO
+    return saida if alterado else None
@@ -0,0 +1,119 @@
+# otimizador/subexpressoes.py
+#
+# Subexpressões comuns de uma instrução, usadas pelo GeradorVM com -O.
+#
+# Em `a[i] := a[i] + b[i] * b[i]` ou `if (length(s) - 1 > 0) and (x < length(s) - 1)`
+# a mesma subexpressão aparece várias vezes e o gerador repetia o seu código
+# (PUSHG base; índice; SUB; LOADN ou PUSHG s; STRLEN ...). Durante a avaliação
+# das expressões de uma instrução nenhuma variável muda de valor (a atribuição
+# e a leitura só acontecem no fim), por isso, desde que a instrução não chame
+# subprogramas (que podem alterar globais e arrays), duas subexpressões iguais
+# têm o mesmo valor: calcula-se uma vez, antes da instrução, para um
+# temporário na pilha, e os usos passam a ser PUSHL.
+#
+# Só se partilham as subexpressões em que se poupa código: cada uso passa a
+# custar uma instrução e o temporário um POP no fim. Uma expressão que pode
+# falhar (acesso a array, divisão) só é calculada antes se também fosse
+# calculada sempre, e não apenas no segundo operando de um and/or em
+# curto-circuito.
+#
+# As funções só analisam: a AST não é alterada.
+
+from collections import Counter
+
+from arvore import nos
+from otimizador.ciclos import chave, forma_indice
+from otimizador.chamadas import nos_de
+
+def partes_condicao(cond):
+    """Divide uma condição em curto-circuito em (avaliadas sempre, avaliadas só às vezes)."""
+    if type(cond) is nos.BinOp and cond.op in ('and', 'or'):
+        sempre, condicionais = partes_condicao(cond.esq)
+        return sempre, condicionais + [cond.dir]
+    if type(cond) is nos.Not:
+        return partes_condicao(cond.expr)
+    return [cond], []
+
+def custo(e):
+    """Número (aproximado) de instruções que o gerador emite para `e`."""
+    match type(e):
+        case nos.BinOp:
+            return custo(e.esq) + custo(e.dir) + 1
+        case nos.Not:
+            return custo(e.expr) + 1
+        case nos.AcessoArray:
+            # PUSH base; índice; PUSHI início; SUB; LOADN/CHARAT
+            return custo(forma_indice(e.indice)[0]) + 4
+        case nos.Chamada:
+            return sum(custo(a) for a in e.args) + 1
+    return 1
+
+def _pode_falhar(e):
+    return any(type(no) is nos.AcessoArray or type(no) is nos.BinOp and no.op in ('div', 'mod', '/')
+               for no in nos_de([e]))
+
+def comuns(sempre, condicionais, calculadas):
+    """Grupos de subexpressões iguais a calcular uma única vez antes da instrução.
+
+    `sempre` são as expressões (de topo) que a instrução avalia sempre e
+    `condicionais` as que só avalia às vezes; `calculadas` tem os id() das
+    que já estão em temporários. Devolve uma lista de grupos (lista de nós
+    com a mesma chave), pela ordem da primeira ocorrência, ou [] se não
+    compensar."""
+    raizes = [(e, False) for e in sempre] + [(e, True) for e in condicionais]
+    if any(type(no) is nos.Chamada and no.nome != 'length'
+           for e, _ in raizes for no in nos_de([e])):
+        return []
+
+    def candidatas(e):
+        # Subexpressões que podem ir para um temporário (os índices `e ± c`
+        # contam pela base, que é o que o gerador calcula)
+        if id(e) in calculadas:
+            return
+        match type(e):
+            case nos.BinOp:
+                yield e
+                yield from candidatas(e.esq)
+                yield from candidatas(e.dir)
+            case nos.Not:
+                yield e
+                yield from candidatas(e.expr)
+            case nos.AcessoArray:
+                yield e
+                yield from candidatas(forma_indice(e.indice)[0])
+            case nos.Chamada:
+                yield e
+                for a in e.args:
+                    yield from candidatas(a)
+
+    usos = Counter(chave(no) for e, _ in raizes for no in candidatas(e))
+    grupos = {}
+    certas = set()          # chaves com alguma ocorrência avaliada sempre
+
+    def visitar(e, condicional):
+        if id(e) in calculadas:
+            return
+        k = chave(e)
+        if usos[k] > 1 and (usos[k] - 1) * custo(e) - usos[k] > 0:
+            grupos.setdefault(k, []).append(e)
+            if not condicional:
+                certas.add(k)
+            return
+        match type(e):
+            case nos.BinOp:
+                visitar(e.esq, condicional)
+                visitar(e.dir, condicional)
+            case nos.Not:
+                visitar(e.expr, condicional)
+            case nos.AcessoArray:
+                visitar(forma_indice(e.indice)[0], condicional)
+            case nos.Chamada:
+                for a in e.args:
+                    visitar(a, condicional)
+
+    for e, condicional in raizes:
+        visitar(e, condicional)
+    escolhidos = [g for k, g in grupos.items()
+                  if len(g) > 1 and (k in certas or not _pode_falhar(g[0]))]
+    poupanca = sum((len(g) - 1) * custo(g[0]) - len(g) for g in escolhidos) - 1   # - POP
+    return escolhidos if poupanca > 0 else []
@@ -1,15 +1,60 @@
 # parser/pascal_parser.py
-import ply.yacc as yacc
-from lexer.pascal_lexer import tokens
+import copy
+import hashlib
+import os
+import sys
+from functools import partial
 
-# Precedências para evitar ambiguidade com IF/ELSE
+import ply.yacc as yacc
+from lexer.pascal_lexer import tokens, lexer
+from lexer import lexer_rapido
+from arvore.nos import (Programa, Bloco, DeclVar, DeclConst, Param, Subprograma, TipoArray,
+                        Atribuicao, Escrever, Ler, Se, Enquanto, Para,
+                        Num, Str, Bool, Id, AcessoArray, BinOp, Not, Chamada)
+
+# Precedências para evitar ambiguidade com IF/ELSE e dos operadores
+# (do menos para o mais prioritário, como no Pascal standard)
 precedence = (
     ('nonassoc', 'IFX'),
     ('nonassoc', 'ELSE'),
+    ('nonassoc', 'EQUAL', 'NEQ', 'LT', 'LE', 'GT', 'GE'),
+    ('left', 'PLUS', 'MINUS', 'OR'),
+    ('left', 'MULT', 'DIVIDE', 'DIV', 'MOD', 'AND'),
+    ('right', 'NOT'),
     ('left', 'LBRACK', 'RBRACK')
 )
 
-ast = {}
+# -----------------------
+# Posição no código fonte
+# -----------------------
+
+def _pos(p, i):
+    """Linha e coluna (ambas a começar em 1) do i-ésimo símbolo da produção."""
+    lexpos = p.lexpos(i)
+    inicio_linha = p.lexer.lexdata.rfind('\n', 0, lexpos) + 1
+    return {'linha': p.lineno(i), 'coluna': lexpos - inicio_linha + 1}
+
+# Os nomes são internados: todas as ocorrências de um identificador
+# partilham a mesma string, o que reduz a memória ocupada pela AST
+intern = sys.intern
+
+def _lista(stmt):
+    """Normaliza uma instrução (simples, composta ou vazia) numa lista de instruções."""
+    if stmt is None:
+        return []
+    return stmt if isinstance(stmt, list) else [stmt]
+
+def _juntar(lista, stmt):
+    """Acrescenta à lista, no lugar, uma instrução ou declaração (ou a lista delas).
+
+    As listas são construídas por produções recursivas à esquerda que estendem
+    a lista já existente, em vez de a copiar: o custo total é linear no número
+    de elementos e a pilha LR não cresce com o tamanho da lista."""
+    if isinstance(stmt, list):
+        lista.extend(stmt)
+    elif stmt is not None:
+        lista.append(stmt)
+    return lista
 
 # -----------------------
 # Programa principal
@@ -17,16 +62,15 @@ ast = {}
 
 def p_program(p):
     '''program : PROGRAM ID SEMI main_block DOT'''
-    ast['program'] = {'name': p[2], 'body': p[4]}
-    p[0] = ast
+    p[0] = Programa(p[2], p[4], **_pos(p, 1))
 
 def p_main_block(p):
     '''main_block : decl_segment BEGIN stmt_list END
                   | BEGIN stmt_list END'''
     if len(p) == 5:
-        p[0] = {'decls': p[1], 'stmts': p[3]}
+        p[0] = Bloco(p[1], p[3], **_pos(p, 2))
     else:
-        p[0] = {'decls': [], 'stmts': p[2]}
+        p[0] = Bloco([], p[2], **_pos(p, 1))
 
 # -----------------------
 # Declarações
@@ -35,18 +79,15 @@ def p_main_block(p):
 def p_decl_segment(p):
     '''decl_segment : decl_segment decl_block
                     | decl_block'''
-    if len(p) == 3:
-        p[0] = p[1] + p[2]
-    else:
-        p[0] = p[1]
+    p[0] = _juntar(p[1], p[2]) if len(p) == 3 else p[1]
 
 def p_block(p):
     '''block : decl_segment BEGIN stmt_list END
              | BEGIN stmt_list END'''
     if len(p) == 5:
-        p[0] = {'decls': p[1], 'stmts': p[3]}
+        p[0] = Bloco(p[1], p[3], **_pos(p, 2))
     else:
-        p[0] = {'decls': [], 'stmts': p[2]}
+        p[0] = Bloco([], p[2], **_pos(p, 1))
 
 def p_decl_block_var(p):
     '''decl_block : VAR decls
@@ -56,65 +97,56 @@ def p_decl_block_var(p):
 def p_const_decls(p):
     '''const_decls : const_decls const_decl
                    | const_decl'''
-    if len(p) == 3:
-        p[0] = p[1] + [p[2]]
-    else:
-        p[0] = [p[1]]
+    p[0] = _juntar(p[1], p[2]) if len(p) == 3 else [p[1]]
 
 def p_const_decl(p):
     '''const_decl : ID EQUAL expr SEMI'''
-    p[0] = {'type': 'const', 'id': p[1], 'value': p[3]}
+    p[0] = DeclConst(p[1], p[3], **_pos(p, 1))
 
 def p_decl_block_single(p):
     '''decl_block : decl'''
-    p[0] = [p[1]]
+    p[0] = _lista(p[1])
 
 def p_decls(p):
     '''decls : decls decl
              | decl'''
-    if len(p) == 3:
-        if isinstance(p[2], list):
-            p[0] = p[1] + p[2]
-        else:
-            p[0] = p[1] + [p[2]]
-    else:
-        p[0] = p[1] if isinstance(p[1], list) else [p[1]]
+    p[0] = _juntar(p[1], p[2]) if len(p) == 3 else _lista(p[1])
 
 def p_decl_var(p):
     '''decl : id_list COLON type SEMI'''
-    p[0] = [{'id': i, 'type': p[3]} for i in p[1]]
+    pos = _pos(p, 2)
+    p[0] = [DeclVar(i, p[3], **pos) for i in p[1]]
 
 def p_decl_array(p):
     '''decl : id_list COLON ARRAY LBRACK NUMBER DOTDOT NUMBER RBRACK OF type SEMI'''
     base = int(p[5])
     end = int(p[7])
     size = end - base + 1
-    p[0] = [{'id': i, 'type': ('array', p[10], base, size)} for i in p[1]]
+    pos = _pos(p, 2)
+    p[0] = [DeclVar(i, TipoArray(p[10], base, size), **pos) for i in p[1]]
 
 def p_decl_function(p):
     '''decl : FUNCTION ID LPAREN param_list RPAREN COLON type SEMI block SEMI'''
-    p[0] = {'type': 'function', 'id': p[2], 'params': p[4], 'ret': p[7], 'body': p[9]}
+    p[0] = Subprograma(p[2], p[4], p[7], p[9], **_pos(p, 1))
 
 def p_decl_procedure(p):
     '''decl : PROCEDURE ID LPAREN param_list RPAREN SEMI block SEMI'''
-    p[0] = {'type': 'procedure', 'id': p[2], 'params': p[4], 'body': p[7]}
+    p[0] = Subprograma(p[2], p[4], None, p[7], **_pos(p, 1))
 
 def p_param(p):
     '''param : id_list COLON type'''
-    p[0] = [{'id': i, 'type': p[3]} for i in p[1]]
+    pos = _pos(p, 2)
+    p[0] = [Param(i, p[3], **pos) for i in p[1]]
 
 def p_param_list(p):
     '''param_list : param_list SEMI param
                   | param'''
-    if len(p) == 4:
-        p[0] = p[1] + p[3]
-    else:
-        p[0] = p[1]
+    p[0] = _juntar(p[1], p[3]) if len(p) == 4 else p[1]
 
 def p_id_list(p):
-    '''id_list : ID
-               | ID COMMA id_list'''
-    p[0] = [p[1]] if len(p) == 2 else [p[1]] + p[3]
+    '''id_list : id_list COMMA ID
+               | ID'''
+    p[0] = [p[1]] if len(p) == 2 else _juntar(p[1], p[3])
 
 def p_type(p):
     '''type : INTEGER
@@ -127,7 +159,7 @@ def p_expr_bool(p):
     '''expr : TRUE
             | FALSE'''
     valor = True if p[1].lower() == 'true' else False
-    p[0] = ('bool', valor)
+    p[0] = Bool(valor, **_pos(p, 1))
 
 
 # -----------------------
@@ -137,13 +169,8 @@ def p_expr_bool(p):
 def p_stmt_list(p):
     '''stmt_list : stmt_list stmt
                  | stmt'''
-    if len(p) == 3:
-        if p[2] is not None:
-            p[0] = p[1] + [p[2]]
-        else:
-            p[0] = p[1]
-    else:
-        p[0] = [p[1]] if p[1] is not None else []
+    # Instruções compostas (begin ... end) são achatadas na lista envolvente
+    p[0] = _juntar(p[1], p[2]) if len(p) == 3 else _lista(p[1])
 
 
 def p_compound_stmt(p):
@@ -166,33 +193,33 @@ def p_stmt(p):
 def p_assign_stmt(p):
     '''assign_stmt : lvalue ASSIGN expr
                    | lvalue ASSIGN expr SEMI'''
-    p[0] = ('assign', p[1], p[3])
+    p[0] = Atribuicao(p[1], p[3], **_pos(p, 2))
 
 
 def p_lvalue_id(p):
     '''lvalue : ID'''
-    p[0] = ('id', p[1])
+    p[0] = Id(intern(p[1]), **_pos(p, 1))
 
 def p_lvalue_array(p):
     '''lvalue : ID LBRACK expr RBRACK'''
-    p[0] = ('array', p[1], p[3])
+    p[0] = AcessoArray(intern(p[1]), p[3], **_pos(p, 1))
 
 def p_lvalue_list(p):
-    '''lvalue_list : lvalue
-                   | lvalue COMMA lvalue_list'''
-    p[0] = [p[1]] if len(p) == 2 else [p[1]] + p[3]
+    '''lvalue_list : lvalue_list COMMA lvalue
+                   | lvalue'''
+    p[0] = [p[1]] if len(p) == 2 else _juntar(p[1], p[3])
 
 
 def p_writeln_stmt(p):
     '''writeln_stmt : WRITELN LPAREN expr_list RPAREN
                     | WRITELN LPAREN expr_list RPAREN SEMI'''
-    p[0] = ('writeln', p[3])
+    p[0] = Escrever(p[3], True, **_pos(p, 1))
 
 
 def p_readln_stmt(p):
     '''readln_stmt : READLN LPAREN lvalue_list RPAREN
                    | READLN LPAREN lvalue_list RPAREN SEMI'''
-    p[0] = ('readln', p[3])
+    p[0] = Ler(p[3], **_pos(p, 1))
 
 
 def p_if_stmt(p):
@@ -200,20 +227,20 @@ def p_if_stmt(p):
                | IF expr THEN stmt ELSE stmt'''
 
     # Garante que `then` e `else` sempre sejam listas de instruções
-    then_part = p[4] if isinstance(p[4], list) else [p[4]]
-    else_part = p[6] if len(p) == 7 and isinstance(p[6], list) else [p[6]] if len(p) == 7 else None
+    then_part = _lista(p[4])
+    else_part = _lista(p[6]) if len(p) == 7 else None
 
-    p[0] = ('if', p[2], then_part, else_part)
+    p[0] = Se(p[2], then_part, else_part, **_pos(p, 1))
 
 
 def p_while_stmt(p):
     '''while_stmt : WHILE expr DO stmt'''
-    p[0] = ('while', p[2], p[4])
+    p[0] = Enquanto(p[2], _lista(p[4]), **_pos(p, 1))
 
 
 def p_for_stmt(p):
     '''for_stmt : FOR ID ASSIGN expr direction expr DO stmt'''
-    p[0] = ('for', p[2], p[4], p[6], p[5], p[8])
+    p[0] = Para(intern(p[2]), p[4], p[6], p[5].lower() == 'downto', _lista(p[8]), **_pos(p, 1))
 
 def p_direction(p):
     '''direction : TO
@@ -224,16 +251,19 @@ def p_direction(p):
 def p_call_stmt(p):
     '''call_stmt : ID LPAREN expr_list RPAREN
                  | ID LPAREN expr_list RPAREN SEMI'''
-    p[0] = ('call', p[1], p[3])
+    if p[1].lower() == 'write':
+        p[0] = Escrever(p[3], False, **_pos(p, 1))
+    else:
+        p[0] = Chamada(intern(p[1]), p[3], **_pos(p, 1))
 
 
 # -----------------------
 # Expressões
 # -----------------------
 def p_expr_list(p):
-    '''expr_list : expr
-                 | expr COMMA expr_list'''
-    p[0] = [p[1]] if len(p) == 2 else [p[1]] + p[3]
+    '''expr_list : expr_list COMMA expr
+                 | expr'''
+    p[0] = [p[1]] if len(p) == 2 else _juntar(p[1], p[3])
 
 def p_expr_binop(p):
     '''expr : expr PLUS expr
@@ -250,7 +280,7 @@ def p_expr_binop(p):
             | expr GE expr
             | expr AND expr
             | expr OR expr'''
-    p[0] = (p[2].lower(), p[1], p[3])
+    p[0] = BinOp(intern(p[2].lower()), p[1], p[3], **_pos(p, 2))
 
 def p_expr_parens(p):
     '''expr : LPAREN expr RPAREN'''
@@ -258,45 +288,129 @@ def p_expr_parens(p):
 
 def p_expr_not(p):
     '''expr : NOT expr'''
-    p[0] = ('not', p[2])
+    p[0] = Not(p[2], **_pos(p, 1))
 
 def p_expr_number(p):
     '''expr : NUMBER'''
-    p[0] = ('num', p[1])
+    p[0] = Num(p[1], **_pos(p, 1))
 
 def p_expr_string(p):
     '''expr : STRLIT'''
-    p[0] = ('str', p[1])
+    p[0] = Str(p[1], **_pos(p, 1))
 
 def p_expr_id(p):
     '''expr : ID'''
-    p[0] = ('id', p[1])
+    p[0] = Id(intern(p[1]), **_pos(p, 1))
 
 def p_expr_array_access(p):
     '''expr : ID LBRACK expr RBRACK'''
-    p[0] = ('array', p[1], p[3])
+    p[0] = AcessoArray(intern(p[1]), p[3], **_pos(p, 1))
 
 def p_expr_call(p):
     '''expr : ID LPAREN expr_list RPAREN'''
-    p[0] = ('call', p[1], p[3])
+    p[0] = Chamada(intern(p[1]), p[3], **_pos(p, 1))
 
 # -----------------------
 # Erros
 # -----------------------
 def p_error(p):
     if p:
-        print(f"Erro de sintaxe em '{p.value}' na linha {p.lineno}")
-    else:
-        print("Erro de sintaxe: fim inesperado")
+        raise Exception(f"Erro de sintaxe em '{p.value}' na linha {p.lineno}")
+    raise Exception("Erro de sintaxe: fim inesperado")
 
 # -----------------------
 # Parser builder
 # -----------------------
-parser = yacc.yacc(debug=True, write_tables=False)
 
-def parse(data):
-    global ast
-    ast = {}
-    
-    return parser.parse(data)
+# Diretório das tabelas LALR em cache (pode ser alterado com PASCAL_CACHE_DIR)
+CACHE_DIR = os.environ.get('PASCAL_CACHE_DIR') or os.path.join(os.path.dirname(os.path.abspath(__file__)), '__pycache__')
+
+def assinatura_gramatica():
+    """Hash das docstrings das produções, da tabela de precedências e dos tokens."""
+    h = hashlib.sha256()
+    h.update(f'{yacc.__version__}/{yacc.__tabversion__}'.encode())
+    h.update(repr(precedence).encode())
+    h.update(repr(tokens).encode())
+    modulo = sys.modules[__name__]
+    for nome in sorted(n for n in dir(modulo) if n.startswith('p_')):
+        h.update(nome.encode())
+        h.update((getattr(modulo, nome).__doc__ or '').encode())
+    return h.hexdigest()[:16]
+
+def caminho_tabelas(cache_dir=None):
+    return os.path.join(cache_dir or CACHE_DIR, f'pascal_parsetab_{assinatura_gramatica()}.pickle')
+
+def _carregar_tabelas(caminho):
+    lr = yacc.LRTable()
+    lr.read_pickle(caminho)
+    lr.bind_callables(globals())
+    return yacc.LRParser(lr, p_error)
+
+def construir_parser(debug=False, cache_dir=None):
+    """Constrói o parser, reutilizando as tabelas LALR em cache sempre que possível.
+
+    Em modo debug as tabelas são sempre regeneradas e é escrito o parser.out."""
+    modulo = sys.modules[__name__]
+    if debug:
+        return yacc.yacc(module=modulo, debug=True, write_tables=False)
+
+    caminho = caminho_tabelas(cache_dir)
+    if os.path.exists(caminho):
+        try:
+            return _carregar_tabelas(caminho)
+        except Exception:
+            pass  # cache corrompida ou de outra versão do PLY: regenera
+
+    # Escreve para um ficheiro temporário e renomeia (atómico em builds paralelos)
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = f'{caminho}.{os.getpid()}.tmp'
+    novo = yacc.yacc(module=modulo, debug=False, picklefile=temporario, errorlog=yacc.NullLogger())
+    try:
+        os.replace(temporario, caminho)
+    except OSError:
+        pass
+    return novo
+
+parser = construir_parser(debug=os.environ.get('PASCAL_PARSER_DEBUG') == '1')
+
+def _novo_lexer():
+    lexer_local = lexer.clone()
+    lexer_local.lineno = 1
+    return lexer_local
+
+# Analisadores léxicos disponíveis: 'ply' (pascal_lexer.py) ou 'rapido' (lexer_rapido.py)
+LEXICOS = ('ply', 'rapido')
+
+def lexico_escolhido(lexico=None):
+    """O lexer indicado ou, por omissão, o de PASCAL_LEXER (ou o do PLY)."""
+    lexico = lexico or os.environ.get('PASCAL_LEXER') or 'ply'
+    if lexico not in LEXICOS:
+        raise Exception(f"Erro: analisador léxico desconhecido '{lexico}' (disponíveis: {', '.join(LEXICOS)})")
+    return lexico
+
+def tokenizar(data, lexico=None):
+    """Devolve a lista de todos os tokens do programa (para medir o lexer à parte)."""
+    if lexico_escolhido(lexico) == 'rapido':
+        return list(lexer_rapido.tokenizar(data))
+    lexer_local = _novo_lexer()
+    lexer_local.input(data)
+    return list(iter(lexer_local.token, None))
+
+def parse(data, tokens=None, lexico=None):
+    """Analisa um programa e devolve a AST.
+
+    Reentrante: cada chamada usa um clone do lexer (com a contagem de linhas
+    a começar em 1) e uma cópia do parser, que partilha as tabelas LALR mas
+    mantém as suas próprias pilhas. Pode ser usada a partir de várias threads.
+
+    `tokens`, se indicado, é o resultado de `tokenizar(data)`: o parser consome
+    essa lista em vez de chamar o lexer. `lexico` escolhe o analisador léxico."""
+    lexer_local = _novo_lexer()
+    parser_local = copy.copy(parser)
+    if tokens is None:
+        if lexico_escolhido(lexico) == 'ply':
+            return parser_local.parse(data, lexer=lexer_local)
+        tokens = lexer_rapido.tokenizar(data)
+    # O lexer continua a ser preciso para o texto usado no cálculo das colunas
+    return parser_local.parse(data, lexer=lexer_local, tokenfunc=partial(next, iter(tokens), None))
     
\ No newline at end of file
@@ -1,21 +1,3 @@
 
-
-python3 main.py exemplos/enunciado/hello_world.pas
-
-python3 main.py exemplos/enunciado/maior_de_3.pas
-
-python3 main.py exemplos/enunciado/fatorial.pas
-
-python3 main.py exemplos/enunciado/soma_lista_int.pas
-
-python3 main.py exemplos/enunciado/verifica_nprimo.pas
-
-python3 main.py exemplos/enunciado/binario_to_decimal.pas
-
-python3 main.py exemplos/enunciado/binario_to_decimal_func.pas
-
-python3 main.py exemplos/outros/analise_numero.pas
-
-python3 main.py exemplos/outros/const.pas
-
-
+# Compila todos os exemplos num único processo (usar -j N para paralelizar)
+python3 main.py exemplos/enunciado exemplos/outros "$@"
@@ -1,25 +1,35 @@
 # semantica/verificador.py
 
+from arvore.nos import (Programa, DeclVar, DeclConst, Subprograma, TipoArray,
+                        Atribuicao, Escrever, Ler, Se, Enquanto, Para,
+                        Num, Str, Bool, Id, AcessoArray, BinOp, Not, Chamada)
+from arvore import nos
+
 class TabelaSimbolos:
     def __init__(self, pai=None):
         self.tabela = {}
         self.funcoes = {}
+        self.constantes = set()
         self.pai = pai
 
-    def declarar(self, nome, tipo):
+    def declarar(self, nome, tipo, constante=False):
         if nome in self.tabela:
             raise Exception(f"Erro: variável '{nome}' já declarada")
         self.tabela[nome] = tipo
+        if constante:
+            self.constantes.add(nome)
+
+    def verificar_atribuivel(self, nome):
+        """Garante que `nome` não é uma constante (no escopo onde é visível)."""
+        if nome in self.tabela:
+            if nome in self.constantes:
+                raise Exception(f"Erro: não é possível atribuir à constante '{nome}'")
+        elif self.pai:
+            self.pai.verificar_atribuivel(nome)
 
     def tipo_de(self, nome):
         if nome in self.tabela:
-            tipo_ou_valor = self.tabela[nome]
-            if isinstance(tipo_ou_valor, tuple):
-                match tipo_ou_valor[0]:
-                    case 'num': return 'REAL' if isinstance(tipo_ou_valor[1], float) else 'INTEGER'
-                    case 'str': return 'STRING'
-                    case 'bool': return 'BOOLEAN'
-            return tipo_ou_valor
+            return self.tabela[nome]
         if self.pai:
             return self.pai.tipo_de(nome)
         raise Exception(f"Erro: variável '{nome}' não declarada")
@@ -35,162 +45,170 @@ class TabelaSimbolos:
         if self.pai:
             return self.pai.info_funcao(nome)
         if nome.lower() == 'length':
-            return ('INTEGER', [{'id': 's', 'type': 'STRING'}])
+            return ('INTEGER', ['STRING'])
 
         raise Exception(f"Erro: função/procedimento '{nome}' não declarada")
-    
-    
+
+
+def _declarar(decl, tabela):
+    """Declara uma variável ou constante na tabela de símbolos."""
+    match decl:
+        case DeclVar():
+            tabela.declarar(decl.nome, decl.tipo)
+        case DeclConst():
+            tabela.declarar(decl.nome, verificar_expr(decl.valor, tabela), constante=True)
+
+
 def verificar(ast):
-    if 'program' not in ast:
+    if not isinstance(ast, Programa):
         raise Exception("Erro: estrutura do programa inválida")
 
-    corpo = ast['program']['body']
+    corpo = ast.bloco
     tabela = TabelaSimbolos()
 
     # Declarar variáveis, constantes e funções
-    for decl in corpo.get('decls', []):
-        if isinstance(decl, list):
-            for d in decl:
-                tabela.declarar(d['id'], d['type'])
-        elif isinstance(decl, dict):
-            if decl.get('type') in {'function', 'procedure'}:
-                tabela.declarar_funcao(decl['id'], decl.get('ret'), decl.get('params', []))
-            elif decl.get('type') == 'const':
-                tabela.declarar(decl['id'], decl['value'])   
-            elif 'id' in decl and 'type' in decl:
-                tabela.declarar(decl['id'], decl['type'])  
-            
+    for decl in corpo.decls:
+        if isinstance(decl, Subprograma):
+            tabela.declarar_funcao(decl.nome, decl.ret, [p.tipo for p in decl.params])
+        else:
+            _declarar(decl, tabela)
 
     # Verificar funções/procedimentos
-    for decl in corpo.get('decls', []):
-        if isinstance(decl, dict) and decl.get('type') in {'function', 'procedure'}:
+    for decl in corpo.decls:
+        if isinstance(decl, Subprograma):
             verificar_subprograma(decl, tabela)
-            
+
     # Verificar instruções principais
-    for instr in corpo.get('stmts', []):
-        if instr:
-            verificar_stmt(instr, tabela)
-            
+    for instr in corpo.stmts:
+        verificar_stmt(instr, tabela)
+
 def verificar_subprograma(decl, tabela_global):
     escopo = TabelaSimbolos(pai=tabela_global)
 
-    for p in decl['params']:
-        escopo.declarar(p['id'], p['type'])
+    for p in decl.params:
+        escopo.declarar(p.nome, p.tipo)
 
-    if decl['type'] == 'function':
-        escopo.declarar(decl['id'], decl['ret'])
+    if decl.eh_funcao:
+        escopo.declarar(decl.nome, decl.ret)
 
-    for d in decl['body'].get('decls', []):
-        if isinstance(d, list):
-            for v in d:
-                escopo.declarar(v['id'], v['type'])
-        elif isinstance(d, dict) and 'id' in d and 'type' in d:
-            escopo.declarar(d['id'], d['type'])
+    for d in decl.bloco.decls:
+        if isinstance(d, Subprograma):
+            raise Exception(f"Erro: subprogramas aninhados não são suportados ('{d.nome}' em '{decl.nome}')")
+        _declarar(d, escopo)
 
-    for s in decl['body'].get('stmts', []):
-        if s:
-            verificar_stmt(s, escopo)
+    for s in decl.bloco.stmts:
+        verificar_stmt(s, escopo)
+
+
+def verificar_indice(nome, idx, tabela):
+    tipo = tabela.tipo_de(nome)
+    if not isinstance(tipo, TipoArray):
+        raise Exception(f"Erro: '{nome}' não é um array")
+    tipo_idx = verificar_expr(idx, tabela)
+    if tipo_idx != 'INTEGER':
+        raise Exception("Erro: índice de array deve ser INTEGER")
+    return tipo
+
+
+def verificar_args(nome, args, params, tabela):
+    if len(args) != len(params):
+        raise Exception(f"Erro: chamada a '{nome}' com número errado de argumentos")
+    for a, tipo_param in zip(args, params):
+        tipo_arg = verificar_expr(a, tabela)
+        if tipo_arg != tipo_param:
+            raise Exception(f"Erro: argumento inválido para '{nome}': esperado {tipo_param}, obtido {tipo_arg}")
 
 
 def verificar_stmt(instr, tabela):
-    match instr:
-        case ('assign', ('id', nome), expr):
-            tipo_var = tabela.tipo_de(nome)
-            tipo_expr = verificar_expr(expr, tabela)
-            if tipo_var != tipo_expr:
-                raise Exception(f"Erro: tipo incompatível em '{nome} := ...'. Esperado {tipo_var}, obtido {tipo_expr}")
-
-        case ('assign', ('array', nome, idx), expr):
-            tipo = tabela.tipo_de(nome)
-            if not isinstance(tipo, tuple) or tipo[0] != 'array':
-                raise Exception(f"Erro: '{nome}' não é um array")
-            tipo_idx = verificar_expr(idx, tabela)
-            if tipo_idx != 'INTEGER':
-                raise Exception("Erro: índice de array deve ser INTEGER")
-            tipo_expr = verificar_expr(expr, tabela)
-            tipo_array = tipo[1]
-            if tipo_expr != tipo_array:
-                raise Exception(f"Erro: tipo do array '{nome}' é {tipo[1]}, não {tipo_expr}")
-
-        case ('writeln', exprs):
-            for e in exprs:
+    # Despacho pelo tipo do nó com padrões de valor (case nos.X): é bastante
+    # mais rápido do que padrões de classe em ASTs grandes
+    match type(instr):
+        case nos.Atribuicao:
+            alvo = instr.alvo
+            if isinstance(alvo, Id):
+                tipo_var = tabela.tipo_de(alvo.nome)
+                tabela.verificar_atribuivel(alvo.nome)
+                tipo_expr = verificar_expr(instr.expr, tabela)
+                if tipo_var != tipo_expr:
+                    raise Exception(f"Erro: tipo incompatível em '{alvo.nome} := ...'. Esperado {tipo_var}, obtido {tipo_expr}")
+            else:
+                tipo = verificar_indice(alvo.nome, alvo.indice, tabela)
+                tipo_expr = verificar_expr(instr.expr, tabela)
+                if tipo_expr != tipo.elemento:
+                    raise Exception(f"Erro: tipo do array '{alvo.nome}' é {tipo.elemento}, não {tipo_expr}")
+
+        case nos.Escrever:
+            for e in instr.args:
                 verificar_expr(e, tabela)
 
-        case ('call', 'Write', exprs):  # suporte ao Write
-            for e in exprs:
-                verificar_expr(e, tabela)
+        case nos.Ler:
+            for destino in instr.alvos:
+                if isinstance(destino, AcessoArray):
+                    verificar_indice(destino.nome, destino.indice, tabela)
+                else:
+                    tabela.tipo_de(destino.nome)
+                    tabela.verificar_atribuivel(destino.nome)
 
-        case ('readln', destinos):
-            for destino in destinos:
-                match destino:
-                    case ('id', nome):
-                        tabela.tipo_de(nome)
-                    case ('array', nome, idx):
-                        tipo = tabela.tipo_de(nome)
-                        if not isinstance(tipo, tuple) or tipo[0] != 'array':
-                            raise Exception(f"Erro: '{nome}' não é um array")
-                        tipo_idx = verificar_expr(idx, tabela)
-                        if tipo_idx != 'INTEGER':
-                            raise Exception("Erro: índice de array deve ser INTEGER")
-
-        case ('if', cond, entao, senao):
-            if verificar_expr(cond, tabela) != 'BOOLEAN':
+        case nos.Se:
+            if verificar_expr(instr.cond, tabela) != 'BOOLEAN':
                 raise Exception("Erro: expressão do IF deve ser BOOLEAN")
 
-            bloco_then = entao if isinstance(entao, list) else [entao]
-            for stmt in bloco_then:
+            for stmt in instr.entao:
                 verificar_stmt(stmt, tabela)
 
-            if senao:
-                bloco_else = senao if isinstance(senao, list) else [senao]
-                for stmt in bloco_else:
-                    verificar_stmt(stmt, tabela)
+            for stmt in instr.senao or []:
+                verificar_stmt(stmt, tabela)
 
-        case ('while', cond, corpo):
-            if verificar_expr(cond, tabela) != 'BOOLEAN':
+        case nos.Enquanto:
+            if verificar_expr(instr.cond, tabela) != 'BOOLEAN':
                 raise Exception("Erro: expressão do WHILE deve ser BOOLEAN")
-            verificar_stmt(corpo, tabela)
+            for stmt in instr.corpo:
+                verificar_stmt(stmt, tabela)
 
-        case ('for', nome, ini, fim, direcao, corpo):
-            if tabela.tipo_de(nome) != 'INTEGER':
+        case nos.Para:
+            if tabela.tipo_de(instr.var) != 'INTEGER':
                 raise Exception("Erro: variável de controlo no FOR deve ser INTEGER")
-            if verificar_expr(ini, tabela) != 'INTEGER' or verificar_expr(fim, tabela) != 'INTEGER':
+            tabela.verificar_atribuivel(instr.var)
+            if verificar_expr(instr.inicio, tabela) != 'INTEGER' or verificar_expr(instr.fim, tabela) != 'INTEGER':
                 raise Exception("Erro: limites do FOR devem ser INTEGER")
-            verificar_stmt(corpo, tabela)
-
-        case ('call', nome, args):
-            tipo, params = tabela.info_funcao(nome)
-            if len(args) != len(params):
-                raise Exception(f"Erro: chamada a '{nome}' com número errado de argumentos")
-            for a, p in zip(args, params):
-                tipo_arg = verificar_expr(a, tabela)
-                if tipo_arg != p['type']:
-                    raise Exception(f"Erro: argumento inválido para '{nome}': esperado {p['type']}, obtido {tipo_arg}")
+            for stmt in instr.corpo:
+                verificar_stmt(stmt, tabela)
 
-        case list():
-            for s in instr:
-                if s: verificar_stmt(s, tabela)
+        case nos.Chamada:
+            _, params = tabela.info_funcao(instr.nome)
+            verificar_args(instr.nome, instr.args, params, tabela)
 
         case _:
             raise Exception(f"Erro: instrução desconhecida {instr}")
 
 
 def verificar_expr(expr, tabela):
-    match expr:
-        case ('num', v):
-            return 'REAL' if isinstance(v, float) else 'INTEGER'
-        
-        case ('str', _):
+    """Verifica uma expressão, anota o nó com o tipo resolvido e devolve-o.
+
+    As fases seguintes leem `expr.tipo` em vez de voltarem a derivar o tipo."""
+    tipo = expr.tipo = _tipo_expr(expr, tabela)
+    return tipo
+
+
+def _tipo_expr(expr, tabela):
+    match type(expr):
+        case nos.Num:
+            return 'REAL' if isinstance(expr.valor, float) else 'INTEGER'
+
+        case nos.Id:
+            return tabela.tipo_de(expr.nome)
+
+        case nos.BinOp:
+            return verificar_binop(expr, tabela)
+
+        case nos.Str:
             return 'STRING'
-        
-        case ('id', nome):
-            tipo = tabela.tipo_de(nome)
-            return tipo
-        
-        case ('bool', _):
+
+        case nos.Bool:
             return 'BOOLEAN'
-        
-        case ('array', nome, idx):
+
+        case nos.AcessoArray:
+            nome, idx = expr.nome, expr.indice
             tipo = tabela.tipo_de(nome)
 
             # Acesso a strings como arrays
@@ -199,74 +217,57 @@ def verificar_expr(expr, tabela):
                 if tipo_idx != 'INTEGER':
                     raise Exception("Erro: índice de string deve ser INTEGER")
                 return 'STRING'
-            
-            if not isinstance(tipo, tuple) or tipo[0] != 'array':
-                raise Exception(f"Erro: '{nome}' não é um array")
-            tipo_idx = verificar_expr(idx, tabela)
-            if tipo_idx != 'INTEGER':
-                raise Exception("Erro: índice de array deve ser INTEGER")
-
-            if isinstance(idx, tuple) and idx[0] == 'num':
-                valor_idx = idx[1]
-                inicio = tipo[2]
-                fim = tipo[2] + tipo[3] - 1
-                if not (inicio <= valor_idx <= fim):
-                    raise Exception(f"Erro: índice {valor_idx} fora dos limites [{inicio}..{fim}] de '{nome}'")
-            return tipo[1]
-        
-        case ('div', e1, e2):
-            t1 = verificar_expr(e1, tabela)
-            t2 = verificar_expr(e2, tabela)
-            if t1 == t2 == 'INTEGER':
-                return 'INTEGER'
-            raise Exception(f"Erro: operador 'div' requer INTEGER, obtido {t1} e {t2}")
-
-        case ('mod', e1, e2):
-            t1 = verificar_expr(e1, tabela)
-            t2 = verificar_expr(e2, tabela)
-            if t1 == t2 == 'INTEGER':
-                return 'INTEGER'
-            raise Exception(f"Erro: operador 'mod' requer INTEGER, obtido {t1} e {t2}")
-
-        case ('not', e):
-            if verificar_expr(e, tabela) != 'BOOLEAN':
+
+            tipo = verificar_indice(nome, idx, tabela)
+
+            if isinstance(idx, Num):
+                valor_idx = idx.valor
+                if not (tipo.inicio <= valor_idx <= tipo.fim):
+                    raise Exception(f"Erro: índice {valor_idx} fora dos limites [{tipo.inicio}..{tipo.fim}] de '{nome}'")
+            return tipo.elemento
+
+        case nos.Not:
+            if verificar_expr(expr.expr, tabela) != 'BOOLEAN':
                 raise Exception("Erro: operador 'not' requer BOOLEAN")
             return 'BOOLEAN'
-        
-        case (op, e1, e2) if op in {'+', '-', '*', '/'}:
-            t1 = verificar_expr(e1, tabela)
-            t2 = verificar_expr(e2, tabela)
-            if t1 == t2 == 'INTEGER':
-                return 'INTEGER'
-            if (t1, t2) in [('INTEGER', 'REAL'), ('REAL', 'INTEGER'), ('REAL', 'REAL')]:
-                return 'REAL'
-            raise Exception(f"Erro: operador '{op}' requer INTEGER ou REAL, obtido {t1} e {t2}")
-        
-        case (op, e1, e2) if op in {'=', '<>', '<', '<=', '>', '>='}:
-            t1 = verificar_expr(e1, tabela)
-            t2 = verificar_expr(e2, tabela)
-            if t1 != t2:
-                raise Exception(f"Erro: comparação entre tipos diferentes: {t1} e {t2}")
-            return 'BOOLEAN'
-        
-        case (op, e1, e2) if op in {'and', 'or'}:
-            t1 = verificar_expr(e1, tabela)
-            t2 = verificar_expr(e2, tabela)
-            if t1 == t2 == 'BOOLEAN':
-                return 'BOOLEAN'
-            raise Exception(f"Erro: operador lógico '{op}' requer BOOLEAN, obtido {t1} e {t2}")
-        
-        case ('call', nome, args):
+
+        case nos.Chamada:
+            nome = expr.nome
             tipo_ret, params = tabela.info_funcao(nome)
-            if len(args) != len(params):
-                raise Exception(f"Erro: chamada a '{nome}' com número errado de argumentos")
-            for a, p in zip(args, params):
-                tipo_arg = verificar_expr(a, tabela)
-                if tipo_arg != p['type']:
-                    raise Exception(f"Erro: argumento inválido para '{nome}': esperado {p['type']}, obtido {tipo_arg}")
+            verificar_args(nome, expr.args, params, tabela)
             if tipo_ret is None:
                 raise Exception(f"Erro: '{nome}' é procedimento, não retorna valor")
             return tipo_ret
-        
+
         case _:
-            raise Exception(f"Erro: expressão inválida {expr}")
\ No newline at end of file
+            raise Exception(f"Erro: expressão inválida {expr}")
+
+
+def verificar_binop(expr, tabela):
+    op = expr.op
+    t1 = verificar_expr(expr.esq, tabela)
+    t2 = verificar_expr(expr.dir, tabela)
+
+    if op in {'+', '-', '*', '/'}:
+        if op == '/' and t1 in {'INTEGER', 'REAL'} and t2 in {'INTEGER', 'REAL'}:
+            return 'REAL'
+        if t1 == t2 == 'INTEGER':
+            return 'INTEGER'
+        if (t1, t2) in [('INTEGER', 'REAL'), ('REAL', 'INTEGER'), ('REAL', 'REAL')]:
+            return 'REAL'
+        raise Exception(f"Erro: operador '{op}' requer INTEGER ou REAL, obtido {t1} e {t2}")
+
+    if op in {'=', '<>', '<', '<=', '>', '>='}:
+        if t1 != t2:
+            raise Exception(f"Erro: comparação entre tipos diferentes: {t1} e {t2}")
+        return 'BOOLEAN'
+
+    if op in {'and', 'or'}:
+        if t1 == t2 == 'BOOLEAN':
+            return 'BOOLEAN'
+        raise Exception(f"Erro: operador lógico '{op}' requer BOOLEAN, obtido {t1} e {t2}")
+
+    # div e mod
+    if t1 == t2 == 'INTEGER':
+        return 'INTEGER'
+    raise Exception(f"Erro: operador '{op}' requer INTEGER, obtido {t1} e {t2}")
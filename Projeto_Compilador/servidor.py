@@ -0,0 +1,87 @@
+# servidor.py
+#
+# Servidor de compilação de longa duração: mantém o lexer, o parser e o gerador
+# carregados e responde a pedidos JSON (um por linha) via stdin ou socket UNIX.
+#
+#   Pedido:   {"id": 1, "codigo": "program X; begin writeln('ola') end.", "otimizar": true}
+#   Resposta: {"id": 1, "ok": true, "vm": "START\n...", "tempo_ms": 0.41, "relatorio": {...}}
+#             {"id": 1, "ok": false, "erro": "Erro: ...", "tempo_ms": 0.12}
+#
+# Uso: python servidor.py                  (pedidos em stdin, respostas em stdout)
+#      python servidor.py --socket /tmp/pascal.sock
+
+import argparse
+import json
+import os
+import socketserver
+import sys
+import time
+from collections import Counter
+
+from main import compilar_codigo
+
+def tratar_pedido(linha):
+    """Processa uma linha JSON e devolve a resposta (dict). Cada pedido usa
+    uma AST e um GeradorVM novos, sem estado partilhado com pedidos anteriores."""
+    try:
+        pedido = json.loads(linha)
+        codigo = pedido['codigo']
+    except (ValueError, KeyError, TypeError) as e:
+        return {'id': None, 'ok': False, 'erro': f"Pedido inválido: {e}"}
+
+    resposta = {'id': pedido.get('id')}
+    otimizar = bool(pedido.get('otimizar'))
+    relatorio = Counter()
+    inicio = time.perf_counter()
+    try:
+        codigo_vm = compilar_codigo(codigo, otimizar, relatorio)
+        resposta['ok'] = True
+        resposta['vm'] = '\n'.join(codigo_vm) + '\n'
+        if otimizar:
+            resposta['relatorio'] = dict(relatorio)
+    except Exception as e:
+        resposta['ok'] = False
+        resposta['erro'] = str(e)
+    resposta['tempo_ms'] = round((time.perf_counter() - inicio) * 1000, 3)
+    return resposta
+
+def servir_stdin(entrada=sys.stdin, saida=sys.stdout):
+    for linha in entrada:
+        if not linha.strip():
+            continue
+        saida.write(json.dumps(tratar_pedido(linha), ensure_ascii=False) + '\n')
+        saida.flush()
+
+class _Ligacao(socketserver.StreamRequestHandler):
+    def handle(self):
+        for linha in self.rfile:
+            if not linha.strip():
+                continue
+            resposta = json.dumps(tratar_pedido(linha.decode('utf-8')), ensure_ascii=False)
+            self.wfile.write(resposta.encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+class _ServidorUnix(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+def servir_socket(caminho):
+    if os.path.exists(caminho):
+        os.unlink(caminho)
+    with _ServidorUnix(caminho, _Ligacao) as servidor:
+        try:
+            servidor.serve_forever()
+        finally:
+            os.unlink(caminho)
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description='Servidor de compilação Pascal -> VM.')
+    ap.add_argument('--socket', metavar='CAMINHO', help='escutar num socket UNIX em vez de stdin')
+    args = ap.parse_args()
+
+    try:
+        if args.socket:
+            servir_socket(args.socket)
+        else:
+            servir_stdin()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,321 @@
+# vm/interpretador.py
+#
+# Interpretador do código da VM gerado pelo compilador (subconjunto da EWVM),
+# para correr e medir os programas sem passar pela VM web.
+#
+# O código é pré-descodificado: os rótulos são resolvidos para endereços
+# inteiros, as instruções para opcodes inteiros e PUSHI/PUSHF/PUSHS/PUSHA
+# passam todas a um único "empilhar constante". O ciclo de execução despacha
+# por uma cadeia de comparações ordenada pelas instruções mais frequentes.
+#
+# Como na EWVM, as variáveis globais ficam no fundo da pilha (gp = 0), nas
+# posições reservadas pelo PUSHN a seguir ao START; um PUSHG/STOREG fora
+# dessas posições é rejeitado ao carregar o código.
+#
+# Uso: python vm/interpretador.py programa.vm < entrada.txt
+
+import os
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+if __name__ == '__main__':
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gerador.ir import CodigoVM, ROTULO
+
+OPCODES = [
+    'PUSH', 'PUSHG', 'STOREG', 'PUSHL', 'STOREL', 'JZ', 'JUMP',
+    'ADD', 'SUB', 'MUL', 'DIV', 'MOD', 'EQUAL', 'INF', 'INFEQ', 'SUP', 'SUPEQ',
+    'NOT', 'AND', 'OR', 'LOADN', 'STOREN', 'CHARAT', 'DUP', 'POP', 'SWAP',
+    'CALL', 'RETURN', 'FADD', 'FSUB', 'FMUL', 'FDIV',
+    'FINF', 'FINFEQ', 'FSUP', 'FSUPEQ', 'ITOF', 'FTOI',
+    'WRITES', 'WRITEI', 'WRITEF', 'WRITELN', 'WRITECHR', 'READ', 'ATOI', 'ATOF',
+    'STRI', 'STRF', 'STRLEN', 'CONCAT', 'ALLOCN', 'PUSHN', 'CHECK', 'ERR',
+    'START', 'NOP', 'STOP',
+]
+(PUSH, PUSHG, STOREG, PUSHL, STOREL, JZ, JUMP,
+ ADD, SUB, MUL, DIV, MOD, EQUAL, INF, INFEQ, SUP, SUPEQ,
+ NOT, AND, OR, LOADN, STOREN, CHARAT, DUP, POP, SWAP,
+ CALL, RETURN, FADD, FSUB, FMUL, FDIV,
+ FINF, FINFEQ, FSUP, FSUPEQ, ITOF, FTOI,
+ WRITES, WRITEI, WRITEF, WRITELN, WRITECHR, READ, ATOI, ATOF,
+ STRI, STRF, STRLEN, CONCAT, ALLOCN, PUSHN, CHECK, ERR,
+ START, NOP, STOP) = range(len(OPCODES))
+
+# Instruções do texto que passam a "empilhar constante"
+CONSTANTES = {'PUSHI', 'PUSHF', 'PUSHS', 'PUSHA'}
+
+@dataclass(slots=True)
+class Execucao:
+    instrucoes: int                 # total de instruções executadas
+    tempo: float                    # segundos
+    contagens: Counter = field(repr=False)  # opcode -> execuções
+
+    @property
+    def instrucoes_por_segundo(self):
+        return self.instrucoes / self.tempo if self.tempo else 0.0
+
+def formatar_real(valor):
+    # Como a VM web: 2.0 é escrito como 2
+    return str(int(valor)) if valor.is_integer() else repr(valor)
+
+def _dividir(a, b):
+    # Divisão inteira com truncagem em direção a zero, como no Pascal
+    q = a // b
+    if q < 0 and q * b != a:
+        q += 1
+    return q
+
+class MaquinaVirtual:
+    def __init__(self, codigo):
+        """Pré-descodifica um CodigoVM (ou uma lista de Instr)."""
+        instrs = [i for i in codigo if i.op != ROTULO]
+
+        # Tabela de rótulos: nome -> endereço da instrução seguinte
+        enderecos = {}
+        n = 0
+        for i in codigo:
+            if i.op == ROTULO:
+                enderecos[i.arg] = n
+            else:
+                n += 1
+
+        # Posições globais: as que o PUSHN logo a seguir ao START reserva
+        reservadas = 0
+        if len(instrs) > 1 and instrs[0].op == 'START' and instrs[1].op == 'PUSHN':
+            reservadas = instrs[1].arg
+
+        self.instrucoes = instrs
+        self.ops = []
+        self.args = []
+        for i in instrs:
+            op, arg = i.op, i.arg
+            if op in CONSTANTES:
+                if op == 'PUSHA':
+                    arg = self._endereco(enderecos, arg)
+                op = 'PUSH'
+            elif op in {'JUMP', 'JZ'}:
+                arg = self._endereco(enderecos, arg)
+            elif op in {'PUSHG', 'STOREG'}:
+                if not 0 <= arg < reservadas:
+                    raise Exception(f"Erro: {i} fora das {reservadas} posições globais reservadas pelo PUSHN")
+            elif op not in OPCODES:
+                raise Exception(f"Erro: instrução da VM não suportada: {i}")
+            self.ops.append(OPCODES.index(op))
+            self.args.append(arg)
+
+        # Sentinela: sair do fim do código termina a execução
+        self.ops.append(STOP)
+        self.args.append(None)
+        self.num_globais = reservadas
+
+    @staticmethod
+    def _endereco(enderecos, rotulo):
+        if rotulo not in enderecos:
+            raise Exception(f"Erro: rótulo '{rotulo}' não definido")
+        return enderecos[rotulo]
+
+    @classmethod
+    def de_texto(cls, linhas):
+        return cls(CodigoVM.de_texto(linhas))
+
+    def executar(self, entrada=None, saida=None):
+        """Executa o programa e devolve as estatísticas da execução (Execucao)."""
+        entrada = entrada or sys.stdin
+        escrever = (saida or sys.stdout).write
+        ler = entrada.readline
+
+        ops, args = self.ops, self.args
+        execucoes = [0] * len(ops)
+        pilha = []
+        empilhar = pilha.append
+        desempilhar = pilha.pop
+        chamadas = []
+        pc = fp = 0
+
+        inicio = time.perf_counter()
+        try:
+            while True:
+                op = ops[pc]
+                execucoes[pc] += 1
+                arg = args[pc]
+                pc += 1
+
+                if op == PUSH:
+                    empilhar(arg)
+                elif op == PUSHG:
+                    empilhar(pilha[arg])            # gp = 0
+                elif op == STOREG:
+                    pilha[arg] = desempilhar()
+                elif op == PUSHL:
+                    empilhar(pilha[fp + arg])
+                elif op == STOREL:
+                    pilha[fp + arg] = desempilhar()
+                elif op == JZ:
+                    if desempilhar() == 0:
+                        pc = arg
+                elif op == JUMP:
+                    pc = arg
+                elif op <= SUPEQ:
+                    b = desempilhar()
+                    a = desempilhar()
+                    if op == ADD:
+                        empilhar(a + b)
+                    elif op == SUB:
+                        empilhar(a - b)
+                    elif op == MUL:
+                        empilhar(a * b)
+                    elif op == DIV:
+                        empilhar(_dividir(a, b))
+                    elif op == MOD:
+                        empilhar(a - b * _dividir(a, b))
+                    elif op == EQUAL:
+                        empilhar(1 if a == b else 0)
+                    elif op == INF:
+                        empilhar(1 if a < b else 0)
+                    elif op == INFEQ:
+                        empilhar(1 if a <= b else 0)
+                    elif op == SUP:
+                        empilhar(1 if a > b else 0)
+                    else:
+                        empilhar(1 if a >= b else 0)
+                elif op == NOT:
+                    empilhar(1 if desempilhar() == 0 else 0)
+                elif op == AND:
+                    b = desempilhar()
+                    a = desempilhar()
+                    empilhar(1 if a and b else 0)
+                elif op == OR:
+                    b = desempilhar()
+                    a = desempilhar()
+                    empilhar(1 if a or b else 0)
+                elif op == LOADN:
+                    n = desempilhar()
+                    a = desempilhar()
+                    if n < 0:
+                        raise IndexError(n)
+                    empilhar(a[n])
+                elif op == STOREN:
+                    v = desempilhar()
+                    n = desempilhar()
+                    a = desempilhar()
+                    if n < 0:
+                        raise IndexError(n)
+                    a[n] = v
+                elif op == CHARAT:
+                    n = desempilhar()
+                    s = desempilhar()
+                    if n < 0:
+                        raise IndexError(n)
+                    empilhar(ord(s[n]))
+                elif op == DUP:
+                    pilha.extend(pilha[-arg:])
+                elif op == POP:
+                    del pilha[len(pilha) - arg:]
+                elif op == SWAP:
+                    pilha[-1], pilha[-2] = pilha[-2], pilha[-1]
+                elif op == CALL:
+                    destino = desempilhar()
+                    chamadas.append((pc, fp))
+                    fp = len(pilha)
+                    pc = destino
+                elif op == RETURN:
+                    pc, fp = chamadas.pop()
+                elif op <= FSUPEQ:
+                    b = desempilhar()
+                    a = desempilhar()
+                    if op == FADD:
+                        empilhar(a + b)
+                    elif op == FSUB:
+                        empilhar(a - b)
+                    elif op == FMUL:
+                        empilhar(a * b)
+                    elif op == FDIV:
+                        empilhar(a / b)
+                    elif op == FINF:
+                        empilhar(1 if a < b else 0)
+                    elif op == FINFEQ:
+                        empilhar(1 if a <= b else 0)
+                    elif op == FSUP:
+                        empilhar(1 if a > b else 0)
+                    else:
+                        empilhar(1 if a >= b else 0)
+                elif op == ITOF:
+                    empilhar(float(desempilhar()))
+                elif op == FTOI:
+                    empilhar(int(desempilhar()))
+                elif op == WRITES:
+                    s = desempilhar()
+                    if type(s) is not str:
+                        raise TypeError(f"WRITES espera uma string, obteve {s!r}")
+                    escrever(s)
+                elif op == WRITEI:
+                    escrever(str(desempilhar()))
+                elif op == WRITEF:
+                    escrever(formatar_real(float(desempilhar())))
+                elif op == WRITELN:
+                    escrever('\n')
+                elif op == WRITECHR:
+                    escrever(chr(desempilhar()))
+                elif op == READ:
+                    linha = ler()
+                    if not linha:
+                        raise EOFError("fim da entrada em READ")
+                    empilhar(linha.rstrip('\r\n'))
+                elif op == ATOI:
+                    empilhar(int(desempilhar()))
+                elif op == ATOF:
+                    empilhar(float(desempilhar()))
+                elif op == STRI:
+                    empilhar(str(desempilhar()))
+                elif op == STRF:
+                    empilhar(formatar_real(desempilhar()))
+                elif op == STRLEN:
+                    empilhar(len(desempilhar()))
+                elif op == CONCAT:
+                    b = desempilhar()
+                    empilhar(desempilhar() + b)
+                elif op == ALLOCN:
+                    empilhar([0] * desempilhar())
+                elif op == PUSHN:
+                    pilha.extend([0] * arg)
+                elif op == CHECK:
+                    minimo, maximo = arg
+                    if not minimo <= pilha[-1] <= maximo:
+                        raise IndexError(f"valor {pilha[-1]} fora de [{minimo}..{maximo}]")
+                elif op == ERR:
+                    raise RuntimeError(arg)
+                elif op == START:
+                    fp = len(pilha)
+                elif op == STOP:
+                    break
+        except Exception as e:
+            instr = self.instrucoes[pc - 1] if 0 < pc <= len(self.instrucoes) else 'STOP'
+            raise Exception(f"Erro de execução na instrução {pc - 1} ({instr}): "
+                            f"{type(e).__name__}: {e}") from None
+        tempo = time.perf_counter() - inicio
+
+        # Contagens pelas instruções originais (PUSHS e não o PUSH descodificado)
+        contagens = Counter()
+        for instr, n in zip(self.instrucoes, execucoes):
+            if n:
+                contagens[instr.op] += n
+        if execucoes[-1]:
+            contagens['STOP'] += execucoes[-1]      # a sentinela
+        return Execucao(sum(contagens.values()), tempo, contagens)
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        print("Uso: python vm/interpretador.py programa.vm", file=sys.stderr)
+        sys.exit(2)
+    with open(sys.argv[1], encoding='utf-8') as f:
+        maquina = MaquinaVirtual.de_texto(f)
+    try:
+        execucao = maquina.executar()
+    except Exception as e:
+        print(f"\n❌ {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"\n⏱️  {execucao.instrucoes} instruções em {execucao.tempo * 1000:.2f} ms "
+          f"({execucao.instrucoes_por_segundo / 1e6:.2f} M instr/s)", file=sys.stderr)